@@ -8,30 +8,41 @@ Usage:
     python -m team.toolbox.cli docs WorkbookView.tsx
     python -m team.toolbox.cli bugs --status open
     python -m team.toolbox.cli crawl src/
+
+The names below are loaded on first access, so `python -m team.toolbox.<module>`
+doesn't pay for storage and the Pydantic schemas unless it uses them.
 """
 
-from .constants import VALID_AREAS, VALID_SYMBOL_TYPES, VALID_OWNERS
-from .storage import (
-    init_db,
-    store_code_doc,
-    store_bug,
-    store_changelog,
-    store_learning,
-    query_code_docs,
-    query_bugs,
-)
+from importlib import import_module
+from typing import Any, List
 
 __version__ = "0.1.0"
 
-__all__ = [
-    "VALID_AREAS",
-    "VALID_SYMBOL_TYPES",
-    "VALID_OWNERS",
-    "init_db",
-    "store_code_doc",
-    "store_bug",
-    "store_changelog",
-    "store_learning",
-    "query_code_docs",
-    "query_bugs",
-]
+# Public name -> module that defines it
+_LAZY_ATTRS = {
+    "VALID_AREAS": ".constants",
+    "VALID_SYMBOL_TYPES": ".constants",
+    "VALID_OWNERS": ".constants",
+    "init_db": ".storage",
+    "store_code_doc": ".storage",
+    "store_bug": ".storage",
+    "store_changelog": ".storage",
+    "store_learning": ".storage",
+    "query_code_docs": ".storage",
+    "query_bugs": ".storage",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # Cache - later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
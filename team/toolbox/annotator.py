@@ -6,24 +6,28 @@ by adding inline `// code_id:XXX` comments to function/component declarations.
 """
 
 import re
+import sqlite3
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
 from .storage import (
     store_code_doc,
+    store_code_docs,
     query_code_docs,
-    store_nested_code_doc,
+    store_nested_code_docs,
     store_call,
     get_code_doc_by_name,
 )
 from .crawler import extract_symbols_regex, Symbol
 from .deep_crawler import extract_nested_functions, extract_function_calls, NestedSymbol, FunctionCall
 from .constants import VALID_AREAS
+from .instrument import count, span, timed
+from .pathrules import classify
 
 
 def infer_area(file_path: str) -> str:
     """
-    Infer area from file path patterns.
+    Infer area from file path patterns (the "area" rules in path_rules.json).
 
     Args:
         file_path: Relative path like 'src/components/workbook/WorkbookView.tsx'
@@ -31,58 +35,17 @@ def infer_area(file_path: str) -> str:
     Returns:
         Valid area string from VALID_AREAS
     """
-    path = file_path.lower().replace('\\', '/')
+    return classify("area", file_path)
 
-    # Component areas
-    if '/components/workbook/' in path: return 'workbook'
-    if '/components/conversation/' in path: return 'conversation'
-    if '/components/tools/' in path: return 'tools'
-    if '/components/shell/' in path: return 'shell'
-    if '/components/overlays/' in path: return 'shell'
-    if '/components/dashboard/' in path: return 'features'
-    if '/components/onboarding/' in path: return 'features'
-    if '/components/profile/' in path: return 'features'
-    if '/components/landing/' in path: return 'features'
-    if '/components/forms/' in path: return 'ui-primitives'
-    if '/components/feedback/' in path: return 'ui-primitives'
-    if '/components/icons/' in path: return 'ui-primitives'
 
-    # Library areas
-    if '/lib/db/' in path: return 'database'
-    if '/lib/auth/' in path: return 'auth'
-    if '/lib/connections/' in path: return 'database'
-
-    # API routes
-    if '/app/api/' in path: return 'api'
-
-    # Types
-    if '/types/' in path: return 'types'
-
-    # Design system
-    if 'globals.css' in path: return 'design-system'
-
-    # Hooks
-    if '/hooks/' in path: return 'lib'
-
-    # Default
-    return 'lib'
-
-
-def auto_create_doc(
-    file_path: str,
-    symbol: Dict[str, Any],
-    source_dir: str = ''
-) -> int:
+def placeholder_doc(file_path: str, symbol: Dict[str, Any], source_dir: str = '') -> Dict[str, Any]:
     """
-    Create placeholder code_doc entry for an undocumented symbol.
+    Placeholder code_doc fields (CodeDocInput) for an undocumented symbol.
 
     Args:
         file_path: Relative file path
         symbol: Symbol dict with name, type, line_start, line_end, signature
         source_dir: Base directory for resolving paths
-
-    Returns:
-        New code_doc ID
     """
     # Clean up file path to be relative
     clean_path = file_path.replace('\\', '/')
@@ -103,20 +66,40 @@ def auto_create_doc(
     # Create placeholder purpose
     purpose = f"TODO: Document {symbol_name}"
 
-    code_id = store_code_doc(
-        file_path=clean_path,
-        symbol_name=symbol_name,
-        symbol_type=symbol_type,
-        line_start=symbol.get('line_start'),
-        line_end=symbol.get('line_end'),
-        purpose=purpose,
-        why=None,
-        connections=[],
-        area=area,
-        signature=symbol.get('signature'),
-    )
+    return {
+        'file_path': clean_path,
+        'symbol_name': symbol_name,
+        'symbol_type': symbol_type,
+        'line_start': symbol.get('line_start'),
+        'line_end': symbol.get('line_end'),
+        'purpose': purpose,
+        'why': None,
+        'connections': [],
+        'area': area,
+        'signature': symbol.get('signature'),
+    }
+
+
+@timed("annotator.create_doc")
+def auto_create_doc(
+    file_path: str,
+    symbol: Dict[str, Any],
+    source_dir: str = '',
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    Create placeholder code_doc entry for an undocumented symbol.
 
-    return code_id
+    Args:
+        file_path: Relative file path
+        symbol: Symbol dict with name, type, line_start, line_end, signature
+        source_dir: Base directory for resolving paths
+        conn: Optional open connection (caller commits)
+
+    Returns:
+        New code_doc ID
+    """
+    return store_code_doc(**placeholder_doc(file_path, symbol, source_dir), conn=conn)
 
 
 def find_declaration_line(lines: List[str], start_line: int) -> Optional[int]:
@@ -216,69 +199,81 @@ def insert_code_id(line: str, code_id: int) -> str:
     return line + ending
 
 
-def annotate_file(
-    file_path: str,
+def to_src_relative(file_path: str, source_dir: str = '') -> str:
+    """Normalize a source path to the src/... form used in code_docs."""
+    rel_path = str(file_path).replace('\\', '/')
+    if source_dir:
+        source_dir_clean = source_dir.replace('\\', '/')
+        if rel_path.startswith(source_dir_clean):
+            rel_path = rel_path[len(source_dir_clean):].lstrip('/')
+
+    # Ensure src/ prefix
+    if not rel_path.startswith('src/'):
+        if '/src/' in rel_path:
+            rel_path = 'src/' + rel_path.split('/src/', 1)[1]
+
+    return rel_path
+
+
+@timed("annotator.annotate_lines")
+def annotate_lines(
+    rel_path: str,
+    lines: List[str],
+    symbols: List[Symbol],
     docs_by_file: Dict[str, List[Dict]],
     source_dir: str = '',
     dry_run: bool = False,
     verbose: bool = True,
+    conn: Optional[sqlite3.Connection] = None,
 ) -> Dict[str, int]:
     """
-    Annotate a single file with code_ids.
+    Annotate already-parsed source lines with code_ids (in place).
+
+    Docs created here are added to docs_by_file so later lookups see them.
 
     Args:
-        file_path: Absolute or relative path to source file
+        rel_path: src/... path of the file
+        lines: Source lines (keepends=True), modified in place
+        symbols: Symbols extracted from the same source
         docs_by_file: Pre-loaded code_docs grouped by file path
         source_dir: Base directory for resolving relative paths
-        dry_run: If True, don't write changes
+        dry_run: If True, don't create docs or modify lines
         verbose: If True, print progress
+        conn: Optional open connection for creating docs (caller commits)
 
     Returns:
-        {annotated: int, created: int, skipped: int, errors: int}
+        {annotated: int, created: int, skipped: int, errors: int, modified: int}
     """
-    result = {'annotated': 0, 'created': 0, 'skipped': 0, 'errors': 0}
-
-    path = Path(file_path)
-    if not path.exists():
-        if verbose:
-            print(f"  ! File not found: {file_path}")
-        result['errors'] += 1
-        return result
-
-    # Read source
-    try:
-        source = path.read_text(encoding='utf-8')
-    except Exception as e:
-        if verbose:
-            print(f"  ! Error reading {file_path}: {e}")
-        result['errors'] += 1
-        return result
-
-    lines = source.splitlines(keepends=True)
-
-    # Extract symbols from source
-    symbols = extract_symbols_regex(source, str(file_path))
-
-    if not symbols:
-        return result
-
-    # Get relative path for matching
-    rel_path = str(file_path).replace('\\', '/')
-    if source_dir:
-        source_dir_clean = source_dir.replace('\\', '/')
-        if rel_path.startswith(source_dir_clean):
-            rel_path = rel_path[len(source_dir_clean):].lstrip('/')
-
-    # Ensure src/ prefix
-    if not rel_path.startswith('src/'):
-        if '/src/' in rel_path:
-            rel_path = 'src/' + rel_path.split('/src/', 1)[1]
+    result = {'annotated': 0, 'created': 0, 'skipped': 0, 'errors': 0, 'modified': 0}
 
     # Get existing docs for this file
-    existing_docs = docs_by_file.get(rel_path, [])
+    existing_docs = docs_by_file.setdefault(rel_path, [])
     docs_by_name = {d['symbol_name']: d for d in existing_docs if d.get('symbol_name')}
 
-    modified = False
+    # Create every missing doc up front, in one batch
+    new_symbols = {}
+    if not dry_run:
+        for symbol in symbols:
+            if symbol.type not in ('interface', 'type', 'constant') and symbol.name not in docs_by_name:
+                new_symbols.setdefault(symbol.name, symbol)
+    if new_symbols:
+        placeholders = [
+            placeholder_doc(rel_path, {
+                'name': symbol.name,
+                'type': symbol.type,
+                'line_start': symbol.line_start,
+                'line_end': symbol.line_end,
+                'signature': symbol.signature,
+            }, source_dir)
+            for symbol in new_symbols.values()
+        ]
+        code_ids = store_code_docs(placeholders, conn=conn)
+        count("annotator.docs_created", len(code_ids))
+        for symbol, code_id in zip(new_symbols.values(), code_ids):
+            new_doc = {'id': code_id, 'file_path': rel_path, 'symbol_name': symbol.name,
+                       'symbol_type': symbol.type, 'line_start': symbol.line_start}
+            existing_docs.append(new_doc)
+            docs_by_name[symbol.name] = new_doc
 
     for symbol in symbols:
         # Symbol is a dataclass, access attributes directly
@@ -292,25 +287,13 @@ def annotate_file(
             result['skipped'] += 1
             continue
 
-        # Find or create code_doc entry
+        # Find the code_doc entry (created above if it was missing)
         if sym_name in docs_by_name:
             code_id = docs_by_name[sym_name]['id']
-            created = False
+            created = new_symbols.pop(sym_name, None) is not None
         else:
-            if dry_run:
-                code_id = 0  # Placeholder for dry run
-                created = True
-            else:
-                # Convert dataclass to dict for auto_create_doc
-                sym_dict = {
-                    'name': symbol.name,
-                    'type': symbol.type,
-                    'line_start': symbol.line_start,
-                    'line_end': symbol.line_end,
-                    'signature': symbol.signature,
-                }
-                code_id = auto_create_doc(rel_path, sym_dict, source_dir)
-                created = True
+            code_id = 0  # Placeholder for dry run
+            created = True
 
         # Find the declaration line
         decl_line_idx = find_declaration_line(lines, symbol.line_start)
@@ -331,7 +314,7 @@ def annotate_file(
         # Insert code_id
         if not dry_run:
             lines[decl_line_idx] = insert_code_id(lines[decl_line_idx], code_id)
-            modified = True
+            result['modified'] = 1
 
         status = '[CREATED]' if created else ''
         if verbose:
@@ -341,10 +324,66 @@ def annotate_file(
             result['created'] += 1
         result['annotated'] += 1
 
+    return result
+
+
+def annotate_file(
+    file_path: str,
+    docs_by_file: Dict[str, List[Dict]],
+    source_dir: str = '',
+    dry_run: bool = False,
+    verbose: bool = True,
+) -> Dict[str, int]:
+    """
+    Annotate a single file with code_ids.
+
+    Args:
+        file_path: Absolute or relative path to source file
+        docs_by_file: Pre-loaded code_docs grouped by file path
+        source_dir: Base directory for resolving relative paths
+        dry_run: If True, don't write changes
+        verbose: If True, print progress
+
+    Returns:
+        {annotated: int, created: int, skipped: int, errors: int}
+    """
+    result = {'annotated': 0, 'created': 0, 'skipped': 0, 'errors': 0}
+
+    path = Path(file_path)
+    if not path.exists():
+        if verbose:
+            print(f"  ! File not found: {file_path}")
+        result['errors'] += 1
+        return result
+
+    # Read source
+    try:
+        with span("annotator.read"):
+            source = path.read_text(encoding='utf-8')
+    except Exception as e:
+        if verbose:
+            print(f"  ! Error reading {file_path}: {e}")
+        result['errors'] += 1
+        return result
+
+    lines = source.splitlines(keepends=True)
+
+    # Extract symbols from source
+    symbols = extract_symbols_regex(source, str(file_path))
+
+    if not symbols:
+        return result
+
+    rel_path = to_src_relative(file_path, source_dir)
+    annotated = annotate_lines(rel_path, lines, symbols, docs_by_file, source_dir, dry_run, verbose)
+    modified = annotated.pop('modified')
+    result.update(annotated)
+
     # Write back if modified
     if modified and not dry_run:
         try:
-            path.write_text(''.join(lines), encoding='utf-8')
+            with span("annotator.write"):
+                path.write_text(''.join(lines), encoding='utf-8')
         except Exception as e:
             if verbose:
                 print(f"  ! Error writing {file_path}: {e}")
@@ -502,25 +541,30 @@ def deep_annotate_file(
         nested_funcs = extract_nested_functions(source, symbol)
         area = infer_area(rel_path)
 
-        for nested in nested_funcs:
-            if dry_run:
-                if verbose:
+        if dry_run:
+            if verbose:
+                for nested in nested_funcs:
                     print(f"    [DRY] Would create nested: {nested.name} under {symbol.name}")
-            else:
-                nested_id = store_nested_code_doc(
-                    file_path=rel_path,
-                    symbol_name=nested.name,
-                    symbol_type=nested.type,
-                    parent_id=parent_id,
-                    line_start=nested.line_start,
-                    line_end=nested.line_end,
-                    signature=nested.signature,
-                    purpose=f"TODO: Document {nested.name}",
-                    area=area,
-                )
-                if verbose:
+        else:
+            # Stored before the calls below, which may resolve to them
+            nested_ids = store_nested_code_docs([
+                {
+                    'file_path': rel_path,
+                    'symbol_name': nested.name,
+                    'symbol_type': nested.type,
+                    'parent_id': parent_id,
+                    'line_start': nested.line_start,
+                    'line_end': nested.line_end,
+                    'signature': nested.signature,
+                    'purpose': f"TODO: Document {nested.name}",
+                    'area': area,
+                }
+                for nested in nested_funcs
+            ])
+            if verbose:
+                for nested, nested_id in zip(nested_funcs, nested_ids):
                     print(f"    + nested: {nested.name} ({nested.type}) -> code_id:{nested_id}")
-            result['nested'] += 1
+        result['nested'] += len(nested_funcs)
 
         # Extract function calls
         calls = extract_function_calls(source, symbol)
@@ -0,0 +1,310 @@
+"""
+Monthly archive for board messages.
+
+The messages table is append-only and the board history import alone puts
+thousands of rows in it. Resolved messages older than ARCHIVE_AFTER_DAYS are
+moved out of team.db into one SQLite file per month:
+
+    team/archive/messages-2025-01.db
+    team/archive/messages-2025-02.db
+
+Hot-path board reads (get_recent, inbox, open questions) only ever touch the
+live table, which stays small enough to live in the page cache. Full history
+is available through history connections, which attach the archive files
+(in batches of SQLite's attach limit) and expose a TEMP view `messages_all`
+over live + archived rows.
+
+Usage:
+    python -m team.toolbox.cli board archive [--days 90] [--dry-run]
+    python -m team.toolbox.cli board compact
+    python -m team.toolbox.cli board list --history
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .storage import get_connection, get_db_path, open_connection
+from .constants import ARCHIVE_DIRNAME, ARCHIVE_AFTER_DAYS
+
+
+# Columns copied verbatim between the live table and the archive files
+MESSAGE_COLUMNS = (
+    "id, author, message_type, content, refs, mentions, data, "
+    "routed_to, routed_id, resolved, created_at"
+)
+
+# Archive files keep the original ids (no AUTOINCREMENT - ids come from team.db)
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {schema}.messages (
+    id INTEGER PRIMARY KEY,
+    author TEXT NOT NULL,
+    message_type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    refs TEXT,
+    mentions TEXT,
+    data TEXT,
+    routed_to TEXT,
+    routed_id TEXT,
+    resolved INTEGER DEFAULT 0,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS {schema}.idx_messages_created ON messages(created_at);
+CREATE INDEX IF NOT EXISTS {schema}.idx_messages_author ON messages(author);
+"""
+
+ARCHIVE_FILE_PATTERN = re.compile(r"^messages-(\d{4}-\d{2})\.db$")
+
+# SQLite's compiled-in default for SQLITE_MAX_ATTACHED
+DEFAULT_ATTACH_LIMIT = 10
+
+
+def get_archive_dir() -> Path:
+    """Get the path to the message archive directory."""
+    return get_db_path().parent / ARCHIVE_DIRNAME
+
+
+def get_archive_path(month: str) -> Path:
+    """Get the archive file for a month (YYYY-MM)."""
+    return get_archive_dir() / f"messages-{month}.db"
+
+
+def list_archives() -> List[Tuple[str, Path]]:
+    """
+    List archive files, oldest month first.
+
+    Returns:
+        List of (month, path) tuples.
+    """
+    archive_dir = get_archive_dir()
+    if not archive_dir.is_dir():
+        return []
+
+    found = []
+    for path in archive_dir.iterdir():
+        match = ARCHIVE_FILE_PATTERN.match(path.name)
+        if match:
+            found.append((match.group(1), path))
+    return sorted(found)
+
+
+def _schema_name(month: str) -> str:
+    """Attached schema name for a month: 2025-01 -> arc_2025_01."""
+    return "arc_" + month.replace("-", "_")
+
+
+def _attach_limit(conn: sqlite3.Connection) -> int:
+    """How many databases can be attached to conn."""
+    getlimit = getattr(conn, "getlimit", None)  # Python 3.11+
+    if getlimit is None:
+        return DEFAULT_ATTACH_LIMIT
+    return getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+
+
+# =============================================================================
+# ARCHIVING
+# =============================================================================
+
+def archive_messages(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Move resolved messages older than N days into per-month archive files.
+
+    Each month is copied and deleted in one transaction. Rows are inserted
+    with INSERT OR IGNORE and only rows present in the archive are deleted,
+    so an interrupted run is safe to repeat.
+
+    Args:
+        older_than_days: Age threshold for archiving
+        dry_run: Report what would move without changing anything
+
+    Returns:
+        Dict of month -> number of messages archived.
+    """
+    cutoff = f"-{int(older_than_days)} days"
+    eligible = (
+        "resolved = 1 AND created_at < datetime('now', ?) "
+        "AND strftime('%Y-%m', created_at) = ?"
+    )
+
+    conn = get_connection()
+    try:
+        cursor = conn.execute(
+            """
+            SELECT strftime('%Y-%m', created_at) as month, COUNT(*) as count
+            FROM messages
+            WHERE resolved = 1
+              AND created_at < datetime('now', ?)
+              AND strftime('%Y-%m', created_at) IS NOT NULL
+            GROUP BY month
+            ORDER BY month
+            """,
+            (cutoff,),
+        )
+        pending = {row["month"]: row["count"] for row in cursor.fetchall()}
+
+        if dry_run or not pending:
+            return pending
+
+        archive_dir = get_archive_dir()
+        archive_dir.mkdir(parents=True, exist_ok=True)
+
+        archived = {}
+        for month in pending:
+            conn.execute("ATTACH DATABASE ? AS arc", (str(get_archive_path(month)),))
+            try:
+                conn.executescript(ARCHIVE_SCHEMA.format(schema="arc"))
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        f"""
+                        INSERT OR IGNORE INTO arc.messages ({MESSAGE_COLUMNS})
+                        SELECT {MESSAGE_COLUMNS} FROM main.messages
+                        WHERE {eligible}
+                        """,
+                        (cutoff, month),
+                    )
+                    cursor = conn.execute(
+                        f"""
+                        DELETE FROM main.messages
+                        WHERE {eligible}
+                          AND id IN (SELECT id FROM arc.messages)
+                        """,
+                        (cutoff, month),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                archived[month] = cursor.rowcount
+            finally:
+                conn.execute("DETACH DATABASE arc")
+
+        return archived
+    finally:
+        conn.close()
+
+
+def compact_database(include_archives: bool = True) -> Dict[str, Any]:
+    """
+    Reclaim space after archiving.
+
+    Checkpoints and truncates the WAL, then VACUUMs team.db (and optionally
+    each archive file) so the freed pages are returned to the filesystem.
+
+    Returns:
+        Dict with 'before' / 'after' byte sizes of team.db and
+        'archives' (number of archive files compacted).
+    """
+    db_path = get_db_path()
+    before = db_path.stat().st_size if db_path.exists() else 0
+
+    conn = get_connection()
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    compacted = 0
+    if include_archives:
+        for _month, path in list_archives():
+            arc = sqlite3.connect(str(path))
+            try:
+                arc.execute("VACUUM")
+            finally:
+                arc.close()
+            compacted += 1
+
+    return {
+        "before": before,
+        "after": db_path.stat().st_size,
+        "archives": compacted,
+    }
+
+
+# =============================================================================
+# HISTORY READS
+# =============================================================================
+
+def get_history_connections(since: Optional[str] = None) -> List[sqlite3.Connection]:
+    """
+    Get connections with archives attached and a `messages_all` view each.
+
+    SQLite attaches at most SQLITE_LIMIT_ATTACHED files per connection
+    (10 by default), so archives are split into batches of that size, one
+    connection per batch, newest months first. Only the first view includes
+    the live table; query every connection and merge the results.
+
+    messages_all is a TEMP view (views in team.db cannot reference attached
+    files). A row present in both places - only possible after an
+    interrupted archive run - is returned once, from the live table.
+
+    Args:
+        since: Optional date (YYYY-MM-DD or YYYY-MM). Archives for earlier
+               months are not attached.
+
+    Returns:
+        Connections whose messages_all views together cover live + archived
+        messages without overlap. The caller closes them.
+    """
+    archives = list_archives()
+    if since:
+        archives = [(month, path) for month, path in archives if month >= since[:7]]
+    archives.reverse()
+
+    connections: List[sqlite3.Connection] = []
+    try:
+        while True:
+            conn = open_connection()  # Never the shared one - ATTACH outlives the query
+            connections.append(conn)
+            limit = _attach_limit(conn)
+            batch, archives = archives[:limit], archives[limit:]
+
+            selects = [f"SELECT {MESSAGE_COLUMNS} FROM main.messages"] if len(connections) == 1 else []
+            for month, path in batch:
+                schema = _schema_name(month)
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+                selects.append(
+                    f"SELECT {MESSAGE_COLUMNS} FROM {schema}.messages a "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM main.messages m WHERE m.id = a.id)"
+                )
+
+            conn.execute("DROP VIEW IF EXISTS temp.messages_all")
+            conn.execute(
+                "CREATE TEMP VIEW messages_all AS\n" + "\nUNION ALL\n".join(selects)
+            )
+            if not archives:
+                return connections
+    except Exception:
+        for conn in connections:
+            conn.close()
+        raise
+
+
+def get_archive_stats() -> Dict[str, Any]:
+    """Get live vs archived message counts."""
+    conn = get_connection()
+    try:
+        live = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    finally:
+        conn.close()
+
+    by_month = {}
+    for month, path in list_archives():
+        arc = sqlite3.connect(str(path))
+        try:
+            by_month[month] = arc.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        finally:
+            arc.close()
+
+    return {
+        "live_messages": live,
+        "archived_messages": sum(by_month.values()),
+        "archived_by_month": by_month,
+    }
@@ -0,0 +1,199 @@
+"""
+Batch mode: run many CLI commands in one process.
+
+Scripts that drive the CLI (docs, calls --from, bugs --id, board post, ...)
+otherwise pay interpreter startup, imports and a connection per command:
+
+    python -m team.toolbox.cli batch commands.jsonl
+    echo '["bugs", "--id", "BUG-012", "--json"]' | python -m team.toolbox.cli batch
+
+Input is JSON Lines, one command per line - either an argv array or an
+object {"argv": [...], "id": <anything>}. Output is one JSON line per command,
+written as soon as it finishes:
+
+    {"line": 1, "id": ..., "argv": [...], "exit": 0, "stdout": "...", "stderr": "...", "ms": 1.4}
+
+All commands share one connection (storage.shared_connection). With
+transaction="batch" (the default) they also share one write transaction:
+each command runs in a savepoint, a failed command's writes are rolled back
+and the rest commit together at the end. transaction="command" commits after
+every command instead, and doesn't hold the write lock between them.
+
+fail_fast stops at the first failed command (non-zero exit). In batch mode
+nothing is committed then - the batch is all-or-nothing.
+"""
+
+import io
+import json
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .instrument import count, span
+from .storage import SharedConnection, shared_connection
+
+
+# Commands that can run inside a batch. The rest manage processes (serve,
+# writer), run their own transactions on other connections or databases
+# (init, crawl, annotate, migrate), or would nest.
+BATCH_COMMANDS = frozenset({"docs", "bugs", "history", "learn", "board", "stats", "calls", "tree"})
+
+# (command, action) pairs that ATTACH or VACUUM - neither works in a
+# transaction - or that never finish (watch)
+BATCH_EXCLUDED_ACTIONS = frozenset({("board", "archive"), ("board", "compact"), ("board", "watch")})
+
+TRANSACTION_MODES = ("batch", "command")
+
+
+class _Abort(Exception):
+    """Raised to roll back the shared transaction on --fail-fast."""
+    pass
+
+
+def exit_code(e: SystemExit) -> int:
+    """Exit status for a SystemExit, as the interpreter would report it."""
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def parse_command(line: str) -> Tuple[List[str], Any]:
+    """
+    Parse one input line into (argv, id).
+
+    Raises:
+        ValueError: If the line is not an argv array or {"argv": [...]} object
+    """
+    command = json.loads(line)
+    command_id = None
+    if isinstance(command, dict):
+        command_id = command.get("id")
+        command = command.get("argv")
+    if not isinstance(command, list) or not command:
+        raise ValueError('expected an argv array or {"argv": [...]}')
+    return [str(arg) for arg in command], command_id
+
+
+def _refusal(args: Any, in_transaction: bool) -> Optional[str]:
+    """Why args can't run inside a batch, or None."""
+    if args.command not in BATCH_COMMANDS:
+        return f"'{args.command}' cannot run in a batch"
+    action = getattr(args, "action", None)
+    if (args.command, action) in BATCH_EXCLUDED_ACTIONS:
+        return f"'{args.command} {action}' cannot run in a batch"
+    if in_transaction and args.command == "board" and getattr(args, "history", False):
+        return "'board --history' attaches archives; use --transaction command"
+    return None
+
+
+def _dispatch(argv: List[str], conn: SharedConnection) -> int:
+    """Parse and run one command; its output goes to the current sys.stdout/stderr."""
+    from .cli import COMMANDS, build_parser
+
+    try:
+        args = build_parser().parse_args(argv)
+    except SystemExit as e:
+        return exit_code(e)
+
+    if args.command is None:
+        print("Error: no command given", file=sys.stderr)
+        return 2
+
+    refusal = _refusal(args, conn.owns_transaction)
+    if refusal:
+        print(f"Error: {refusal}", file=sys.stderr)
+        return 2
+
+    try:
+        with conn.unit():
+            code = COMMANDS[args.command](args) or 0
+            if code:
+                conn.discard_unit()
+        return code
+    except SystemExit as e:
+        return exit_code(e)
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def run_command(argv: List[str], conn: SharedConnection) -> Dict[str, Any]:
+    """Run one command with captured output and return its result fields."""
+    out = io.StringIO()
+    err = io.StringIO()
+    started = time.perf_counter()
+    with span("batch.command", command=argv[0]), redirect_stdout(out), redirect_stderr(err):
+        code = _dispatch(argv, conn)
+    count("batch.commands")
+
+    return {
+        "argv": argv,
+        "exit": code,
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue(),
+        "ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def run_batch(
+    lines: Iterable[str],
+    out: Optional[TextIO] = None,
+    transaction: str = "batch",
+    fail_fast: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run JSON Lines commands over one shared connection.
+
+    Args:
+        lines: Input lines (blank lines are skipped)
+        out: Where result lines go (default: sys.stdout)
+        transaction: "batch" for one transaction, "command" to commit per command
+        fail_fast: Stop at the first failed command (and roll back in batch mode)
+
+    Returns:
+        {commands, failed, committed}
+    """
+    if transaction not in TRANSACTION_MODES:
+        raise ValueError(f"transaction must be one of {TRANSACTION_MODES}, got {transaction!r}")
+
+    out = out or sys.stdout
+    summary = {"commands": 0, "failed": 0, "committed": False}
+
+    def emit(result: Dict[str, Any]) -> None:
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+    try:
+        with shared_connection(transaction=transaction == "batch") as conn:
+            for line_no, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                summary["commands"] += 1
+
+                try:
+                    argv, command_id = parse_command(line)
+                except ValueError as e:
+                    result = {"exit": 2, "stderr": f"Invalid command: {e}\n"}
+                else:
+                    result = run_command(argv, conn)
+                    if command_id is not None:
+                        result = {"id": command_id, **result}
+
+                emit({"line": line_no, **result})
+
+                if result["exit"] != 0:
+                    summary["failed"] += 1
+                    if fail_fast:
+                        if conn.owns_transaction:
+                            raise _Abort()
+                        break
+        summary["committed"] = True
+    except _Abort:
+        pass
+
+    return summary
@@ -11,12 +11,25 @@ Usage:
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import atexit
+import threading
 import json
+import re
 
-from .storage import get_connection
+from .storage import allocate_bug_id, get_connection, get_db_path, in_shared_connection, open_connection
 from .session import WorkSession, create_work_session
-from .constants import VALID_AUTHORS, VALID_AREAS, VALID_PRIORITIES, VALID_LEARNING_CATEGORIES
+from .writer import write_op, execute_write
+from .watch import follow_messages
+from .constants import (
+    VALID_AUTHORS,
+    VALID_AREAS,
+    VALID_PRIORITIES,
+    VALID_LEARNING_CATEGORIES,
+    WATCH_BACKOFF,
+    WATCH_POLL_MAX_S,
+    WATCH_POLL_MIN_S,
+)
 
 
 @dataclass
@@ -38,6 +51,347 @@ class BoardError(Exception):
     pass
 
 
+# =============================================================================
+# WRITE OPERATIONS (run via writer.execute_write)
+# =============================================================================
+
+@write_op("board.post")
+def _insert_message(
+    conn,
+    author: str,
+    message_type: str,
+    content: str,
+    mentions: Optional[List[str]] = None,
+    refs: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Insert a non-routable message."""
+    cursor = conn.execute(
+        """
+        INSERT INTO messages (author, message_type, content, mentions, refs, created_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        """,
+        (
+            author,
+            message_type,
+            content,
+            json.dumps(mentions) if mentions else None,
+            json.dumps(refs) if refs else None,
+        )
+    )
+    return cursor.lastrowid
+
+
+@write_op("board.file_bug")
+def _insert_bug(
+    conn,
+    author: str,
+    title: str,
+    area: str,
+    priority: str,
+    description: Optional[str] = None,
+    expected_behavior: Optional[str] = None,
+    acceptance_criteria: Optional[List[str]] = None,
+) -> str:
+    """Insert a bug message, its bugs row, and the routing link."""
+    # Insert message
+    cursor = conn.execute(
+        """
+        INSERT INTO messages (author, message_type, content, data, created_at)
+        VALUES (?, 'bug', ?, ?, datetime('now'))
+        """,
+        (
+            author,
+            title,
+            json.dumps({"area": area, "priority": priority}),
+        )
+    )
+    msg_id = cursor.lastrowid
+    bug_id = allocate_bug_id(conn)
+
+    # Insert into bugs table
+    conn.execute(
+        """
+        INSERT INTO bugs (id, title, area, priority, status, description,
+                          expected_behavior, acceptance_criteria, found_by, created_at)
+        VALUES (?, ?, ?, ?, 'open', ?, ?, ?, ?, datetime('now'))
+        """,
+        (
+            bug_id,
+            title,
+            area,
+            priority,
+            description,
+            expected_behavior,
+            json.dumps(acceptance_criteria) if acceptance_criteria else None,
+            author,
+        )
+    )
+
+    # Update message with routing info
+    conn.execute(
+        "UPDATE messages SET routed_to = 'bugs', routed_id = ? WHERE id = ?",
+        (bug_id, msg_id)
+    )
+    return bug_id
+
+
+@write_op("board.log_learning")
+def _insert_learning(
+    conn,
+    author: str,
+    learning: str,
+    category: str,
+    context: Optional[str] = None,
+    related_bug_id: Optional[str] = None,
+) -> int:
+    """Insert a learning message, its learnings row, and the routing link."""
+    # Insert message
+    cursor = conn.execute(
+        """
+        INSERT INTO messages (author, message_type, content, data, created_at)
+        VALUES (?, 'learning', ?, ?, datetime('now'))
+        """,
+        (
+            author,
+            learning,
+            json.dumps({"category": category}),
+        )
+    )
+    msg_id = cursor.lastrowid
+
+    # Insert into learnings table
+    cursor = conn.execute(
+        """
+        INSERT INTO learnings (category, learning, context, related_bug_id, created_at)
+        VALUES (?, ?, ?, ?, datetime('now'))
+        """,
+        (category, learning, context, related_bug_id)
+    )
+    learning_id = cursor.lastrowid
+
+    # Update message with routing info
+    conn.execute(
+        "UPDATE messages SET routed_to = 'learnings', routed_id = ? WHERE id = ?",
+        (str(learning_id), msg_id)
+    )
+    return learning_id
+
+
+@write_op("board.log_decision")
+def _insert_decision(
+    conn,
+    author: str,
+    decision: str,
+    rationale: str,
+    area: Optional[str] = None,
+    alternatives: Optional[List[str]] = None,
+) -> int:
+    """Insert a decision message, its decisions row, and the routing link."""
+    # Insert message
+    cursor = conn.execute(
+        """
+        INSERT INTO messages (author, message_type, content, data, created_at)
+        VALUES (?, 'decision', ?, ?, datetime('now'))
+        """,
+        (
+            author,
+            decision,
+            json.dumps({"rationale": rationale}),
+        )
+    )
+    msg_id = cursor.lastrowid
+
+    # Insert into decisions table
+    cursor = conn.execute(
+        """
+        INSERT INTO decisions (date, decision, rationale, alternatives_considered,
+                               related_area, created_at)
+        VALUES (date('now'), ?, ?, ?, ?, datetime('now'))
+        """,
+        (
+            decision,
+            rationale,
+            json.dumps(alternatives) if alternatives else None,
+            area,
+        )
+    )
+    decision_id = cursor.lastrowid
+
+    # Update message with routing info
+    conn.execute(
+        "UPDATE messages SET routed_to = 'decisions', routed_id = ? WHERE id = ?",
+        (str(decision_id), msg_id)
+    )
+    return decision_id
+
+
+# =============================================================================
+# INBOX CURSORS (see migration 0008)
+# =============================================================================
+
+# Condition over messages for :agent, per VALID_INBOX_STREAMS entry. The
+# board_cursors triggers (migration 0010) count unread with the same conditions.
+# A mention must equal '@' || :agent - LIKE would count @FizzBot for Fizz.
+_MENTIONS_AGENT = "EXISTS (SELECT 1 FROM json_each(mentions) WHERE value = '@' || :agent)"
+INBOX_STREAMS = {
+    "assignments": f"message_type = 'assignment' AND {_MENTIONS_AGENT}",
+    "questions": "message_type = 'question'",
+    "mentions": _MENTIONS_AGENT,
+}
+
+
+def _count_unread(conn, agent: str, stream: str, after_id: int) -> int:
+    """Matching messages above after_id, counted from the table."""
+    return conn.execute(
+        f"SELECT COUNT(*) FROM messages WHERE id > :after AND author != :agent AND ({INBOX_STREAMS[stream]})",
+        {"after": after_id, "agent": agent},
+    ).fetchone()[0]
+
+
+def _open_cursor_in(conn, agent: str, stream: str) -> None:
+    """
+    Create an agent's cursor if missing.
+
+    A new cursor starts just below the oldest unresolved matching message, so
+    the first inbox is what get_my_assignments() would show rather than the
+    whole history.
+    """
+    if conn.execute(
+        "SELECT 1 FROM board_cursors WHERE agent = ? AND stream = ?", (agent, stream)
+    ).fetchone():
+        return
+    start = conn.execute(
+        f"""
+        SELECT COALESCE(MIN(id) - 1, (SELECT COALESCE(MAX(id), 0) FROM messages))
+        FROM messages
+        WHERE resolved = 0 AND author != :agent AND ({INBOX_STREAMS[stream]})
+        """,
+        {"agent": agent},
+    ).fetchone()[0]
+    conn.execute(
+        "INSERT INTO board_cursors (agent, stream, last_seen_id, unread) VALUES (?, ?, ?, ?)",
+        (agent, stream, start, _count_unread(conn, agent, stream, start)),
+    )
+
+
+@write_op("board.open_cursor")
+def _open_cursor(conn, agent: str, stream: str) -> None:
+    """Create an agent's inbox cursor if missing."""
+    _open_cursor_in(conn, agent, stream)
+
+
+@write_op("board.mark_read")
+def _mark_read(conn, agent: str, stream: str, up_to_id: Optional[int] = None) -> int:
+    """Move a cursor forward to up_to_id (default: the newest message); returns unread left."""
+    _open_cursor_in(conn, agent, stream)
+    if up_to_id is None:
+        up_to_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+    last_seen = conn.execute(
+        "SELECT last_seen_id FROM board_cursors WHERE agent = ? AND stream = ?", (agent, stream)
+    ).fetchone()[0]
+    last_seen = max(last_seen, up_to_id)
+    unread = _count_unread(conn, agent, stream, last_seen)
+    conn.execute(
+        """
+        UPDATE board_cursors
+        SET last_seen_id = ?, unread = ?, updated_at = datetime('now')
+        WHERE agent = ? AND stream = ?
+        """,
+        (last_seen, unread, agent, stream),
+    )
+    return unread
+
+
+# =============================================================================
+# COMPLETION CLAIMS (checked on every post)
+# =============================================================================
+
+_BUG_ID = re.compile(r'BUG-\d+', re.IGNORECASE)
+
+# A completion word within 30 chars of a bug ID, either side, or right after
+# it ("BUG-12 is done")
+_COMPLETION_CLAIM = re.compile(
+    r'BUG-\d+(?:.{0,30}\b(?:done|fixed|resolved|completed|finished)\b'
+    r'|\s+(?:is\s+)?(?:done|fixed|resolved|completed|finished))'
+    r'|\b(?:done|fixed|resolved|completed|finished)\b.{0,30}BUG-\d+',
+    re.IGNORECASE,
+)
+
+
+class _BugStatusCache:
+    """
+    Bug statuses for the whole process, on one kept-open connection.
+
+    PRAGMA data_version changes whenever another connection commits, so the
+    cache is dropped on any write and otherwise answers without a query.
+    Every thread (daemon requests, WatchHub) shares the one connection under
+    a lock, so there is never more than one to close.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.db_path = None
+        self.conn = None
+        self.data_version = None
+        self.statuses: Dict[str, Optional[str]] = {}
+
+    def lookup(self, bug_ids: List[str]) -> Dict[str, Optional[str]]:
+        db_path = get_db_path()
+        with self._lock:
+            if self.conn is None or self.db_path != db_path:
+                self._close()
+                self.conn, self.db_path = open_connection(check_same_thread=False), db_path
+
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self.data_version:
+                self.statuses.clear()
+                self.data_version = version
+
+            missing = [bug_id for bug_id in bug_ids if bug_id not in self.statuses]
+            if missing:
+                self.statuses.update(_select_bug_statuses(self.conn, missing))
+            return {bug_id: self.statuses[bug_id] for bug_id in bug_ids}
+
+    def close(self) -> None:
+        """Close the connection; the next lookup reopens it."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+        self.conn, self.db_path, self.data_version = None, None, None
+        self.statuses.clear()
+
+
+_bug_status_cache = _BugStatusCache()
+atexit.register(_bug_status_cache.close)
+
+
+def _select_bug_statuses(conn, bug_ids: List[str]) -> Dict[str, Optional[str]]:
+    """{id: status} for upper-case bug IDs in one query; None for unknown IDs."""
+    statuses: Dict[str, Optional[str]] = dict.fromkeys(bug_ids)
+    placeholders = ", ".join("?" * len(bug_ids))
+    for row in conn.execute(f"SELECT id, status FROM bugs WHERE id IN ({placeholders})", bug_ids):
+        statuses[row[0]] = row[1]
+    return statuses
+
+
+def bug_statuses(bug_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Current status of each bug ID, keyed by upper-cased ID (None if unknown).
+
+    Inside shared_connection() the lookup runs on the shared connection, so
+    it sees the caller's uncommitted changes; otherwise it is cached.
+    """
+    ids = list(dict.fromkeys(bug_id.upper() for bug_id in bug_ids))
+    if not ids:
+        return {}
+    if in_shared_connection():
+        return _select_bug_statuses(get_connection(), ids)
+    return _bug_status_cache.lookup(ids)
+
+
 class Board:
     """
     Agent interface for team coordination board.
@@ -253,60 +607,19 @@ class Board:
         if priority not in VALID_PRIORITIES:
             raise BoardError(f"Invalid priority '{priority}'. Must be one of: {', '.join(VALID_PRIORITIES)}")
 
-        conn = get_connection()
-        conn.execute("PRAGMA journal_mode=WAL")
-
         try:
-            conn.execute("BEGIN")
-
-            # Insert message
-            cursor = conn.execute(
-                """
-                INSERT INTO messages (author, message_type, content, data, created_at)
-                VALUES (?, 'bug', ?, ?, datetime('now'))
-                """,
-                (
-                    self.author,
-                    title,
-                    json.dumps({"area": area, "priority": priority}),
-                )
-            )
-            msg_id = cursor.lastrowid
-            bug_id = f"BUG-{msg_id}"
-
-            # Insert into bugs table
-            conn.execute(
-                """
-                INSERT INTO bugs (id, title, area, priority, status, description,
-                                  expected_behavior, acceptance_criteria, found_by, created_at)
-                VALUES (?, ?, ?, ?, 'open', ?, ?, ?, ?, datetime('now'))
-                """,
-                (
-                    bug_id,
-                    title,
-                    area,
-                    priority,
-                    description,
-                    expected_behavior,
-                    json.dumps(acceptance_criteria) if acceptance_criteria else None,
-                    self.author,
-                )
-            )
-
-            # Update message with routing info
-            conn.execute(
-                "UPDATE messages SET routed_to = 'bugs', routed_id = ? WHERE id = ?",
-                (bug_id, msg_id)
+            return execute_write(
+                "board.file_bug",
+                author=self.author,
+                title=title,
+                area=area,
+                priority=priority,
+                description=description,
+                expected_behavior=expected_behavior,
+                acceptance_criteria=acceptance_criteria,
             )
-
-            conn.execute("COMMIT")
-            return bug_id
-
         except Exception as e:
-            conn.execute("ROLLBACK")
             raise BoardError(f"Failed to file bug: {e}")
-        finally:
-            conn.close()
 
     def log_learning(
         self,
@@ -330,50 +643,17 @@ class Board:
         if category not in VALID_LEARNING_CATEGORIES:
             raise BoardError(f"Invalid category '{category}'. Must be one of: {', '.join(VALID_LEARNING_CATEGORIES)}")
 
-        conn = get_connection()
-        conn.execute("PRAGMA journal_mode=WAL")
-
         try:
-            conn.execute("BEGIN")
-
-            # Insert message
-            cursor = conn.execute(
-                """
-                INSERT INTO messages (author, message_type, content, data, created_at)
-                VALUES (?, 'learning', ?, ?, datetime('now'))
-                """,
-                (
-                    self.author,
-                    learning,
-                    json.dumps({"category": category}),
-                )
-            )
-            msg_id = cursor.lastrowid
-
-            # Insert into learnings table
-            cursor = conn.execute(
-                """
-                INSERT INTO learnings (category, learning, context, related_bug_id, created_at)
-                VALUES (?, ?, ?, ?, datetime('now'))
-                """,
-                (category, learning, context, related_bug_id)
+            return execute_write(
+                "board.log_learning",
+                author=self.author,
+                learning=learning,
+                category=category,
+                context=context,
+                related_bug_id=related_bug_id,
             )
-            learning_id = cursor.lastrowid
-
-            # Update message with routing info
-            conn.execute(
-                "UPDATE messages SET routed_to = 'learnings', routed_id = ? WHERE id = ?",
-                (str(learning_id), msg_id)
-            )
-
-            conn.execute("COMMIT")
-            return learning_id
-
         except Exception as e:
-            conn.execute("ROLLBACK")
             raise BoardError(f"Failed to log learning: {e}")
-        finally:
-            conn.close()
 
     def log_decision(
         self,
@@ -397,56 +677,17 @@ class Board:
         if area and area not in VALID_AREAS:
             raise BoardError(f"Invalid area '{area}'. Must be one of: {', '.join(VALID_AREAS)}")
 
-        conn = get_connection()
-        conn.execute("PRAGMA journal_mode=WAL")
-
         try:
-            conn.execute("BEGIN")
-
-            # Insert message
-            cursor = conn.execute(
-                """
-                INSERT INTO messages (author, message_type, content, data, created_at)
-                VALUES (?, 'decision', ?, ?, datetime('now'))
-                """,
-                (
-                    self.author,
-                    decision,
-                    json.dumps({"rationale": rationale}),
-                )
+            return execute_write(
+                "board.log_decision",
+                author=self.author,
+                decision=decision,
+                rationale=rationale,
+                area=area,
+                alternatives=alternatives,
             )
-            msg_id = cursor.lastrowid
-
-            # Insert into decisions table
-            cursor = conn.execute(
-                """
-                INSERT INTO decisions (date, decision, rationale, alternatives_considered,
-                                       related_area, created_at)
-                VALUES (date('now'), ?, ?, ?, ?, datetime('now'))
-                """,
-                (
-                    decision,
-                    rationale,
-                    json.dumps(alternatives) if alternatives else None,
-                    area,
-                )
-            )
-            decision_id = cursor.lastrowid
-
-            # Update message with routing info
-            conn.execute(
-                "UPDATE messages SET routed_to = 'decisions', routed_id = ? WHERE id = ?",
-                (str(decision_id), msg_id)
-            )
-
-            conn.execute("COMMIT")
-            return decision_id
-
         except Exception as e:
-            conn.execute("ROLLBACK")
             raise BoardError(f"Failed to log decision: {e}")
-        finally:
-            conn.close()
 
     # =========================================================================
     # READ METHODS (limited to 50 rows by default)
@@ -573,6 +814,168 @@ class Board:
         finally:
             conn.close()
 
+    # =========================================================================
+    # SUBSCRIPTIONS (push instead of polling the read methods - see watch.py)
+    # =========================================================================
+
+    def follow(
+        self,
+        types: Optional[Iterable[str]] = None,
+        mentions: Optional[Iterable[str]] = None,
+        since_id: Optional[int] = None,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        min_interval: float = WATCH_POLL_MIN_S,
+        max_interval: float = WATCH_POLL_MAX_S,
+        backoff: float = WATCH_BACKOFF,
+    ) -> Iterator[Message]:
+        """
+        Yield new messages as they are posted.
+
+            for msg in board.follow(types=["assignment"], mentions=[board.author]):
+                ...
+
+        Args:
+            types: Message types to deliver (default: all)
+            mentions: Only messages mentioning one of these names ("Fizz" or "@Fizz")
+            since_id: Start above this message id (default: from now on)
+            timeout: Stop after this many seconds (default: never)
+            stop: Event that ends the stream when set
+            min_interval / max_interval / backoff: Idle check interval, in seconds
+
+        Yields:
+            Message objects, oldest first
+        """
+        for row in follow_messages(types, mentions, since_id, timeout, stop,
+                                   min_interval, max_interval, backoff):
+            yield self._row_to_message(row)
+
+    def watch(
+        self,
+        callback: Callable[[Message], Any],
+        types: Optional[Iterable[str]] = None,
+        mentions: Optional[Iterable[str]] = None,
+        since_id: Optional[int] = None,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        **intervals: float,
+    ) -> int:
+        """
+        Call callback(message) for every new matching message.
+
+        Blocks until timeout, stop is set, or the callback returns False.
+        Arguments are as for follow().
+
+        Returns:
+            Number of messages delivered
+        """
+        delivered = 0
+        for message in self.follow(types, mentions, since_id, timeout, stop, **intervals):
+            delivered += 1
+            if callback(message) is False:
+                break
+        return delivered
+
+    # =========================================================================
+    # INBOX (per-agent read watermarks - work proportional to what is new)
+    # =========================================================================
+
+    def inbox(self, stream: str = "assignments", limit: int = DEFAULT_LIMIT,
+              mark_read: bool = False) -> List[Message]:
+        """
+        Get messages in a stream that this agent hasn't read yet.
+
+        Reads only ids above the agent's watermark (a primary-key range), so
+        a check-in with nothing new costs one lookup.
+
+        Args:
+            stream: "assignments" (mentioning me), "questions" or "mentions"
+            limit: Max messages to return (1 to DEFAULT_LIMIT)
+            mark_read: Move the watermark past the returned messages only
+
+        Returns:
+            List of Message objects, oldest first
+        """
+        if not 1 <= limit <= self.DEFAULT_LIMIT:
+            raise BoardError(f"limit must be between 1 and {self.DEFAULT_LIMIT}, got {limit}")
+        cursor = self._cursor(stream)
+        conn = get_connection()
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT id, author, message_type, content, created_at, resolved,
+                       mentions, routed_to, routed_id
+                FROM messages
+                WHERE id > :after AND author != :agent AND ({INBOX_STREAMS[stream]})
+                ORDER BY id
+                LIMIT :limit
+                """,
+                {"after": cursor["last_seen_id"], "agent": self.author,
+                 "limit": limit},
+            ).fetchall()
+        finally:
+            conn.close()
+
+        messages = [self._row_to_message(row) for row in rows]
+        if mark_read and messages:
+            self.mark_read(stream, up_to_id=messages[-1].id)
+        return messages
+
+    def mark_read(self, stream: str = "assignments", up_to_id: Optional[int] = None) -> int:
+        """
+        Move this agent's watermark forward.
+
+        Args:
+            stream: Inbox stream
+            up_to_id: Last message read (default: everything so far)
+
+        Returns:
+            Unread messages left in the stream
+        """
+        self._check_stream(stream)
+        try:
+            return execute_write("board.mark_read", agent=self.author, stream=stream, up_to_id=up_to_id)
+        except Exception as e:
+            raise BoardError(f"Failed to mark {stream} read: {e}")
+
+    def unread_count(self, stream: Optional[str] = None) -> Any:
+        """
+        Unread messages - kept current by triggers, so this is a lookup.
+
+        Args:
+            stream: One stream, or None for all of them
+
+        Returns:
+            int for one stream, else {stream: count}
+        """
+        if stream is not None:
+            return self._cursor(stream)["unread"]
+        return {name: self._cursor(name)["unread"] for name in INBOX_STREAMS}
+
+    def _check_stream(self, stream: str) -> None:
+        if stream not in INBOX_STREAMS:
+            raise BoardError(f"Unknown inbox stream '{stream}'. Must be one of: {', '.join(INBOX_STREAMS)}")
+
+    def _cursor(self, stream: str) -> Dict[str, Any]:
+        """This agent's {last_seen_id, unread} for a stream, creating the cursor on first use."""
+        self._check_stream(stream)
+        for _ in range(2):
+            conn = get_connection()
+            try:
+                row = conn.execute(
+                    "SELECT last_seen_id, unread FROM board_cursors WHERE agent = ? AND stream = ?",
+                    (self.author, stream),
+                ).fetchone()
+            finally:
+                conn.close()
+            if row:
+                return {"last_seen_id": row[0], "unread": row[1]}
+            try:
+                execute_write("board.open_cursor", agent=self.author, stream=stream)
+            except Exception as e:
+                raise BoardError(f"Failed to open {stream} inbox: {e}")
+        raise BoardError(f"Could not open the {stream} inbox for {self.author}")
+
     # =========================================================================
     # MANAGEMENT METHODS
     # =========================================================================
@@ -650,27 +1053,14 @@ class Board:
         # ENFORCEMENT: Detect completion claims without proper workflow
         self._check_completion_claim(content)
 
-        conn = get_connection()
-        conn.execute("PRAGMA journal_mode=WAL")
-
-        try:
-            cursor = conn.execute(
-                """
-                INSERT INTO messages (author, message_type, content, mentions, refs, created_at)
-                VALUES (?, ?, ?, ?, ?, datetime('now'))
-                """,
-                (
-                    self.author,
-                    message_type,
-                    content,
-                    json.dumps(mentions) if mentions else None,
-                    json.dumps(refs) if refs else None,
-                )
-            )
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return execute_write(
+            "board.post",
+            author=self.author,
+            message_type=message_type,
+            content=content,
+            mentions=mentions,
+            refs=refs,
+        )
 
     def _check_completion_claim(self, content: str) -> None:
         """
@@ -689,46 +1079,20 @@ class Board:
         Raises:
             BoardError: If completion claimed but bug not updated
         """
-        import re
-
-        # Only check for explicit completion claims near bug IDs
-        # Pattern: completion word within 30 chars of BUG-XXX
-        completion_claim_patterns = [
-            r'BUG-\d+.{0,30}\b(done|fixed|resolved|completed|finished)\b',
-            r'\b(done|fixed|resolved|completed|finished)\b.{0,30}BUG-\d+',
-            r'BUG-\d+\s+(is\s+)?(done|fixed|resolved|completed|finished)',
-        ]
-
-        has_completion_claim = any(
-            re.search(pattern, content, re.IGNORECASE)
-            for pattern in completion_claim_patterns
-        )
-
-        if not has_completion_claim:
-            return
-
-        # Find bug IDs mentioned
-        bug_ids = re.findall(r'BUG-\d+', content, re.IGNORECASE)
-        if not bug_ids:
+        bug_ids = _BUG_ID.findall(content)
+        if not bug_ids or not _COMPLETION_CLAIM.search(content):
             return
 
         # Check if mentioned bugs are actually marked done/review
-        conn = get_connection()
-        try:
-            for bug_id in bug_ids:
-                row = conn.execute(
-                    "SELECT status FROM bugs WHERE id = ? COLLATE NOCASE",
-                    (bug_id.upper(),)
-                ).fetchone()
-
-                if row and row[0] not in ('done', 'review'):
-                    raise BoardError(
-                        f"WORKFLOW VIOLATION: You claim {bug_id} is complete, but its status is '{row[0]}'. "
-                        f"Use board.start_work('{bug_id}') and session.complete() to properly update status, "
-                        f"or use board.complete_bug('{bug_id}') if you already fixed it."
-                    )
-        finally:
-            conn.close()
+        statuses = bug_statuses(bug_ids)
+        for bug_id in bug_ids:
+            status = statuses.get(bug_id.upper())
+            if status is not None and status not in ('done', 'review'):
+                raise BoardError(
+                    f"WORKFLOW VIOLATION: You claim {bug_id} is complete, but its status is '{status}'. "
+                    f"Use board.start_work('{bug_id}') and session.complete() to properly update status, "
+                    f"or use board.complete_bug('{bug_id}') if you already fixed it."
+                )
 
     def complete_bug(self, bug_id: str, summary: str, root_cause: str) -> None:
         """
@@ -12,41 +12,21 @@ Commands:
     learn           Query learnings
     stats           Show statistics
     crawl           Run AST crawler (Phase 2)
+    writer          Run or inspect the single-writer process
+    serve           Run commands in a warm daemon (python -m team.toolbox.client ...)
+    batch           Run JSON Lines commands in one process
+    perf            Check toolbox performance (startup budget, slow queries, validation)
 """
 
 import argparse
+import csv
+import itertools
 import json
 import sys
-from typing import List, Dict, Any
-
-from .storage import (
-    init_db,
-    store_code_doc,
-    query_code_docs,
-    store_bug,
-    query_bugs,
-    update_bug,
-    store_changelog,
-    query_changelog,
-    store_learning,
-    query_learnings,
-    link_bug_to_code,
-    get_bugs_for_code,
-    get_code_for_bug,
-    get_stats,
-    store_message,
-    query_messages,
-    resolve_message,
-    get_open_messages,
-    render_board_md,
-    query_calls,
-    get_calls_from,
-    get_calls_to,
-    get_call_tree,
-    get_code_doc_by_name,
-    get_nested_functions,
-    update_message_routing,
-)
+import textwrap
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
 from .constants import (
     VALID_AREAS,
     VALID_BUG_STATUSES,
@@ -54,6 +34,10 @@ from .constants import (
     VALID_OWNERS,
     VALID_AUTHORS,
     VALID_MESSAGE_TYPES,
+    VALID_INBOX_STREAMS,
+    ARCHIVE_AFTER_DAYS,
+    STARTUP_BENCH_RUNS,
+    VALIDATION_BENCH_ROWS,
 )
 
 
@@ -76,37 +60,162 @@ def sanitize_for_console(text: str) -> str:
     return text.encode('ascii', 'replace').decode('ascii')
 
 
+# Rows read to size table columns before the rest is streamed
+TABLE_SAMPLE_ROWS = 200
+
+OUTPUT_FORMATS = ["table", "json", "jsonl", "csv", "tsv"]
+
+
 def format_table(rows: List[Dict[str, Any]], columns: List[str], max_width: int = 50) -> str:
     """Format rows as a simple table."""
-    if not rows:
-        return "No results found."
+    return "\n".join(iter_table_lines(rows, columns, max_width, sample=len(rows)))
+
+
+def iter_table_lines(
+    rows: Iterable[Dict[str, Any]],
+    columns: List[str],
+    max_width: int = 50,
+    sample: int = TABLE_SAMPLE_ROWS,
+) -> Iterator[str]:
+    """
+    Format rows as a simple table, one line at a time.
+
+    Column widths come from the first `sample` rows; later rows are cut to
+    fit, so the first lines print without reading the whole result.
+    """
+    rows = iter(rows)
+    head = list(itertools.islice(rows, sample))
+    if not head:
+        yield "No results found."
+        return
 
     # Calculate column widths
     widths = {}
     for col in columns:
         widths[col] = min(
             max_width,
-            max(len(col), max(len(str(row.get(col, ""))[:max_width]) for row in rows))
+            max(len(col), max(len(str(row.get(col, ""))[:max_width]) for row in head))
         )
 
-    # Build header
-    header = " | ".join(col.ljust(widths[col]) for col in columns)
-    separator = "-+-".join("-" * widths[col] for col in columns)
+    # Header
+    yield " | ".join(col.ljust(widths[col]) for col in columns)
+    yield "-+-".join("-" * widths[col] for col in columns)
 
-    # Build rows
-    lines = [header, separator]
-    for row in rows:
-        line = " | ".join(
+    # Rows
+    for row in itertools.chain(head, rows):
+        yield " | ".join(
             sanitize_for_console(str(row.get(col, "")))[:widths[col]].ljust(widths[col])
             for col in columns
         )
-        lines.append(line)
 
-    return "\n".join(lines)
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]],
+    columns: List[str],
+    fmt: str = "table",
+    out=None,
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Stream query rows to out as they are read.
+
+    Args:
+        rows: Rows (usually a storage iter_* generator)
+        columns: Columns shown by the table format; the others write every column
+        fmt: One of OUTPUT_FORMATS. json is the same indented list as
+             json.dumps(rows, indent=2), written row by row.
+        out: Text stream (default: sys.stdout)
+
+    Returns:
+        (rows written, last row) - for paging hints.
+    """
+    out = out or sys.stdout
+    written = 0
+    last = None
+
+    def tracked() -> Iterator[Dict[str, Any]]:
+        nonlocal written, last
+        for row in rows:
+            written += 1
+            last = row
+            yield row
+
+    if fmt == "table":
+        for line in iter_table_lines(tracked(), columns):
+            out.write(line + "\n")
+
+    elif fmt == "json":
+        out.write("[")
+        for row in tracked():
+            out.write(("\n" if written == 1 else ",\n") + textwrap.indent(json.dumps(row, indent=2), "  "))
+        out.write("\n]\n" if written else "]\n")
+
+    elif fmt == "jsonl":
+        for row in tracked():
+            out.write(json.dumps(row) + "\n")
+
+    elif fmt in ("csv", "tsv"):
+        writer = None
+        for row in tracked():
+            if writer is None:
+                writer = csv.DictWriter(
+                    out,
+                    fieldnames=list(row),
+                    delimiter="\t" if fmt == "tsv" else ",",
+                    lineterminator="\n",
+                    extrasaction="ignore",
+                )
+                writer.writeheader()
+            writer.writerow(row)
+
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    return written, last
+
+
+def add_output_arguments(parser: argparse.ArgumentParser, paging: bool = False) -> None:
+    """Add --format (and --after-id keyset paging) to a query subcommand."""
+    parser.add_argument("--format", choices=OUTPUT_FORMATS,
+                        help="Output format (default: table; --json is --format json)")
+    if paging:
+        parser.add_argument("--after-id", type=int, metavar="ID",
+                            help="Page in id order: rows with id above ID (start with 0)")
+
+
+def output_format(args: argparse.Namespace) -> str:
+    """Output format chosen by --format / --json."""
+    return args.format or ("json" if getattr(args, "json", False) else "table")
+
+
+def print_next_page(args: argparse.Namespace, written: int, last: Optional[Dict[str, Any]]) -> None:
+    """When paging with --after-id and the page is full, print the next page's flag."""
+    if args.after_id is None or not last or "id" not in last:
+        return
+    if args.limit and args.limit > 0 and written == args.limit:
+        print(f"More results: --after-id {last['id']}", file=sys.stderr)
+
+
+def watch_filters(args: argparse.Namespace) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+    """(types, mentions) for `board watch` from --type / --mentions."""
+    types = [args.type] if args.type else None
+    mentions = [m.strip() for m in args.mentions.split(",")] if args.mentions else None
+    return types, mentions
+
+
+def format_watch_line(message: Dict[str, Any], fmt: str) -> str:
+    """One `board watch` output line: a JSON object for json/jsonl, else a readable summary."""
+    if fmt in ("json", "jsonl"):
+        return json.dumps(message)
+    return sanitize_for_console(
+        f"#{message['id']} {message['created_at']} {message['author']} "
+        f"[{message['message_type']}] {message['content']}"
+    )
 
 
 def cmd_init(args: argparse.Namespace) -> int:
-    """Initialize the database (safe - only creates missing tables)."""
+    """Initialize the database (safe - only applies pending migrations)."""
+    from .storage import init_db
+
     try:
         init_db()
         return 0
@@ -117,28 +226,29 @@ def cmd_init(args: argparse.Namespace) -> int:
 
 def cmd_docs(args: argparse.Namespace) -> int:
     """Query code documentation."""
-    results = query_code_docs(
+    from .storage import iter_code_docs
+
+    rows = iter_code_docs(
         file_path=args.file,
         symbol_name=args.symbol,
         symbol_type=args.type,
         area=args.area,
         search=args.search,
         limit=args.limit,
+        after_id=args.after_id,
     )
 
-    if args.json:
-        print(json.dumps(results, indent=2))
-    else:
-        columns = ["id", "file_path", "symbol_name", "symbol_type", "area", "purpose"]
-        print(format_table(results, columns))
-
+    columns = ["id", "file_path", "symbol_name", "symbol_type", "area", "purpose"]
+    print_next_page(args, *write_rows(rows, columns, output_format(args)))
     return 0
 
 
 def cmd_bugs(args: argparse.Namespace) -> int:
     """Query or manage bugs."""
+    from .storage import get_code_for_bug, iter_bugs, link_bug_to_code, store_bug, update_bug
+
     if args.action == "list" or args.action is None:
-        results = query_bugs(
+        rows = iter_bugs(
             bug_id=args.id,
             status=args.status,
             area=args.area,
@@ -147,28 +257,16 @@ def cmd_bugs(args: argparse.Namespace) -> int:
             limit=args.limit,
         )
 
-        if args.json:
-            print(json.dumps(results, indent=2))
-        else:
-            columns = ["id", "title", "status", "priority", "area", "owner"]
-            print(format_table(results, columns))
+        columns = ["id", "title", "status", "priority", "area", "owner"]
+        write_rows(rows, columns, output_format(args))
 
     elif args.action == "add":
         if not args.title:
             print("Error: --title is required for adding bugs", file=sys.stderr)
             return 1
 
-        # Generate next bug ID
-        existing = query_bugs(limit=1000)
-        bug_ids = [b["id"] for b in existing if b["id"].startswith("BUG-")]
-        if bug_ids:
-            max_num = max(int(bid.split("-")[1]) for bid in bug_ids)
-            next_id = f"BUG-{max_num + 1:03d}"
-        else:
-            next_id = "BUG-001"
-
+        # No id - store_bug allocates the next BUG-NNN atomically
         bug_id = store_bug({
-            "id": next_id,
             "title": args.title,
             "area": args.area,
             "priority": args.priority or "medium",
@@ -224,18 +322,16 @@ def cmd_bugs(args: argparse.Namespace) -> int:
             print("Error: --id is required", file=sys.stderr)
             return 1
 
-        results = get_code_for_bug(args.id)
-        if args.json:
-            print(json.dumps(results, indent=2))
-        else:
-            columns = ["id", "file_path", "symbol_name", "relationship", "purpose"]
-            print(format_table(results, columns))
+        columns = ["id", "file_path", "symbol_name", "relationship", "purpose"]
+        write_rows(get_code_for_bug(args.id), columns, output_format(args))
 
     return 0
 
 
 def cmd_history(args: argparse.Namespace) -> int:
     """Query changelog."""
+    from .storage import query_changelog, store_changelog
+
     if args.action == "list" or args.action is None:
         results = query_changelog(
             days=args.days,
@@ -272,6 +368,8 @@ def cmd_history(args: argparse.Namespace) -> int:
 
 def cmd_learn(args: argparse.Namespace) -> int:
     """Query learnings."""
+    from .storage import query_learnings, store_learning
+
     if args.action == "list" or args.action is None:
         results = query_learnings(
             category=args.category,
@@ -308,11 +406,11 @@ def route_message(msg_id: int, msg_type: str, content: str, data: dict) -> tuple
     Returns:
         Tuple of (routed_to, routed_id) or (None, None) if no routing needed.
     """
+    from .storage import store_bug, store_learning
+
     if msg_type == "bug":
-        # Route to bugs table
-        bug_id = f"BUG-{msg_id}"
+        # Route to bugs table (store_bug allocates the id)
         bug_data = {
-            "id": bug_id,
             "title": content,
             "area": data.get("area", "general"),
             "priority": data.get("priority", "medium"),
@@ -321,7 +419,7 @@ def route_message(msg_id: int, msg_type: str, content: str, data: dict) -> tuple
             "owner": data.get("owner"),
         }
         try:
-            store_bug(bug_data)
+            bug_id = store_bug(bug_data)
             return ("bugs", bug_id)
         except Exception as e:
             print(f"Warning: Failed to route to bugs: {e}", file=sys.stderr)
@@ -353,6 +451,14 @@ def route_message(msg_id: int, msg_type: str, content: str, data: dict) -> tuple
 
 def cmd_board(args: argparse.Namespace) -> int:
     """Post to or query the board."""
+    from .storage import (
+        iter_messages,
+        render_board_md,
+        resolve_message,
+        store_message,
+        update_message_routing,
+    )
+
     if args.action == "post":
         if not all([args.author, args.type, args.content]):
             print("Error: --author, --type, and --content are required for posting", file=sys.stderr)
@@ -409,9 +515,83 @@ def cmd_board(args: argparse.Namespace) -> int:
             print(f"Message not found: {args.id}", file=sys.stderr)
             return 1
 
+    elif args.action == "watch":
+        from .watch import follow_messages
+
+        types, mentions = watch_filters(args)
+        fmt = output_format(args)
+        delivered = 0
+        try:
+            for row in follow_messages(types, mentions, since_id=args.after_id, timeout=args.timeout):
+                print(format_watch_line(dict(row), fmt), flush=True)
+                delivered += 1
+                if args.count and delivered >= args.count:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+    elif args.action in ("inbox", "unread"):
+        from dataclasses import asdict
+        from .board import Board, BoardError
+
+        if not args.author:
+            print(f"Error: --author is required for {args.action}", file=sys.stderr)
+            return 1
+        board = Board(args.author)
+        fmt = output_format(args)
+        try:
+            if args.action == "inbox":
+                messages = board.inbox(args.stream or "assignments", limit=args.limit or board.DEFAULT_LIMIT,
+                                       mark_read=args.mark_read)
+                for message in messages:
+                    print(format_watch_line(asdict(message), fmt))
+                if not messages and fmt == "table":
+                    print("Nothing new")
+            else:
+                counts = board.unread_count(args.stream)
+                if not isinstance(counts, dict):
+                    counts = {args.stream: counts}
+                if fmt in ("json", "jsonl"):
+                    print(json.dumps(counts))
+                else:
+                    for stream, count in counts.items():
+                        print(f"{stream}: {count}")
+        except BoardError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
     elif args.action == "render":
-        md = render_board_md()
-        print(md)
+        if args.write:
+            from .storage import get_board_md_path, write_board_md
+
+            written = write_board_md(incremental=not args.full)
+            print(f"{'Wrote' if written else 'Unchanged:'} {get_board_md_path()}")
+        else:
+            md = render_board_md(incremental=not args.full)
+            print(md)
+
+    elif args.action == "archive":
+        from .archive import archive_messages
+
+        counts = archive_messages(older_than_days=args.days, dry_run=args.dry_run)
+        if not counts:
+            print(f"No resolved messages older than {args.days} days")
+            return 0
+
+        verb = "Would archive" if args.dry_run else "Archived"
+        for month, count in counts.items():
+            print(f"  {month}: {count}")
+        print(f"{verb} {sum(counts.values())} messages in {len(counts)} month(s)")
+
+    elif args.action == "compact":
+        from .archive import compact_database, get_archive_stats
+
+        result = compact_database()
+        archive_stats = get_archive_stats()
+        print(f"team.db: {result['before'] / 1024:.0f} KB -> {result['after'] / 1024:.0f} KB")
+        print(f"Live messages:     {archive_stats['live_messages']}")
+        print(f"Archived messages: {archive_stats['archived_messages']} "
+              f"({result['archives']} archive file(s) compacted)")
 
     else:  # list (default)
         # Parse resolved flag
@@ -425,26 +605,27 @@ def cmd_board(args: argparse.Namespace) -> int:
             from datetime import datetime
             after = datetime.now().strftime("%Y-%m-%d")
 
-        results = query_messages(
+        rows = iter_messages(
             author=args.author,
             message_type=args.type,
             resolved=resolved,
             after=after,
             mentions=args.mentions,
             limit=args.limit,
+            include_archived=args.history,
+            after_id=args.after_id,
         )
 
-        if args.json:
-            print(json.dumps(results, indent=2))
-        else:
-            columns = ["id", "created_at", "author", "message_type", "content", "resolved"]
-            print(format_table(results, columns))
+        columns = ["id", "created_at", "author", "message_type", "content", "resolved"]
+        print_next_page(args, *write_rows(rows, columns, output_format(args)))
 
     return 0
 
 
 def cmd_stats(args: argparse.Namespace) -> int:
     """Show statistics."""
+    from .storage import get_stats
+
     stats = get_stats()
 
     if args.json:
@@ -472,36 +653,79 @@ def cmd_stats(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_writer(args: argparse.Namespace) -> int:
+    """Run or inspect the single-writer process."""
+    from .writer import serve_writer, query_writer_stats, configure_writes
+
+    if args.action == "serve":
+        if args.busy_timeout is not None:
+            configure_writes(busy_timeout_ms=args.busy_timeout)
+        return serve_writer(args.socket, max_batch=args.max_batch, linger_ms=args.linger_ms)
+
+    # stats (default)
+    stats = query_writer_stats(Path(args.socket) if args.socket else None)
+    if stats is None:
+        print("No writer process running (writes go directly to team.db)", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print("Writer Contention Statistics")
+        print("=" * 40)
+        for key, value in stats.items():
+            print(f"{key + ':':<20} {value}")
+
+    return 0
+
+
 def cmd_crawl(args: argparse.Namespace) -> int:
     """Run AST crawler."""
     from .crawler import crawl_for_cli
-    return crawl_for_cli(args.path, args.output)
+    from .instrument import profiling
+    with profiling(args.profile, args.trace, args.cprofile):
+        return crawl_for_cli(args.path, args.output)
 
 
 def cmd_annotate(args: argparse.Namespace) -> int:
     """Add code_id annotations to source files."""
     from .annotator import annotate_cli
-    return annotate_cli(args)
+    from .instrument import profiling
+    with profiling(args.profile, args.trace, args.cprofile):
+        return annotate_cli(args)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile / --trace / --cprofile to a subcommand."""
+    parser.add_argument("--profile", action="store_true", help="Print a per-phase timing breakdown")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace_event JSON file")
+    parser.add_argument("--cprofile", metavar="FILE", help="Write a cProfile dump (python -m pstats FILE)")
 
 
 def cmd_migrate(args: argparse.Namespace) -> int:
     """Migrate historical data from markdown files."""
-    from .parser import migrate_all, migrate_bugs, migrate_board, migrate_learnings, link_bugs_to_code
+    from .parser import (
+        format_import_counts, migrate_all, migrate_bugs, migrate_board, migrate_learnings, link_bugs_to_code,
+    )
 
+    prefix = "Would migrate" if args.dry_run else "Migrated"
     if args.source == "all":
-        results = migrate_all(args.team_dir or ".", args.dry_run)
+        results = migrate_all(args.team_dir or ".", args.dry_run, args.incremental)
         print("\n=== Summary ===")
         for key, value in results.items():
-            print(f"{key}: {value.get('count', 0)} items")
+            if "inserted" in value:
+                print(f"{key}: {format_import_counts(value)}")
+            else:
+                print(f"{key}: {value.get('count', 0)} items")
     elif args.source == "bugs":
-        count, ids = migrate_bugs(args.file or "BUGS.md", args.dry_run)
-        print(f"Migrated {count} bugs")
+        counts = migrate_bugs(args.file or "BUGS.md", args.dry_run, args.incremental)
+        print(f"{prefix} bugs: {format_import_counts(counts)}")
     elif args.source == "board":
-        count, ids = migrate_board(args.file or "BOARD.md", args.dry_run)
-        print(f"Migrated {count} messages")
+        counts = migrate_board(args.file or "BOARD.md", args.dry_run, args.incremental)
+        print(f"{prefix} messages: {format_import_counts(counts)}")
     elif args.source == "learnings":
-        count, ids = migrate_learnings(args.file or "../CLAUDE.md", args.dry_run)
-        print(f"Migrated {count} learnings")
+        counts = migrate_learnings(args.file or "../CLAUDE.md", args.dry_run)
+        print(f"{prefix} learnings: {format_import_counts(counts)}")
     elif args.source == "link":
         links = link_bugs_to_code(args.dry_run)
         print(f"Created {links} bug-to-code links")
@@ -511,6 +735,10 @@ def cmd_migrate(args: argparse.Namespace) -> int:
 
 def cmd_calls(args: argparse.Namespace) -> int:
     """Query function call relationships."""
+    from .storage import get_code_doc_by_name, iter_calls
+
+    fmt = output_format(args)
+
     # Handle --from and --to arguments
     from_name = getattr(args, 'from_name', None)
     to_name = getattr(args, 'to_name', None)
@@ -522,16 +750,19 @@ def cmd_calls(args: argparse.Namespace) -> int:
             print(f"Function not found: {from_name}", file=sys.stderr)
             return 1
 
-        results = get_calls_from(doc['id'])
+        rows = iter_calls(caller_id=doc['id'], limit=args.limit, after_id=args.after_id)
+        if fmt != "table":
+            print_next_page(args, *write_rows(rows, [], fmt))
+            return 0
+
         print(f"Functions called by {from_name} (code_id:{doc['id']}):")
         print()
-
-        if args.json:
-            print(json.dumps(results, indent=2))
-        else:
-            for call in results:
-                ext = "" if call.get('callee_id') else " [external]"
-                print(f"  -> {call['callee_name']} ({call['call_type']}) @ line {call['line_number']}{ext}")
+        written, last = 0, None
+        for call in rows:
+            ext = "" if call.get('callee_id') else " [external]"
+            print(f"  -> {call['callee_name']} ({call['call_type']}) @ line {call['line_number']}{ext}")
+            written, last = written + 1, call
+        print_next_page(args, written, last)
 
     elif to_name:
         # Get calls TO a function
@@ -540,35 +771,38 @@ def cmd_calls(args: argparse.Namespace) -> int:
             print(f"Function not found: {to_name}", file=sys.stderr)
             return 1
 
-        results = get_calls_to(doc['id'])
+        rows = iter_calls(callee_id=doc['id'], limit=args.limit, after_id=args.after_id)
+        if fmt != "table":
+            print_next_page(args, *write_rows(rows, [], fmt))
+            return 0
+
         print(f"Functions that call {to_name} (code_id:{doc['id']}):")
         print()
-
-        if args.json:
-            print(json.dumps(results, indent=2))
-        else:
-            for call in results:
-                print(f"  <- {call['caller_name']} ({call['call_type']}) @ {call['caller_file']}:{call['line_number']}")
+        written, last = 0, None
+        for call in rows:
+            print(f"  <- {call['caller_name']} ({call['call_type']}) @ {call['caller_file']}:{call['line_number']}")
+            written, last = written + 1, call
+        print_next_page(args, written, last)
 
     else:
         # General query
-        results = query_calls(
+        rows = iter_calls(
             callee_name=args.name,
             call_type=args.type,
             limit=args.limit,
+            after_id=args.after_id,
         )
 
-        if args.json:
-            print(json.dumps(results, indent=2))
-        else:
-            columns = ["caller_name", "callee_name", "call_type", "line_number"]
-            print(format_table(results, columns))
+        columns = ["caller_name", "callee_name", "call_type", "line_number"]
+        print_next_page(args, *write_rows(rows, columns, fmt))
 
     return 0
 
 
 def cmd_tree(args: argparse.Namespace) -> int:
     """Show call tree for a function."""
+    from .storage import get_call_tree, get_code_doc_by_name
+
     name = args.name
     depth = args.depth
 
@@ -613,16 +847,110 @@ def print_tree(node: Dict[str, Any], direction: str, prefix: str = "", is_last:
         print_tree(child, direction, new_prefix, is_child_last)
 
 
-def main() -> int:
-    """Main entry point."""
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Run the CLI daemon."""
+    from .daemon import serve_daemon
+
+    return serve_daemon(args.socket)
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    """Run JSON Lines commands over one connection."""
+    from .batch import run_batch
+
+    if args.file == "-":
+        summary = run_batch(sys.stdin, transaction=args.transaction, fail_fast=args.fail_fast)
+    else:
+        try:
+            with open(args.file, encoding="utf-8") as f:
+                summary = run_batch(f, transaction=args.transaction, fail_fast=args.fail_fast)
+        except FileNotFoundError:
+            print(f"Error: File not found: {args.file}", file=sys.stderr)
+            return 1
+
+    outcome = "committed" if summary["committed"] else "rolled back"
+    print(f"Batch: {summary['commands']} commands, {summary['failed']} failed ({outcome})",
+          file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def cmd_perf(args: argparse.Namespace) -> int:
+    """Check toolbox performance budgets."""
+    if args.action == "queries":
+        from .perf import clear_query_log, format_query_report, load_query_log, query_report
+
+        if args.clear:
+            print(f"Deleted {clear_query_log()} query log rows")
+            return 0
+
+        report = query_report(load_query_log(args.file), sort=args.sort, top=args.top)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(format_query_report(report, args.sort))
+        return 0
+
+    if args.action == "validate":
+        from .perf import format_validation, measure_validation
+
+        result = measure_validation(rows=args.rows, runs=args.runs)
+        print(json.dumps(result, indent=2) if args.json else format_validation(result))
+        return 0
+
+    from .perf import format_startup, measure_startup
+
+    argv = args.argv[1:] if args.argv[:1] == ["--"] else args.argv
+    kwargs = {"argv": argv or ["stats"], "runs": args.runs}
+    if args.budget_ms is not None:
+        kwargs["budget_ms"] = args.budget_ms
+    result = measure_startup(**kwargs)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(format_startup(result))
+    return 0 if result["within_budget"] else 1
+
+
+# Command name -> handler (main() and batch.py dispatch through this)
+COMMANDS = {
+    "init": cmd_init,
+    "docs": cmd_docs,
+    "bugs": cmd_bugs,
+    "history": cmd_history,
+    "learn": cmd_learn,
+    "board": cmd_board,
+    "stats": cmd_stats,
+    "crawl": cmd_crawl,
+    "writer": cmd_writer,
+    "migrate": cmd_migrate,
+    "annotate": cmd_annotate,
+    "calls": cmd_calls,
+    "tree": cmd_tree,
+    "serve": cmd_serve,
+    "batch": cmd_batch,
+    "perf": cmd_perf,
+}
+
+
+# Built once per process - the daemon (see daemon.py) reuses it for every command
+_parser: Optional[argparse.ArgumentParser] = None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all commands (cached)."""
+    global _parser
+    if _parser is not None:
+        return _parser
+
     parser = argparse.ArgumentParser(
         description="Team Knowledge Base CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    # init (safe - only creates missing tables, never destroys data)
-    init_parser = subparsers.add_parser("init", help="Initialize database (safe - only adds missing tables)")
+    # init (safe - only applies pending migrations, never destroys data)
+    init_parser = subparsers.add_parser("init", help="Initialize database (safe - only applies pending migrations)")
 
     # docs
     docs_parser = subparsers.add_parser("docs", help="Query code documentation")
@@ -631,8 +959,9 @@ def main() -> int:
     docs_parser.add_argument("--type", help="Symbol type filter")
     docs_parser.add_argument("--area", choices=VALID_AREAS, help="Area filter")
     docs_parser.add_argument("--search", help="Search in purpose/why")
-    docs_parser.add_argument("--limit", type=int, default=100, help="Max results")
+    docs_parser.add_argument("--limit", type=int, default=100, help="Max results (0 for all)")
     docs_parser.add_argument("--json", action="store_true", help="Output JSON")
+    add_output_arguments(docs_parser, paging=True)
 
     # bugs
     bugs_parser = subparsers.add_parser("bugs", help="Query or manage bugs")
@@ -649,8 +978,9 @@ def main() -> int:
     bugs_parser.add_argument("--verified-by", help="Verified by (for update)")
     bugs_parser.add_argument("--code-doc", type=int, help="Code doc ID (for link)")
     bugs_parser.add_argument("--relationship", help="Relationship type (for link)")
-    bugs_parser.add_argument("--limit", type=int, default=100, help="Max results")
+    bugs_parser.add_argument("--limit", type=int, default=100, help="Max results (0 for all)")
     bugs_parser.add_argument("--json", action="store_true", help="Output JSON")
+    add_output_arguments(bugs_parser)
 
     # history
     history_parser = subparsers.add_parser("history", help="Query changelog")
@@ -684,7 +1014,9 @@ def main() -> int:
 
     # board
     board_parser = subparsers.add_parser("board", help="Post to or query the board")
-    board_parser.add_argument("action", nargs="?", choices=["list", "post", "resolve", "render"])
+    board_parser.add_argument("action", nargs="?",
+                              choices=["list", "post", "resolve", "render", "archive", "compact", "watch",
+                                       "inbox", "unread"])
     board_parser.add_argument("--id", help="Message ID (for resolve)")
     board_parser.add_argument("--author", choices=VALID_AUTHORS, help="Author filter or value (for post)")
     board_parser.add_argument("--type", choices=VALID_MESSAGE_TYPES, help="Message type filter or value (for post)")
@@ -697,13 +1029,36 @@ def main() -> int:
     board_parser.add_argument("--resolved", help="Filter by resolved status: 0, 1, true, false")
     board_parser.add_argument("--after", help="Filter messages after date YYYY-MM-DD")
     board_parser.add_argument("--today", action="store_true", help="Filter to today's messages")
-    board_parser.add_argument("--limit", type=int, default=50, help="Max results")
+    board_parser.add_argument("--limit", type=int, default=50, help="Max results (0 for all)")
     board_parser.add_argument("--json", action="store_true", help="Output JSON")
+    add_output_arguments(board_parser, paging=True)
+    board_parser.add_argument("--history", action="store_true", help="Include archived messages (for list)")
+    board_parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                              help=f"Archive resolved messages older than N days (default: {ARCHIVE_AFTER_DAYS})")
+    board_parser.add_argument("--dry-run", action="store_true", help="Show what would be archived")
+    board_parser.add_argument("--timeout", type=float, help="Stop watching after N seconds (for watch)")
+    board_parser.add_argument("--count", type=int, help="Stop watching after N messages (for watch)")
+    board_parser.add_argument("--stream", choices=VALID_INBOX_STREAMS,
+                              help="Inbox stream (for inbox, unread; default: assignments / all)")
+    board_parser.add_argument("--write", action="store_true",
+                              help="Write BOARD.md instead of printing; skipped if unchanged (for render)")
+    board_parser.add_argument("--full", action="store_true", help="Re-render every message (for render)")
+    board_parser.add_argument("--mark-read", action="store_true", help="Mark the messages shown as read (for inbox)")
+
+    # writer
+    writer_parser = subparsers.add_parser("writer", help="Run or inspect the single-writer process")
+    writer_parser.add_argument("action", nargs="?", choices=["serve", "stats"], default="stats")
+    writer_parser.add_argument("--socket", help="Socket path (default: team/writer.sock)")
+    writer_parser.add_argument("--max-batch", type=int, default=64, help="Max writes per group commit")
+    writer_parser.add_argument("--linger-ms", type=float, default=2.0, help="Wait for more writes before committing")
+    writer_parser.add_argument("--busy-timeout", type=int, help="SQLite busy_timeout in ms")
+    writer_parser.add_argument("--json", action="store_true", help="Output JSON")
 
     # crawl
     crawl_parser = subparsers.add_parser("crawl", help="Run AST crawler")
     crawl_parser.add_argument("path", help="Path to crawl")
     crawl_parser.add_argument("--output", help="Output file for queue")
+    add_profile_arguments(crawl_parser)
 
     # migrate
     migrate_parser = subparsers.add_parser("migrate", help="Migrate historical data")
@@ -712,12 +1067,15 @@ def main() -> int:
     migrate_parser.add_argument("--file", help="Source file path")
     migrate_parser.add_argument("--team-dir", help="Team directory (for 'all')")
     migrate_parser.add_argument("--dry-run", action="store_true", help="Don't actually store")
+    migrate_parser.add_argument("--incremental", action="store_true",
+                                help="Only parse sections appended since the last import (bugs, board)")
 
     # annotate
     annotate_parser = subparsers.add_parser("annotate", help="Add code_id annotations to source files")
     annotate_parser.add_argument("path", nargs="?", help="File path or filter pattern (optional)")
     annotate_parser.add_argument("--dry-run", action="store_true", help="Show what would be annotated")
     annotate_parser.add_argument("--deep", action="store_true", help="Also extract nested functions and call relationships")
+    add_profile_arguments(annotate_parser)
 
     # calls
     calls_parser = subparsers.add_parser("calls", help="Query function call relationships")
@@ -725,8 +1083,9 @@ def main() -> int:
     calls_parser.add_argument("--to", dest="to_name", help="Show functions that CALL this function")
     calls_parser.add_argument("--name", help="Filter by callee name (partial match)")
     calls_parser.add_argument("--type", help="Filter by call type (direct, hook, method, etc.)")
-    calls_parser.add_argument("--limit", type=int, default=100, help="Max results")
+    calls_parser.add_argument("--limit", type=int, default=100, help="Max results (0 for all)")
     calls_parser.add_argument("--json", action="store_true", help="Output JSON")
+    add_output_arguments(calls_parser, paging=True)
 
     # tree
     tree_parser = subparsers.add_parser("tree", help="Show call tree for a function")
@@ -735,29 +1094,62 @@ def main() -> int:
     tree_parser.add_argument("--callers", action="store_true", help="Show callers (up) instead of callees (down)")
     tree_parser.add_argument("--json", action="store_true", help="Output JSON")
 
-    args = parser.parse_args()
+    # serve
+    serve_parser = subparsers.add_parser("serve", help="Run commands in a warm daemon (see client.py)")
+    serve_parser.add_argument("--socket", help="Socket path (default: team/cli.sock)")
+
+    # batch
+    batch_parser = subparsers.add_parser("batch", help="Run JSON Lines commands in one process (see batch.py)")
+    batch_parser.add_argument("file", nargs="?", default="-", help="Commands file (default: stdin)")
+    batch_parser.add_argument("--transaction", choices=["batch", "command"], default="batch",
+                              help="One transaction for the whole batch (default) or one per command")
+    batch_parser.add_argument("--fail-fast", action="store_true",
+                              help="Stop at the first failed command (rolls back the whole batch)")
+
+    # perf
+    perf_parser = subparsers.add_parser("perf", help="Check toolbox performance (see perf.py)")
+    perf_actions = perf_parser.add_subparsers(dest="action", required=True)
+
+    startup_parser = perf_actions.add_parser("startup", help="Cold import cost of a command vs. the budget")
+    startup_parser.add_argument("--runs", type=int, default=STARTUP_BENCH_RUNS, help="Cold runs to take the median of")
+    startup_parser.add_argument("--budget-ms", type=float, help="Import budget in ms (default: STARTUP_IMPORT_BUDGET_MS)")
+    startup_parser.add_argument("--json", action="store_true", help="Output JSON")
+    startup_parser.add_argument("argv", nargs=argparse.REMAINDER, help="Command to measure (default: stats)")
+
+    queries_parser = perf_actions.add_parser("queries", help="Slowest statements from the query log (TEAM_QUERY_LOG=1)")
+    queries_parser.add_argument("--sort", choices=["total", "p95", "max", "count"], default="total",
+                                help="Rank statements by (default: total)")
+    queries_parser.add_argument("--top", type=int, default=20, help="Statements to show")
+    queries_parser.add_argument("--file", help="Read a TEAM_QUERY_LOG=*.jsonl file instead of the query_log table")
+    queries_parser.add_argument("--clear", action="store_true", help="Empty the query_log table")
+    queries_parser.add_argument("--json", action="store_true", help="Output JSON")
+
+    validate_parser = perf_actions.add_parser("validate", help="Per-row vs. batch vs. trusted schema validation")
+    validate_parser.add_argument("--rows", type=int, default=VALIDATION_BENCH_ROWS, help="Rows per model")
+    validate_parser.add_argument("--runs", type=int, default=3, help="Repeats per mode (fastest is reported)")
+    validate_parser.add_argument("--json", action="store_true", help="Output JSON")
+
+    _parser = parser
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
 
     if args.command is None:
         parser.print_help()
         return 0
 
-    commands = {
-        "init": cmd_init,
-        "docs": cmd_docs,
-        "bugs": cmd_bugs,
-        "history": cmd_history,
-        "learn": cmd_learn,
-        "board": cmd_board,
-        "stats": cmd_stats,
-        "crawl": cmd_crawl,
-        "migrate": cmd_migrate,
-        "annotate": cmd_annotate,
-        "calls": cmd_calls,
-        "tree": cmd_tree,
-    }
-
-    return commands[args.command](args)
+    return COMMANDS[args.command](args)
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    try:
+        sys.exit(main())
+    except BrokenPipeError:
+        # Streaming into `head` and friends - stop quietly once they close the pipe
+        import os
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
@@ -0,0 +1,91 @@
+"""
+Thin client for the CLI daemon (see daemon.py).
+
+Takes the same arguments as team.toolbox.cli:
+
+    python -m team.toolbox.client board list --limit 5
+    python -m team.toolbox.client docs --symbol WorkbookView
+
+Forwards argv and the working directory to the daemon on team/cli.sock and
+streams its output back. Runs the command in-process when no daemon is
+listening, the daemon reports stale code, or the command must run locally
+(serve, writer).
+"""
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .constants import CLI_SOCKET_FILENAME
+
+# Commands that must run in the caller's own process (see daemon.LOCAL_COMMANDS)
+LOCAL_COMMANDS = frozenset({"serve", "writer", "batch"})
+
+
+def _socket_path() -> Path:
+    """team/cli.sock - same location as daemon.get_cli_socket_path()."""
+    return Path(__file__).parent.parent / CLI_SOCKET_FILENAME
+
+
+def run_remote(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """
+    Run a command through the daemon.
+
+    Returns:
+        The command's exit code, or None if it has to run in-process
+        (no daemon, or the daemon's code is stale).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = socket_path or _socket_path()
+    if not socket_path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return None  # Stale socket file from a daemon that exited
+
+        request = {"argv": argv, "cwd": os.getcwd()}
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+        with sock.makefile("rb") as reader:
+            for line in reader:
+                frame = json.loads(line)
+                if "out" in frame:
+                    sys.stdout.write(frame["out"])
+                    sys.stdout.flush()
+                elif "err" in frame:
+                    sys.stderr.write(frame["err"])
+                    sys.stderr.flush()
+                elif frame.get("stale"):
+                    return None
+                elif "exit" in frame:
+                    return frame["exit"]
+    finally:
+        sock.close()
+
+    print("CLI daemon closed the connection", file=sys.stderr)
+    return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Client entry point."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    if not argv or argv[0] not in LOCAL_COMMANDS:
+        code = run_remote(argv)
+        if code is not None:
+            return code
+
+    from .cli import main as cli_main
+    return cli_main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
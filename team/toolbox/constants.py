@@ -161,6 +161,13 @@ MessageType = Literal[
     "bug", "decision", "learning"
 ]
 
+# Board inbox streams - per-agent read watermarks (board_cursors table)
+VALID_INBOX_STREAMS = [
+    "assignments",     # Assignments mentioning the agent
+    "questions",       # All questions
+    "mentions",        # Any message mentioning the agent
+]
+
 # Function call types for code_calls table
 VALID_CALL_TYPES = [
     "direct",          # Direct function call: foo()
@@ -185,4 +192,48 @@ NestedType = Literal["callback", "arrow", "function", "handler"]
 
 # Database file path (relative to team/)
 DB_FILENAME = "team.db"
-SCHEMA_FILENAME = "schema.sql"
+
+# Rendered board (relative to team/) and how many unresolved messages it shows
+BOARD_MD_FILENAME = "BOARD.md"
+BOARD_RENDER_LIMIT = 50
+
+# Ordered NNNN_name.sql schema migrations (relative to team/toolbox/)
+MIGRATIONS_DIRNAME = "migrations"
+
+# Path classification rules: areas, file types, protected paths (see pathrules.py)
+PATH_RULES_FILENAME = "path_rules.json"   # Relative to team/toolbox/
+PATH_CACHE_SIZE = 65536                   # Classified paths remembered per classifier
+
+# Board subscriptions (see watch.py)
+WATCH_POLL_MIN_S = 0.05            # Check interval right after a message
+WATCH_POLL_MAX_S = 1.0             # Longest idle check interval
+WATCH_BACKOFF = 2.0                # Interval multiplier per idle check
+
+# Board message archive (see archive.py)
+ARCHIVE_DIRNAME = "archive"        # Per-month messages-YYYY-MM.db files (relative to team/)
+ARCHIVE_AFTER_DAYS = 90            # Resolved messages older than this leave the live table
+
+# Nightly rebuild pipeline (see pipeline.py)
+PIPELINE_QUEUE_SIZE = 16           # Parsed files buffered between pipeline stages
+REBUILD_BATCH_FILES = 25           # Files per committed checkpoint (rebuild --resume)
+
+# Write coordination (see writer.py)
+BUSY_TIMEOUT_MS = 5000             # How long SQLite waits on a locked database
+WRITE_MAX_RETRIES = 6              # Retries after busy_timeout is exhausted
+WRITE_RETRY_BASE_DELAY = 0.05      # Seconds, doubled on every retry
+WRITE_RETRY_MAX_DELAY = 2.0        # Cap for a single backoff sleep
+WRITE_CLIENT_MARGIN_S = 10.0       # Client wait beyond the writer's worst case (queue + retries)
+WRITER_SOCKET_FILENAME = "writer.sock"  # Single-writer process socket (relative to team/)
+
+# CLI daemon (see daemon.py / client.py)
+CLI_SOCKET_FILENAME = "cli.sock"   # Daemon socket (relative to team/)
+
+# Startup benchmark (see perf.py - `cli perf startup`)
+STARTUP_IMPORT_BUDGET_MS = 90      # Import time a cold `cli stats` may add over bare `python -c pass`
+STARTUP_BENCH_RUNS = 5             # Fresh processes per measurement (median is reported)
+VALIDATION_BENCH_ROWS = 20000      # Rows per model for `cli perf validate`
+
+# Query log (see querylog.py - TEAM_QUERY_LOG, `cli perf queries`)
+SLOW_QUERY_MS = 25                 # Statements slower than this get EXPLAIN QUERY PLAN
+QUERY_LOG_FLUSH_RECORDS = 500      # Long-running processes (writer) flush at this many records...
+QUERY_LOG_FLUSH_SECONDS = 10.0     # ...or this long after the last flush
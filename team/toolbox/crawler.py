@@ -12,6 +12,9 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict, field
 
+from .instrument import span, timed
+from .pathrules import classify
+
 
 @dataclass
 class Symbol:
@@ -46,40 +49,29 @@ class FileExtraction:
         }
 
 
+# Content patterns for files the path rules don't classify
+_HOOK_EXPORT = re.compile(r"export\s+(?:default\s+)?function\s+use[A-Z]")
+_TYPE_EXPORT = re.compile(r"export\s+(?:type|interface)\s+")
+
+
 def infer_file_type(file_path: str, content: str) -> str:
-    """Infer the file type from path and content."""
-    path = Path(file_path)
-    name = path.stem.lower()
-    parent = path.parent.name.lower()
-
-    # Check path patterns
-    if "test" in name or "spec" in name or parent == "__tests__":
-        return "test"
-    if parent == "api" or "route" in name:
-        return "api"
-    if "page" in name or parent == "app":
-        return "page"
-    if parent == "hooks" or name.startswith("use"):
-        return "hook"
-    if parent == "types" or name == "types":
-        return "type"
-    if parent in ("lib", "utils", "helpers"):
-        return "util"
-    if parent == "config" or name == "config":
-        return "config"
+    """Infer the file type from path ("file_type" rules in path_rules.json) and content."""
+    file_type = classify("file_type", file_path)
+    if file_type:
+        return file_type
 
     # Check content patterns
     if "export default function" in content and "return (" in content:
         return "component"
-    if re.search(r"export\s+(?:default\s+)?function\s+use[A-Z]", content):
+    if _HOOK_EXPORT.search(content):
         return "hook"
     if "createContext" in content or "useContext" in content:
         return "context"
-    if re.search(r"export\s+(?:type|interface)\s+", content):
+    if _TYPE_EXPORT.search(content):
         return "type"
 
     # Default based on extension
-    if path.suffix == ".tsx":
+    if file_path.endswith(".tsx"):
         return "component"
     return "util"
 
@@ -94,6 +86,7 @@ def extract_imports(content: str) -> List[str]:
     return imports
 
 
+@timed("crawler.extract_symbols")
 def extract_symbols_regex(content: str, file_path: str) -> List[Symbol]:
     """Extract symbols using regex (fallback when ts-morph unavailable)."""
     symbols = []
@@ -198,7 +191,8 @@ def extract_file(file_path: str, base_path: Optional[str] = None) -> FileExtract
         )
 
     try:
-        content = path.read_text(encoding="utf-8")
+        with span("crawler.read"):
+            content = path.read_text(encoding="utf-8")
     except Exception as e:
         return FileExtraction(
             file_path=str(file_path),
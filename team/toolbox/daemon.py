@@ -0,0 +1,359 @@
+"""
+CLI daemon: run toolbox commands in one warm, long-lived process.
+
+Every `python -m team.toolbox.cli ...` pays interpreter startup, the
+Pydantic/schema imports, argparse setup, the schema-version check and a cold
+SQLite page cache. The daemon pays them once and then runs each command
+in-process, on one kept-open connection (storage.shared_connection) whose
+page cache stays warm, with call trees answered from a cached
+storage.CallGraphIndex:
+
+    python -m team.toolbox.cli serve                  # foreground
+    python -m team.toolbox.client board list --limit 5
+
+client.py forwards argv and the working directory over team/cli.sock and
+streams stdout/stderr back. With no daemon listening it runs the command
+in-process, so callers can always use the client.
+
+Commands run one at a time: they change directory to the caller's cwd and
+redirect sys.stdout/sys.stderr, both process-wide. SQLite serializes writes
+anyway; reads take a few milliseconds. Anything else that touches those
+streams (parsing `board watch` arguments) takes the same lock.
+
+When any toolbox source file changes, the daemon answers the next request
+with `stale` (the client falls back to in-process) and exits, so it never
+serves old code.
+
+`board watch` is the exception: it streams from one shared WatchHub outside
+the command queue, so any number of agents can watch at the cost of one
+poller.
+
+Protocol (one JSON object per line):
+    -> {"argv": ["board", "list"], "cwd": "/path"}
+    <- {"out": "..."} / {"err": "..."}     any number, in order
+    <- {"exit": 0}                          or {"stale": true}
+"""
+
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from . import querylog
+from .storage import CallGraphIndex, get_db_path, open_connection, shared_connection, use_call_graph_index
+from .watch import WatchHub
+from .constants import CLI_SOCKET_FILENAME
+
+
+class DaemonError(Exception):
+    """CLI daemon could not start or serve."""
+    pass
+
+
+# Flush streamed output at least this often (seconds) or at this size (chars)
+STREAM_FLUSH_INTERVAL = 0.05
+STREAM_FLUSH_SIZE = 8192
+
+# Idle `board watch` streams send an empty frame this often (seconds) to notice
+# clients that have gone away
+WATCH_KEEPALIVE_S = 5.0
+
+# Commands that must run in the caller's own process (batch reads its stdin)
+LOCAL_COMMANDS = frozenset({"serve", "writer", "batch"})
+
+
+def get_cli_socket_path() -> Path:
+    """Get the path to the CLI daemon socket."""
+    return get_db_path().parent / CLI_SOCKET_FILENAME
+
+
+def _source_stamp() -> float:
+    """Latest modification time of the toolbox's code and migrations."""
+    package_dir = Path(__file__).parent
+    paths = list(package_dir.glob("*.py")) + list(package_dir.glob("migrations/*.sql"))
+    return max((p.stat().st_mtime for p in paths), default=0.0)
+
+
+class _StreamWriter(io.TextIOBase):
+    """Text stream that forwards writes to the client as JSON frames."""
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None], key: str):
+        self._send = send
+        self._key = key
+        self._buffer: List[str] = []
+        self._size = 0
+        self._last_flush = time.perf_counter()
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= STREAM_FLUSH_SIZE or (
+            "\n" in text and time.perf_counter() - self._last_flush >= STREAM_FLUSH_INTERVAL
+        ):
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._send({self._key: "".join(self._buffer)})
+            self._buffer = []
+            self._size = 0
+        self._last_flush = time.perf_counter()
+
+
+class CliDaemon:
+    """Serves CLI commands over a local Unix socket."""
+
+    def __init__(self, socket_path: Optional[Path] = None):
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("Unix sockets are not supported on this platform")
+
+        self.socket_path = Path(socket_path or get_cli_socket_path())
+        self.commands = 0
+        self._stamp = _source_stamp()
+        self._run_lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self.watch_hub = WatchHub()
+
+        # Warm connection shared by every command (used under _run_lock)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_file: Optional[tuple] = None  # (st_dev, st_ino) it was opened on
+        self.call_graph: Optional[CallGraphIndex] = None
+
+    def serve_forever(self) -> None:
+        """Listen until shutdown() is called or the process is interrupted."""
+        if _is_listening(self.socket_path):
+            raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        self._warm_up()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                line = self.rfile.readline()
+                if not line.strip():
+                    return
+
+                def send(frame: Dict[str, Any]) -> None:
+                    self.wfile.write(json.dumps(frame).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+                try:
+                    daemon._handle(line, send)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client went away mid-command
+
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        self._server.daemon_threads = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            with self._run_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+    def shutdown(self) -> None:
+        """Stop accepting commands."""
+        if self._server is not None:
+            # shutdown() blocks until serve_forever() returns - never call it
+            # on the thread that runs the loop
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _warm_up(self) -> None:
+        """Import every command module and apply migrations before the first request."""
+        from . import cli, board, session, archive, parser, pathrules, schemas  # noqa: F401
+
+        cli.build_parser()
+        pathrules.get_classifier("area")  # Compiles every classifier
+        with self._run_lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The warm connection (caller holds _run_lock).
+
+        Reopened if team.db was replaced since - a connection keeps reading
+        the file it opened, even after it is deleted or renamed over.
+        """
+        db_path = get_db_path()
+        try:
+            st = os.stat(db_path)
+            current = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            current = None
+        if self._conn is None or current != self._conn_file:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = open_connection(check_same_thread=False)  # Request threads take turns
+            st = os.stat(db_path)
+            self._conn_file = (st.st_dev, st.st_ino)
+            self.call_graph = CallGraphIndex(self._conn)
+        return self._conn
+
+    def _handle(self, line: bytes, send: Callable[[Dict[str, Any]], None]) -> None:
+        """Run one request and stream its output back."""
+        try:
+            request = json.loads(line)
+            argv = [str(arg) for arg in request["argv"]]
+            cwd = request.get("cwd") or os.getcwd()
+        except (ValueError, KeyError, TypeError) as e:
+            send({"err": f"Malformed request: {e}\n"})
+            send({"exit": 2})
+            return
+
+        if argv and argv[0] in LOCAL_COMMANDS:
+            send({"err": f"'{argv[0]}' cannot run inside the daemon\n"})
+            send({"exit": 2})
+            return
+
+        if argv[:2] == ["board", "watch"]:
+            self._watch(argv, send)
+            return
+
+        with self._run_lock:
+            if _source_stamp() != self._stamp:
+                send({"stale": True})
+                self.shutdown()
+                return
+
+            send({"exit": self._run(argv, cwd, send)})
+            self.commands += 1
+            querylog.flush(" ".join(argv))
+
+    def _watch(self, argv: List[str], send: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Stream `board watch` from the shared WatchHub.
+
+        Runs outside the command lock - a watch lasts until the client leaves,
+        and every watching client shares the hub's one poller.
+        """
+        from .cli import build_parser, format_watch_line, output_format, watch_filters
+
+        # argparse writes errors to sys.stderr - swap it only while no command
+        # has it redirected
+        err = io.StringIO()
+        try:
+            with self._run_lock, redirect_stderr(err):
+                args = build_parser().parse_args(argv)
+        except SystemExit as e:
+            send({"err": err.getvalue()})
+            send({"exit": e.code if isinstance(e.code, int) else 2})
+            return
+
+        types, mentions = watch_filters(args)
+        fmt = output_format(args)
+        deadline = None if args.timeout is None else time.monotonic() + args.timeout
+        delivered = 0
+
+        sub = self.watch_hub.subscribe(types, mentions, since_id=args.after_id)
+        try:
+            while not args.count or delivered < args.count:
+                wait = WATCH_KEEPALIVE_S
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        break
+                message = sub.get(timeout=wait)
+                if message is None:
+                    send({"out": ""})  # Keepalive - raises once the client is gone
+                    continue
+                send({"out": format_watch_line(message, fmt) + "\n"})
+                delivered += 1
+        finally:
+            self.watch_hub.unsubscribe(sub)
+        send({"exit": 0})
+
+    def _run(self, argv: List[str], cwd: str, send: Callable[[Dict[str, Any]], None]) -> int:
+        """Run cli.main(argv) in cwd with stdout/stderr streamed to the client."""
+        from .cli import main
+
+        out = _StreamWriter(send, "out")
+        err = _StreamWriter(send, "err")
+        saved = (sys.stdout, sys.stderr, os.getcwd())
+
+        sys.stdout, sys.stderr = out, err
+        try:
+            try:
+                os.chdir(cwd)
+                with shared_connection(transaction=False, conn=self._connection()), \
+                        use_call_graph_index(self.call_graph):
+                    code = main(argv)
+            except SystemExit as e:
+                if e.code is None:
+                    code = 0
+                elif isinstance(e.code, int):
+                    code = e.code
+                else:
+                    print(e.code, file=sys.stderr)
+                    code = 1
+            except Exception:
+                traceback.print_exc()
+                code = 1
+        finally:
+            sys.stdout, sys.stderr = saved[0], saved[1]
+            os.chdir(saved[2])
+            out.flush()
+            err.flush()
+
+        return code or 0
+
+
+def _is_listening(socket_path: Path) -> bool:
+    """True if a daemon accepts connections on socket_path."""
+    if not socket_path.exists():
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve_daemon(socket_path: Optional[str] = None) -> int:
+    """CLI entry point for the daemon."""
+    daemon = CliDaemon(Path(socket_path) if socket_path else None)
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Treat SIGTERM like Ctrl+C so the socket file is removed on exit
+    signal.signal(signal.SIGTERM, _stop)
+
+    print(f"CLI daemon listening on {daemon.socket_path}", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"CLI daemon stopped after {daemon.commands} commands")
+    return 0
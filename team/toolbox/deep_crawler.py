@@ -12,6 +12,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 
 from .crawler import Symbol, extract_symbols_regex
+from .instrument import timed
 
 
 @dataclass
@@ -35,6 +36,7 @@ class FunctionCall:
     line_number: int
 
 
+@timed("deep_crawler.extract_nested")
 def extract_nested_functions(
     source: str,
     parent: Symbol,
@@ -211,6 +213,7 @@ def find_arrow_end(body: str, start_pos: int, base_line: int) -> int:
     return base_line + body[:start_pos].count('\n') + 10
 
 
+@timed("deep_crawler.extract_calls")
 def extract_function_calls(
     source: str,
     symbol: Symbol,
@@ -0,0 +1,307 @@
+"""
+Lightweight instrumentation: timers, counters and spans.
+
+Off by default - span() and count() return immediately unless enable() has
+been called, so the hooks can stay in hot paths (regex extraction, DB
+connects) permanently.
+
+Usage:
+    from .instrument import span, count, timed
+
+    with span("crawler.read", file=rel_path):
+        source = path.read_text()
+
+    @timed("deep_crawler.extract_calls")
+    def extract_function_calls(...): ...
+
+    count("annotator.docs_created")
+
+Reporting (what `--profile` does):
+    enable(trace=True)
+    ... run ...
+    print(report())
+    write_trace("rebuild.trace.json")   # open in chrome://tracing or Perfetto
+"""
+
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+@dataclass
+class TimerStats:
+    """Aggregate timing for one span name."""
+    count: int = 0
+    total: float = 0.0   # Seconds
+    max: float = 0.0
+
+
+_enabled = False
+_tracing = False
+_lock = threading.Lock()
+_timers: Dict[str, TimerStats] = {}
+_counters: Dict[str, int] = {}
+_events: List[Dict[str, Any]] = []
+_thread_names: Dict[int, str] = {}
+_epoch = time.perf_counter()
+
+
+def enable(trace: bool = False) -> None:
+    """Start collecting timers/counters (and Chrome trace events if trace)."""
+    global _enabled, _tracing
+    _enabled = True
+    _tracing = trace
+
+
+def disable() -> None:
+    """Stop collecting. Collected data is kept until reset()."""
+    global _enabled, _tracing
+    _enabled = False
+    _tracing = False
+
+
+def is_enabled() -> bool:
+    """Whether instrumentation is collecting."""
+    return _enabled
+
+
+def reset() -> None:
+    """Drop all collected timers, counters and trace events."""
+    global _epoch
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _events.clear()
+        _thread_names.clear()
+        _epoch = time.perf_counter()
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+class _NullSpan:
+    """Shared no-op context manager used while disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times a block and records it under name (and as a trace event)."""
+
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        elapsed = end - self.start
+        with _lock:
+            stats = _timers.get(self.name)
+            if stats is None:
+                stats = _timers[self.name] = TimerStats()
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+
+            if _tracing:
+                tid = threading.get_ident()
+                if tid not in _thread_names:
+                    _thread_names[tid] = threading.current_thread().name
+                event = {
+                    "name": self.name,
+                    "cat": self.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": (self.start - _epoch) * 1e6,
+                    "dur": elapsed * 1e6,
+                    "pid": os.getpid(),
+                    "tid": tid,
+                }
+                if self.args:
+                    event["args"] = self.args
+                _events.append(event)
+        return False
+
+
+def span(name: str, **args: Any):
+    """
+    Time a block of code.
+
+    Args:
+        name: Dotted phase name - the part before the first dot is the
+              category in the report and trace (e.g. "storage.connect")
+        **args: Extra details attached to the trace event
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator form of span(); defaults to module.function as the name."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    """Increment a counter."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Snapshot of collected data.
+
+    Returns:
+        {timers: {name: {count, total_ms, avg_ms, max_ms}}, counters: {name: n}}
+    """
+    with _lock:
+        timers = {
+            name: {
+                "count": s.count,
+                "total_ms": round(s.total * 1000, 3),
+                "avg_ms": round(s.total * 1000 / s.count, 3) if s.count else 0.0,
+                "max_ms": round(s.max * 1000, 3),
+            }
+            for name, s in _timers.items()
+        }
+        counters = dict(_counters)
+    return {"timers": timers, "counters": counters}
+
+
+def report() -> str:
+    """Per-phase breakdown, slowest first, grouped by category."""
+    stats = get_stats()
+    timers = stats["timers"]
+    if not timers and not stats["counters"]:
+        return "No instrumentation data collected."
+
+    lines = ["Profile", "=" * 78]
+    lines.append(f"{'phase':<40} {'calls':>8} {'total ms':>10} {'avg ms':>8} {'max ms':>8}")
+    lines.append("-" * 78)
+
+    by_category: Dict[str, List[str]] = {}
+    for name in timers:
+        by_category.setdefault(name.split(".", 1)[0], []).append(name)
+
+    category_totals = {
+        category: sum(timers[n]["total_ms"] for n in names)
+        for category, names in by_category.items()
+    }
+    for category in sorted(by_category, key=category_totals.get, reverse=True):
+        for name in sorted(by_category[category], key=lambda n: timers[n]["total_ms"], reverse=True):
+            t = timers[name]
+            lines.append(
+                f"{name:<40} {t['count']:>8} {t['total_ms']:>10.1f} {t['avg_ms']:>8.2f} {t['max_ms']:>8.1f}"
+            )
+
+    if stats["counters"]:
+        lines.append("")
+        lines.append("Counters")
+        lines.append("-" * 78)
+        for name, value in sorted(stats["counters"].items()):
+            lines.append(f"{name:<40} {value:>8}")
+
+    lines.append("")
+    lines.append("Nested spans overlap - totals of a parent include its children.")
+    return "\n".join(lines)
+
+
+def write_trace(path: Union[str, Path]) -> int:
+    """
+    Write collected spans as Chrome trace_event JSON.
+
+    Open the file in chrome://tracing or https://ui.perfetto.dev.
+
+    Returns:
+        Number of events written.
+    """
+    with _lock:
+        events = list(_events)
+        thread_names = dict(_thread_names)
+
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+        for tid, name in thread_names.items()
+    ]
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+@contextmanager
+def profiling(
+    enabled: bool = True,
+    trace_path: Optional[Union[str, Path]] = None,
+    cprofile_path: Optional[Union[str, Path]] = None,
+) -> Iterator[None]:
+    """
+    Collect instrumentation for the enclosed block and report at the end.
+
+    Prints report() to stdout, writes a Chrome trace when trace_path is set
+    and a cProfile dump (readable with `python -m pstats`) when
+    cprofile_path is set. Does nothing if none of them are requested.
+    """
+    if not (enabled or trace_path or cprofile_path):
+        yield
+        return
+
+    reset()
+    enable(trace=bool(trace_path))
+    profiler = cProfile.Profile() if cprofile_path else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(str(cprofile_path))
+        disable()
+
+        print()
+        print(report())
+        if trace_path:
+            written = write_trace(trace_path)
+            print(f"\nWrote {written} trace events to {trace_path}")
+        if cprofile_path:
+            print(f"Wrote cProfile stats to {cprofile_path}")
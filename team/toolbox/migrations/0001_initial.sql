@@ -1,5 +1,19 @@
 -- Team Knowledge Base Schema
 -- SQLite database for code documentation, bug tracking, and team coordination
+--
+-- Migration 0001: baseline schema. Uses IF NOT EXISTS throughout so it can be
+-- applied to databases created before schema versioning existed.
+
+-- =============================================================================
+-- SCHEMA VERSIONING
+-- =============================================================================
+
+-- One row per applied migration (PRAGMA user_version holds the latest)
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,            -- 1, 2, 3... (from NNNN_name.sql)
+    name TEXT NOT NULL,                     -- 0001_initial
+    applied_at TEXT DEFAULT (datetime('now'))
+);
 
 -- =============================================================================
 -- FOUNDATION: Code Documentation
@@ -0,0 +1,34 @@
+-- Migration 0002: checkpoints for resumable nightly rebuilds
+-- (python -m team.toolbox.rebuild --resume)
+
+-- One row per rebuild run; updated after every committed batch of files
+CREATE TABLE IF NOT EXISTS rebuild_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL DEFAULT 'running', -- running, done, failed, abandoned
+    phase TEXT NOT NULL DEFAULT 'annotate', -- annotate, calls, orphans, done
+    src_dir TEXT NOT NULL,
+    last_file TEXT,                         -- Last committed file (src/... path, sorted order)
+    files_done INTEGER DEFAULT 0,
+    counts TEXT,                            -- JSON: totals so far (annotated, created, ...)
+    error TEXT,                             -- Last error if status = 'failed'
+    started_at TEXT DEFAULT (datetime('now')),
+    updated_at TEXT DEFAULT (datetime('now')),
+    finished_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_rebuild_runs_status ON rebuild_runs(status);
+
+-- Call edges found so far by a run, committed with its checkpoints and
+-- applied to code_calls (via sync_calls) once every file has been processed
+CREATE TABLE IF NOT EXISTS rebuild_edges (
+    run_id INTEGER NOT NULL,
+    caller_id INTEGER NOT NULL,
+    callee_id INTEGER,
+    callee_name TEXT NOT NULL,
+    call_type TEXT DEFAULT 'direct',
+    line_number INTEGER,
+
+    FOREIGN KEY (run_id) REFERENCES rebuild_runs(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rebuild_edges_run ON rebuild_edges(run_id);
@@ -0,0 +1,20 @@
+-- Migration 0003: content hashes for idempotent markdown imports
+-- (python -m team.toolbox.cli migrate ...)
+
+-- One row per record imported from a markdown file. record_key is the
+-- record's natural key within its source (bug id, message timestamp,
+-- ordinal within a category ...); content_hash tells a rerun whether the
+-- target row needs updating.
+CREATE TABLE IF NOT EXISTS import_records (
+    source TEXT NOT NULL,                   -- Source file name (BOARD_HISTORY.md, CLAUDE.md#learnings ...)
+    record_key TEXT NOT NULL,
+    target_table TEXT NOT NULL,             -- bugs, messages, learnings, decisions
+    target_id TEXT NOT NULL,                -- Primary key of the row in target_table
+    content_hash TEXT NOT NULL,             -- sha1 of the imported column values
+    imported_at TEXT DEFAULT (datetime('now')),
+    updated_at TEXT DEFAULT (datetime('now')),
+
+    PRIMARY KEY (source, record_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_records_target ON import_records(target_table, target_id);
@@ -0,0 +1,15 @@
+-- Migration 0004: per-file progress for incremental markdown imports
+-- (python -m team.toolbox.cli migrate ... --incremental)
+
+-- One row per source file. imported_hash covers bytes [0, imported_size);
+-- if they are unchanged, the next incremental run seeks to tail_offset (the
+-- start of the last imported section, which may since have grown) and only
+-- parses from there.
+CREATE TABLE IF NOT EXISTS import_sources (
+    source TEXT PRIMARY KEY,                -- Same name as import_records.source
+    path TEXT NOT NULL,                     -- File last imported from
+    imported_size INTEGER NOT NULL,         -- Bytes imported
+    imported_hash TEXT NOT NULL,            -- sha1 of bytes [0, imported_size)
+    tail_offset INTEGER NOT NULL,           -- Start of the last imported section
+    updated_at TEXT DEFAULT (datetime('now'))
+);
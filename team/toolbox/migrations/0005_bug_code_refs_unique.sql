@@ -0,0 +1,10 @@
+-- Migration 0005: one bug_code_refs row per (bug, code doc, relationship)
+-- so bulk linking can use INSERT OR IGNORE
+
+DELETE FROM bug_code_refs
+WHERE id NOT IN (
+    SELECT MIN(id) FROM bug_code_refs GROUP BY bug_id, code_doc_id, relationship
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_bug_code_refs_unique
+    ON bug_code_refs(bug_id, code_doc_id, relationship);
@@ -0,0 +1,27 @@
+-- Migration 0006: named ID sequences (storage.next_sequence_value)
+-- BUG-NNN ids are allocated with one atomic UPDATE ... RETURNING instead of
+-- scanning the bugs table or borrowing a messages rowid.
+
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name TEXT PRIMARY KEY,                  -- Sequence name, e.g. 'BUG'
+    value INTEGER NOT NULL,                 -- Last value handed out
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+
+-- Start after the highest existing BUG-NNN
+INSERT OR IGNORE INTO id_sequences (name, value)
+SELECT 'BUG', COALESCE(MAX(CAST(SUBSTR(id, 5) AS INTEGER)), 0)
+FROM bugs
+WHERE id GLOB 'BUG-[0-9]*';
+
+-- Bugs stored with an explicit id (markdown imports, store_bug with an id)
+-- push the sequence past it, so allocated ids never collide
+CREATE TRIGGER IF NOT EXISTS trg_bugs_id_sequence
+AFTER INSERT ON bugs
+WHEN NEW.id GLOB 'BUG-[0-9]*'
+BEGIN
+    UPDATE id_sequences
+    SET value = CAST(SUBSTR(NEW.id, 5) AS INTEGER),
+        updated_at = datetime('now')
+    WHERE name = 'BUG' AND value < CAST(SUBSTR(NEW.id, 5) AS INTEGER);
+END;
@@ -0,0 +1,16 @@
+-- Migration 0007: opt-in query log (querylog.py, TEAM_QUERY_LOG=1)
+-- One row per timed statement; `cli perf queries` aggregates it.
+
+CREATE TABLE IF NOT EXISTS query_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sql TEXT NOT NULL,                      -- Statement text, whitespace collapsed
+    params TEXT,                            -- Parameter shape, e.g. "(int, str)" or "120 x (int)"
+    duration_ms REAL NOT NULL,
+    statements INTEGER,                     -- Statements SQLite ran (implicit BEGIN, triggers)
+    caller TEXT,                            -- module.function that issued it
+    plan TEXT,                              -- EXPLAIN QUERY PLAN, only above SLOW_QUERY_MS
+    command TEXT,                           -- CLI arguments of the logging process
+    logged_at TEXT DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_log_sql ON query_log(sql);
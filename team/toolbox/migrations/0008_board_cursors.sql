@@ -0,0 +1,48 @@
+-- Migration 0008: per-agent inbox watermarks (Board.inbox / mark_read / unread_count)
+-- One row per (agent, stream). last_seen_id is the highest message id the
+-- agent has read; unread is kept current by the triggers below, so an unread
+-- count is a primary-key lookup.
+--
+-- Streams (VALID_INBOX_STREAMS) - keep the conditions in sync with board.INBOX_STREAMS:
+--   assignments   assignments mentioning the agent
+--   questions     all questions
+--   mentions      any message mentioning the agent
+-- An agent's own messages are never unread.
+
+CREATE TABLE IF NOT EXISTS board_cursors (
+    agent TEXT NOT NULL,                    -- Queen, Fizz, Buzz, Pazz, Rizz
+    stream TEXT NOT NULL,                   -- assignments, questions, mentions
+    last_seen_id INTEGER NOT NULL DEFAULT 0,
+    unread INTEGER NOT NULL DEFAULT 0,      -- Matching messages above last_seen_id
+    updated_at TEXT DEFAULT (datetime('now')),
+    PRIMARY KEY (agent, stream)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_board_cursors_insert
+AFTER INSERT ON messages
+BEGIN
+    UPDATE board_cursors
+    SET unread = unread + 1
+    WHERE NEW.id > last_seen_id
+      AND NEW.author != agent
+      AND (
+          (stream = 'assignments' AND NEW.message_type = 'assignment' AND NEW.mentions LIKE '%@' || agent || '%')
+          OR (stream = 'questions' AND NEW.message_type = 'question')
+          OR (stream = 'mentions' AND NEW.mentions LIKE '%@' || agent || '%')
+      );
+END;
+
+-- Deleted or archived before being read
+CREATE TRIGGER IF NOT EXISTS trg_board_cursors_delete
+AFTER DELETE ON messages
+BEGIN
+    UPDATE board_cursors
+    SET unread = MAX(unread - 1, 0)
+    WHERE OLD.id > last_seen_id
+      AND OLD.author != agent
+      AND (
+          (stream = 'assignments' AND OLD.message_type = 'assignment' AND OLD.mentions LIKE '%@' || agent || '%')
+          OR (stream = 'questions' AND OLD.message_type = 'question')
+          OR (stream = 'mentions' AND OLD.mentions LIKE '%@' || agent || '%')
+      );
+END;
@@ -0,0 +1,9 @@
+-- Migration 0009: newest-unresolved-first index for the board
+-- render_board_md(), get_my_assignments() and get_open_questions() read the newest unresolved
+-- messages. With only idx_messages_resolved SQLite read every unresolved row
+-- and sorted them; (resolved, created_at) walks the newest ones and stops.
+-- It also serves every lookup idx_messages_resolved did.
+
+CREATE INDEX IF NOT EXISTS idx_messages_resolved_created ON messages(resolved, created_at);
+
+DROP INDEX IF EXISTS idx_messages_resolved;
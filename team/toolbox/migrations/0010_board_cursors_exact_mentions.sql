@@ -0,0 +1,78 @@
+-- Migration 0010: exact mention matching and an UPDATE trigger for board_cursors
+-- 0008 matched mentions with LIKE '%@' || agent || '%', so @FizzBot counted
+-- for Fizz. Mentions are a JSON array of '@Name' strings; match one element
+-- exactly instead - the same conditions as board.INBOX_STREAMS.
+-- 0008 also had no UPDATE trigger, so re-imports that rewrite message_type,
+-- mentions or author (bulk_import) left unread counts drifting.
+
+DROP TRIGGER IF EXISTS trg_board_cursors_insert;
+DROP TRIGGER IF EXISTS trg_board_cursors_delete;
+
+CREATE TRIGGER trg_board_cursors_insert
+AFTER INSERT ON messages
+BEGIN
+    UPDATE board_cursors
+    SET unread = unread + 1
+    WHERE NEW.id > last_seen_id
+      AND NEW.author != agent
+      AND (
+          (stream = 'assignments' AND NEW.message_type = 'assignment'
+           AND EXISTS (SELECT 1 FROM json_each(NEW.mentions) WHERE value = '@' || agent))
+          OR (stream = 'questions' AND NEW.message_type = 'question')
+          OR (stream = 'mentions'
+              AND EXISTS (SELECT 1 FROM json_each(NEW.mentions) WHERE value = '@' || agent))
+      );
+END;
+
+-- Deleted or archived before being read
+CREATE TRIGGER trg_board_cursors_delete
+AFTER DELETE ON messages
+BEGIN
+    UPDATE board_cursors
+    SET unread = MAX(unread - 1, 0)
+    WHERE OLD.id > last_seen_id
+      AND OLD.author != agent
+      AND (
+          (stream = 'assignments' AND OLD.message_type = 'assignment'
+           AND EXISTS (SELECT 1 FROM json_each(OLD.mentions) WHERE value = '@' || agent))
+          OR (stream = 'questions' AND OLD.message_type = 'question')
+          OR (stream = 'mentions'
+              AND EXISTS (SELECT 1 FROM json_each(OLD.mentions) WHERE value = '@' || agent))
+      );
+END;
+
+-- Rewritten before being read: uncount the old row if it matched, count the new one
+CREATE TRIGGER trg_board_cursors_update
+AFTER UPDATE OF author, message_type, mentions ON messages
+BEGIN
+    UPDATE board_cursors
+    SET unread = MAX(unread
+        - (OLD.author != agent AND (
+              (stream = 'assignments' AND OLD.message_type = 'assignment'
+               AND EXISTS (SELECT 1 FROM json_each(OLD.mentions) WHERE value = '@' || agent))
+              OR (stream = 'questions' AND OLD.message_type = 'question')
+              OR (stream = 'mentions'
+                  AND EXISTS (SELECT 1 FROM json_each(OLD.mentions) WHERE value = '@' || agent))))
+        + (NEW.author != agent AND (
+              (stream = 'assignments' AND NEW.message_type = 'assignment'
+               AND EXISTS (SELECT 1 FROM json_each(NEW.mentions) WHERE value = '@' || agent))
+              OR (stream = 'questions' AND NEW.message_type = 'question')
+              OR (stream = 'mentions'
+                  AND EXISTS (SELECT 1 FROM json_each(NEW.mentions) WHERE value = '@' || agent)))), 0)
+    WHERE NEW.id > last_seen_id;
+END;
+
+-- Counts kept by the old triggers may include prefix matches - recount
+UPDATE board_cursors
+SET unread = (
+    SELECT COUNT(*) FROM messages m
+    WHERE m.id > board_cursors.last_seen_id
+      AND m.author != board_cursors.agent
+      AND (
+          (board_cursors.stream = 'assignments' AND m.message_type = 'assignment'
+           AND EXISTS (SELECT 1 FROM json_each(m.mentions) WHERE value = '@' || board_cursors.agent))
+          OR (board_cursors.stream = 'questions' AND m.message_type = 'question')
+          OR (board_cursors.stream = 'mentions'
+              AND EXISTS (SELECT 1 FROM json_each(m.mentions) WHERE value = '@' || board_cursors.agent))
+      )
+);
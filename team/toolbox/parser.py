@@ -9,15 +9,19 @@ Parses:
 - CLAUDE.md decisions → decisions table
 """
 
+import hashlib
+import itertools
+import os
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 
 from .storage import (
-    store_bug,
+    bulk_import,
+    get_import_source,
+    save_import_source,
     store_changelog,
-    store_learning,
     store_code_doc,
     query_code_docs,
     get_connection,
@@ -25,179 +29,416 @@ from .storage import (
 from .schemas import BugInput, ChangelogInput, LearningInput, MessageInput
 
 
+# =============================================================================
+# SOURCE READING
+# =============================================================================
+
+# Section headers an incremental import can resume at (matched on raw lines)
+BUG_SECTION = re.compile(rb"### (?:BUG|IMP)-\d+:")
+HISTORY_SECTION = re.compile(rb"### \d{4}-\d{2}-\d{2}\s*$")
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def iter_lines(file_path: str) -> Iterator[str]:
+    """Stream a text file's lines without their line endings."""
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+class SourceReader:
+    """
+    Streams the lines of a markdown file in one pass, skipping what a
+    previous import already covered.
+
+    In incremental mode the bytes recorded as imported are hashed (not
+    parsed) and, if unchanged, reading resumes at the start of the last
+    imported section - it may have grown since, e.g. more messages under
+    the same date. Any change before that point means a full re-parse.
+
+    After iteration, `digest` (sha1 of the whole file), `size` and
+    `tail_offset` (start of the last section header) describe the file
+    for save_import_source().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        source: str,
+        section: "re.Pattern[bytes]",
+        incremental: bool = False,
+    ):
+        self.path = path
+        self.source = source
+        self.section = section
+        self.start = 0
+        self.size = 0
+        self.digest = ""
+        self.tail_offset = 0
+        self.full_reparse = False  # Incremental import fell back to a full parse
+
+        self._hasher = hashlib.sha1()
+        self._hashed = 0   # Bytes already fed to _hasher
+
+        state = get_import_source(source) if incremental else None
+        if state:
+            self._resume(state)
+
+    def _resume(self, state: Dict[str, Any]) -> None:
+        """Hash the previously imported bytes and resume if they still match."""
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < state["imported_size"]:
+                self.full_reparse = True  # Shorter than the last import
+                return
+
+            remaining = state["imported_size"]
+            while remaining > 0:
+                chunk = f.read(min(remaining, HASH_CHUNK_SIZE))
+                if not chunk:
+                    break
+                self._hasher.update(chunk)
+                remaining -= len(chunk)
+
+        if remaining == 0 and self._hasher.hexdigest() == state["imported_hash"]:
+            self.start = state["tail_offset"]
+            self._hashed = state["imported_size"]
+        else:
+            self.full_reparse = True  # Changed before the last imported section
+            self._hasher = hashlib.sha1()
+
+    def __iter__(self) -> Iterator[str]:
+        offset = self.start
+        self.tail_offset = self.start
+        with open(self.path, "rb") as f:
+            f.seek(self.start)
+            for raw in f:
+                end = offset + len(raw)
+                if end > self._hashed:
+                    self._hasher.update(raw[max(0, self._hashed - offset):])
+                    self._hashed = end
+                if self.section.match(raw):
+                    self.tail_offset = offset
+                offset = end
+
+                # Same newline handling as read_text(): \r\n and \r end lines
+                line = raw.decode("utf-8").rstrip("\n")
+                if line.endswith("\r"):
+                    line = line[:-1]
+                if "\r" in line:
+                    yield from line.split("\r")
+                else:
+                    yield line
+
+        self.size = offset
+        self.digest = self._hasher.hexdigest()
+
+
+def _import_source(
+    reader: SourceReader,
+    table: str,
+    records: List[Tuple[str, Dict[str, Any]]],
+    dry_run: bool,
+) -> Dict[str, int]:
+    """
+    bulk_import() records and record the file's progress in one transaction.
+
+    counts["full_reparse"] is 1 when an incremental import found the file
+    changed before its last imported section and parsed it whole.
+    """
+    if dry_run:
+        counts = bulk_import(reader.source, table, records, dry_run=True, complete=reader.start == 0)
+    else:
+        conn = get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = bulk_import(reader.source, table, records, conn=conn, complete=reader.start == 0)
+                save_import_source(
+                    conn, reader.source, str(reader.path),
+                    reader.size, reader.digest, reader.tail_offset,
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+    counts["full_reparse"] = int(reader.full_reparse)
+    return counts
+
+
+def record_key(*parts: Optional[str], text: str) -> str:
+    """
+    Stable import key: the given parts plus a short hash of the record's text.
+
+    Keys must not depend on where a record sits in its file - inserting an
+    entry above others would shift every key and make bulk_import() update
+    rows with other records' content. An edited record gets a new key in
+    the same group; a full import hands it the row of the key that vanished.
+    """
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return ":".join([*(part or "" for part in parts), digest])
+
+
 # =============================================================================
 # BUGS.MD PARSER
 # =============================================================================
 
+BUG_HEADER = re.compile(r"### ((?:BUG|IMP)-\d+):\s*(.*?)\s*$")
+
+# **Label** anywhere in a line
+BOLD_LABEL = re.compile(r"\*\*([^*]+)\*\*")
+
+# Single-line fields: label -> pattern applied right after **Label**
+BUG_FIELDS = {
+    "status": re.compile(r":\s*`?([^`]+)"),
+    "priority": re.compile(r":\s*`?([^`]+)"),
+    "area": re.compile(r":\s*(\w+)"),
+    "assigned": re.compile(r":\s*(\w+(?:\s+\w+)?)"),
+    "owner": re.compile(r":\s*(\w+(?:\s+\w+)?)"),
+    "found by": re.compile(r":\s*(.+)"),
+    "verified by": re.compile(r":\s*(.+)"),
+}
+
+# Multi-line sections: run from **Label** to the next line starting with
+# **, --- or ###
+BUG_SECTIONS = frozenset({
+    "description",
+    "expected behavior",
+    "root cause found",
+    "root cause",
+    "fix applied",
+    "files changed",
+    "acceptance criteria",
+})
+SECTION_END = ("**", "---", "###")
+SECTION_LEAD = re.compile(r":?\s*")
+
+FILE_REF = re.compile(r"`([^`]+\.(?:tsx?|css|sql|md))[^`]*`")
+CHECKBOX_ITEM = re.compile(r"- \[[ x]\]\s*(.+)")
+
+OWNER_NAMES = {
+    "fizz": "Fizz",
+    "buzz": "Buzz",
+    "pazz": "Pazz",
+    "rizz": "Rizz",
+    "queen": "Queen Bee",
+    "queen bee": "Queen Bee",
+}
+
+
 def parse_bugs_md(file_path: str) -> List[Dict[str, Any]]:
     """
     Parse BUGS.md and extract all bug entries.
 
     Returns list of dicts ready for store_bug().
     """
-    content = Path(file_path).read_text(encoding="utf-8")
-    bugs = []
+    return list(iter_bugs(iter_lines(file_path)))
 
-    # Split by bug headers (### BUG-XXX or ### IMP-XXX)
-    bug_pattern = r"^### ((?:BUG|IMP)-\d+):\s*(.+?)$"
 
-    # Find all bug sections
-    sections = re.split(r"(?=^### (?:BUG|IMP)-\d+:)", content, flags=re.MULTILINE)
+def iter_bugs(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse bug entries from BUGS.md lines, yielding each as it completes.
 
-    for section in sections:
-        if not section.strip():
-            continue
+    Only the lines of the current ### BUG-XXX / ### IMP-XXX section are
+    held in memory. Anything before the first bug header is ignored.
+    """
+    header = None
+    body: List[str] = []
 
-        # Extract bug ID and title
-        header_match = re.match(bug_pattern, section, re.MULTILINE)
-        if not header_match:
-            continue
+    for line in lines:
+        match = BUG_HEADER.match(line)
+        if match:
+            if header:
+                yield _build_bug(header.group(1), header.group(2), body)
+            header = match
+            body = []
+        elif header:
+            body.append(line)
 
-        bug_id = header_match.group(1)
-        title = header_match.group(2).strip()
-
-        bug = {
-            "id": bug_id,
-            "title": title,
-            "status": "done",  # Default, will be overwritten
-            "priority": "medium",
-            "area": None,
-            "owner": None,
-            "trivial": False,
-            "description": None,
-            "expected_behavior": None,
-            "root_cause": None,
-            "fix_applied": None,
-            "files_changed": [],
-            "acceptance_criteria": [],
-            "found_by": None,
-            "verified_by": None,
-        }
+    if header:
+        yield _build_bug(header.group(1), header.group(2), body)
 
-        # Extract fields
-        bug["status"] = extract_field(section, r"\*\*Status\*\*:\s*`?([^`\n]+)`?")
-        bug["priority"] = extract_field(section, r"\*\*Priority\*\*:\s*`?([^`\n]+)`?") or "medium"
-        bug["area"] = extract_field(section, r"\*\*Area\*\*:\s*(\w+)")
-        bug["owner"] = extract_field(section, r"\*\*(?:Assigned|Owner)\*\*:\s*(\w+(?:\s+\w+)?)")
-        bug["found_by"] = extract_field(section, r"\*\*Found by\*\*:\s*(.+?)(?:\n|$)")
-        bug["verified_by"] = extract_field(section, r"\*\*Verified by\*\*:\s*(.+?)(?:\n|$)")
-
-        # Extract multi-line sections
-        bug["description"] = extract_section(section, "Description")
-        bug["expected_behavior"] = extract_section(section, "Expected Behavior")
-        bug["root_cause"] = extract_section(section, "Root Cause Found") or extract_section(section, "Root Cause")
-        bug["fix_applied"] = extract_section(section, "Fix Applied")
-
-        # Extract files changed
-        files_section = extract_section(section, "Files Changed")
-        if files_section:
-            # Match file paths like `src/path/file.tsx` or `src/path/file.tsx:123`
-            bug["files_changed"] = re.findall(r"`([^`]+\.(?:tsx?|css|sql|md))[^`]*`", files_section)
-
-        # Extract acceptance criteria
-        criteria_section = extract_section(section, "Acceptance Criteria")
-        if criteria_section:
-            # Match checkbox items
-            criteria = re.findall(r"- \[[ x]\]\s*(.+?)(?:\n|$)", criteria_section)
-            bug["acceptance_criteria"] = criteria
-
-        # Normalize status
-        status = bug["status"].lower() if bug["status"] else "done"
-        if "done" in status or "complete" in status:
-            bug["status"] = "done"
-        elif "progress" in status:
-            bug["status"] = "in_progress"
-        elif "review" in status:
-            bug["status"] = "review"
-        elif "invalid" in status:
-            bug["status"] = "done"  # Treat invalid as closed
-        else:
-            bug["status"] = "open"
-
-        # Normalize priority
-        priority = bug["priority"].lower() if bug["priority"] else "medium"
-        if "critical" in priority:
-            bug["priority"] = "critical"
-        elif "high" in priority:
-            bug["priority"] = "high"
-        elif "low" in priority:
-            bug["priority"] = "low"
-        else:
-            bug["priority"] = "medium"
-
-        # Normalize owner
-        owner_map = {
-            "fizz": "Fizz",
-            "buzz": "Buzz",
-            "pazz": "Pazz",
-            "rizz": "Rizz",
-            "queen": "Queen Bee",
-            "queen bee": "Queen Bee",
-        }
-        if bug["owner"]:
-            bug["owner"] = owner_map.get(bug["owner"].lower(), bug["owner"])
 
-        bugs.append(bug)
+def _scan_bug_body(lines: List[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Collect **Label** fields and sections of one bug in a single pass.
 
-    return bugs
+    The first occurrence of each label wins.
 
+    Returns:
+        (fields, sections) keyed by lower-case label.
+    """
+    fields: Dict[str, str] = {}
+    sections: Dict[str, List[str]] = {}
+    open_sections: List[List[str]] = []
+
+    for line in lines:
+        if open_sections:
+            if line.startswith(SECTION_END):
+                open_sections = []
+            else:
+                for collected in open_sections:
+                    collected.append(line)
 
-def extract_field(text: str, pattern: str) -> Optional[str]:
-    """Extract a single-line field value."""
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    return None
+        if "**" not in line:
+            continue
+
+        for match in BOLD_LABEL.finditer(line):
+            label = match.group(1).lower()
+            rest = line[match.end():]
+
+            pattern = BUG_FIELDS.get(label)
+            if pattern is not None and label not in fields:
+                value = pattern.match(rest)
+                if value:
+                    fields[label] = value.group(1).strip()
+
+            if label in BUG_SECTIONS and label not in sections:
+                collected = [rest[SECTION_LEAD.match(rest).end():]]
+                sections[label] = collected
+                open_sections.append(collected)
+
+    joined = {}
+    for label, collected in sections.items():
+        kept = [line.strip() for line in collected if line.strip()]
+        if kept:
+            joined[label] = "\n".join(kept)
+    return fields, joined
+
+
+def _build_bug(bug_id: str, title: str, body: List[str]) -> Dict[str, Any]:
+    """Turn one bug section into a dict ready for store_bug()."""
+    fields, sections = _scan_bug_body(body)
+
+    bug = {
+        "id": bug_id,
+        "title": title,
+        "status": fields.get("status"),
+        "priority": fields.get("priority") or "medium",
+        "area": fields.get("area"),
+        "owner": fields.get("assigned") or fields.get("owner"),
+        "trivial": False,
+        "description": sections.get("description"),
+        "expected_behavior": sections.get("expected behavior"),
+        "root_cause": sections.get("root cause found") or sections.get("root cause"),
+        "fix_applied": sections.get("fix applied"),
+        "files_changed": [],
+        "acceptance_criteria": [],
+        "found_by": fields.get("found by"),
+        "verified_by": fields.get("verified by"),
+    }
 
+    # Match file paths like `src/path/file.tsx` or `src/path/file.tsx:123`
+    files_section = sections.get("files changed")
+    if files_section:
+        bug["files_changed"] = FILE_REF.findall(files_section)
+
+    # Match checkbox items
+    criteria_section = sections.get("acceptance criteria")
+    if criteria_section:
+        bug["acceptance_criteria"] = CHECKBOX_ITEM.findall(criteria_section)
+
+    # Normalize status
+    status = bug["status"].lower() if bug["status"] else "done"
+    if "done" in status or "complete" in status:
+        bug["status"] = "done"
+    elif "progress" in status:
+        bug["status"] = "in_progress"
+    elif "review" in status:
+        bug["status"] = "review"
+    elif "invalid" in status:
+        bug["status"] = "done"  # Treat invalid as closed
+    else:
+        bug["status"] = "open"
+
+    # Normalize priority
+    priority = bug["priority"].lower()
+    if "critical" in priority:
+        bug["priority"] = "critical"
+    elif "high" in priority:
+        bug["priority"] = "high"
+    elif "low" in priority:
+        bug["priority"] = "low"
+    else:
+        bug["priority"] = "medium"
 
-def extract_section(text: str, header: str) -> Optional[str]:
-    """Extract a multi-line section after a header."""
-    # Match **Header**: or **Header**:\n
-    pattern = rf"\*\*{header}\*\*:?\s*\n?([\s\S]*?)(?=\n\*\*|\n---|\n###|\Z)"
-    match = re.search(pattern, text, re.IGNORECASE)
-    if match:
-        content = match.group(1).strip()
-        # Remove leading/trailing whitespace and empty lines
-        lines = [line.strip() for line in content.split("\n") if line.strip()]
-        return "\n".join(lines) if lines else None
-    return None
+    # Normalize owner
+    if bug["owner"]:
+        bug["owner"] = OWNER_NAMES.get(bug["owner"].lower(), bug["owner"])
 
+    return bug
 
-def migrate_bugs(bugs_md_path: str, dry_run: bool = False) -> Tuple[int, List[str]]:
+
+def migrate_bugs(
+    bugs_md_path: str,
+    dry_run: bool = False,
+    incremental: bool = False,
+) -> Dict[str, int]:
     """
     Migrate bugs from BUGS.md to the database.
 
+    Safe to repeat - see bulk_import(). Bugs are keyed by their ID.
+
     Args:
         bugs_md_path: Path to BUGS.md
-        dry_run: If True, don't actually store, just return what would be stored
+        dry_run: If True, don't actually store, just count what would change
+        incremental: Only parse sections appended since the last import
+                     (see SourceReader)
 
     Returns:
-        Tuple of (count stored, list of bug IDs)
+        {inserted, updated, unchanged, invalid}
     """
-    bugs = parse_bugs_md(bugs_md_path)
-    stored_ids = []
-
-    for bug in bugs:
-        if dry_run:
-            # Handle unicode safely for Windows console
-            title = bug['title'].encode('ascii', 'replace').decode('ascii')
-            print(f"Would store: {bug['id']} - {title}")
-            stored_ids.append(bug["id"])
-        else:
-            try:
-                store_bug(bug)
-                stored_ids.append(bug["id"])
-                print(f"Stored: {bug['id']} - {bug['title']}")
-            except Exception as e:
-                print(f"Error storing {bug['id']}: {e}")
+    source = Path(bugs_md_path).name
+    reader = SourceReader(bugs_md_path, source, BUG_SECTION, incremental)
 
-    return len(stored_ids), stored_ids
+    records = []
+    invalid = 0
+    for bug in iter_bugs(reader):
+        try:
+            model = BugInput(**bug)
+        except ValueError as e:
+            print(f"Skipping {bug['id']}: {_first_error(e)}")
+            invalid += 1
+            continue
+        records.append((model.id, {
+            "id": model.id,
+            "title": model.title,
+            "status": model.status,
+            "priority": model.priority,
+            "area": model.area,
+            "owner": model.owner,
+            "trivial": 1 if model.trivial else 0,
+            "description": model.description,
+            "expected_behavior": model.expected_behavior,
+            "root_cause": model.root_cause,
+            "fix_applied": model.fix_applied,
+            "files_changed": model.files_changed_json(),
+            "acceptance_criteria": model.acceptance_criteria_json(),
+            "found_by": model.found_by,
+            "verified_by": model.verified_by,
+        }))
+
+    counts = _import_source(reader, "bugs", records, dry_run)
+    counts["invalid"] = invalid
+    return counts
 
 
 # =============================================================================
 # BOARD.MD PARSER
 # =============================================================================
 
+DATE_HEADER = re.compile(r"### (\d{4}-\d{2}-\d{2})\s*$")
+MESSAGE_START = re.compile(r"\*\*\[([^\]]+)\]\*\*")
+SEPARATOR_LINE = re.compile(r"---+\s*$")
+BLANK_LINE = re.compile(r"\s*$")
+
+BOARD_SECTION_HEADER = re.compile(r"^###\s*\[([^\]]+)\]\s*(.+?)(?:\s*[—-]\s*(.+?))?$", re.MULTILINE)
+BOARD_SECTION_SPLIT = re.compile(r"(?=^### \[)", re.MULTILINE)
+SEPARATOR_LINES = re.compile(r"^---+\s*$", re.MULTILINE)
+
+
 def parse_board_md(file_path: str) -> List[Dict[str, Any]]:
     """
     Parse BOARD.md or BOARD_HISTORY.md and extract messages.
@@ -209,25 +450,31 @@ def parse_board_md(file_path: str) -> List[Dict[str, Any]]:
     Returns list of dicts matching new messages schema:
     - author, message_type, content, refs, mentions, created_at (optional)
     """
-    content = Path(file_path).read_text(encoding="utf-8")
-    messages = []
+    return list(iter_board_messages(iter_lines(file_path)))
 
-    # Check if this is a history file (has date headers)
-    has_date_headers = bool(re.search(r"^### \d{4}-\d{2}-\d{2}\s*$", content, re.MULTILINE))
 
-    if has_date_headers:
-        # Parse BOARD_HISTORY.md format: ### YYYY-MM-DD followed by **[Author]** messages
-        messages = _parse_board_history(content)
-    else:
-        # Parse BOARD.md format: ### [Author] Message Title — Date
-        messages = _parse_board_current(content)
+def iter_board_messages(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse messages from BOARD.md / BOARD_HISTORY.md lines.
 
-    return messages
+    A file with date headers is a history file and is streamed (lines
+    before the first date are not part of any message). Otherwise it is the
+    current board, which is small and parsed as a whole.
+    """
+    lines = iter(lines)
+    preamble = []
+    for line in lines:
+        if DATE_HEADER.match(line):
+            yield from _iter_board_history(itertools.chain([line], lines))
+            return
+        preamble.append(line)
 
+    yield from _parse_board_current("\n".join(preamble))
 
-def _parse_board_history(content: str) -> List[Dict[str, Any]]:
+
+def _iter_board_history(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
     """
-    Parse BOARD_HISTORY.md format with date headers.
+    Stream BOARD_HISTORY.md format with date headers.
 
     Format:
     ### 2026-01-09
@@ -236,63 +483,94 @@ def _parse_board_history(content: str) -> List[Dict[str, Any]]:
 
     ### 2026-01-10
     **[Buzz]** More messages...
+
+    A message runs from its **[Author]** marker to the next marker or date
+    header; only the current message's lines are held in memory.
     """
-    messages = []
     current_date = None
     msg_counter = 0  # Counter for ordering messages within a date
+    author = None
+    body: List[str] = []
+
+    def finish() -> Optional[Dict[str, Any]]:
+        nonlocal msg_counter
+        msg_content = "\n".join(body).strip()
+        if not msg_content:
+            return None
+
+        msg_content = _drop_separators(msg_content)
+
+        # Create timestamp with time component for ordering
+        # Messages on same date get sequential times (01:00:00, 02:00:00, etc.)
+        msg_counter += 1
+        return {
+            "author": normalize_author(author),
+            "message_type": infer_message_type("", msg_content),
+            "content": msg_content,
+            "refs": extract_refs(msg_content),
+            "mentions": extract_mentions(msg_content),
+            "created_at": f"{current_date} {msg_counter:02d}:00:00",
+        }
 
-    # Split by date headers
-    date_sections = re.split(r"(?=^### \d{4}-\d{2}-\d{2}\s*$)", content, flags=re.MULTILINE)
-
-    for section in date_sections:
-        if not section.strip():
-            continue
-
-        # Check for date header
-        date_match = re.match(r"^### (\d{4}-\d{2}-\d{2})\s*$", section, re.MULTILINE)
+    for line in lines:
+        date_match = DATE_HEADER.match(line)
         if date_match:
+            if author is not None:
+                message = finish()
+                if message:
+                    yield message
             current_date = date_match.group(1)
             msg_counter = 0  # Reset counter for new date
-            section_content = section[date_match.end():]
-        else:
-            section_content = section
+            author = None
+            body = []
+            continue
 
-        if not current_date:
+        if current_date is None:
             continue
 
-        # Find all **[Author]** messages in this date section
-        # Pattern: **[Author]** followed by content until next **[Author]** or end
-        msg_pattern = r"\*\*\[([^\]]+)\]\*\*\s*(.+?)(?=\*\*\[|\Z)"
-        for match in re.finditer(msg_pattern, section_content, re.DOTALL):
-            author = match.group(1).strip()
-            msg_content = match.group(2).strip()
-
-            if not msg_content:
-                continue
-
-            # Clean up content
-            msg_content = re.sub(r"^---+\s*$", "", msg_content, flags=re.MULTILINE).strip()
-
-            # Extract mentions, refs, type
-            mentions = extract_mentions(msg_content)
-            message_type = infer_message_type("", msg_content)
-            refs = extract_refs(msg_content)
-
-            # Create timestamp with time component for ordering
-            # Messages on same date get sequential times (00:01:00, 00:02:00, etc.)
-            msg_counter += 1
-            created_at = f"{current_date} {msg_counter:02d}:00:00"
-
-            messages.append({
-                "author": normalize_author(author),
-                "message_type": message_type,
-                "content": msg_content,
-                "refs": refs,
-                "mentions": mentions,
-                "created_at": created_at,
-            })
+        pos = 0
+        if "**[" in line:
+            for marker in MESSAGE_START.finditer(line):
+                if author is not None:
+                    body.append(line[pos:marker.start()])
+                    message = finish()
+                    if message:
+                        yield message
+                author = marker.group(1).strip()
+                body = []
+                pos = marker.end()
 
-    return messages
+        if author is not None:
+            body.append(line[pos:])
+
+    if author is not None:
+        message = finish()
+        if message:
+            yield message
+
+
+def _drop_separators(content: str) -> str:
+    """
+    Remove --- separator lines from a message.
+
+    A separator and the blank lines right after it collapse into a single
+    blank line.
+    """
+    if "---" not in content:
+        return content
+
+    kept = []
+    skipping_blanks = False
+    for line in content.split("\n"):
+        if SEPARATOR_LINE.match(line):
+            kept.append("")
+            skipping_blanks = True
+        elif skipping_blanks and BLANK_LINE.match(line):
+            continue
+        else:
+            kept.append(line)
+            skipping_blanks = False
+    return "\n".join(kept).strip()
 
 
 def _parse_board_current(content: str) -> List[Dict[str, Any]]:
@@ -305,18 +583,15 @@ def _parse_board_current(content: str) -> List[Dict[str, Any]]:
     """
     messages = []
 
-    # Pattern for section headers like ### [Fizz] Status Update — 2026-01-09
-    section_pattern = r"^###\s*\[([^\]]+)\]\s*(.+?)(?:\s*[—-]\s*(.+?))?$"
-
     # Split into sections
-    sections = re.split(r"(?=^### \[)", content, flags=re.MULTILINE)
+    sections = BOARD_SECTION_SPLIT.split(content)
 
     for section in sections:
         if not section.strip() or "## Messages" in section or "## Protocol" in section:
             continue
 
-        # Try to match header
-        header_match = re.match(section_pattern, section, re.MULTILINE)
+        # Try to match header like ### [Fizz] Status Update — 2026-01-09
+        header_match = BOARD_SECTION_HEADER.match(section)
         if header_match:
             author = header_match.group(1).strip()
             title = header_match.group(2).strip()
@@ -326,7 +601,7 @@ def _parse_board_current(content: str) -> List[Dict[str, Any]]:
             message_content = section[content_start:].strip()
 
             # Clean up content - remove separator lines
-            message_content = re.sub(r"^---+\s*$", "", message_content, flags=re.MULTILINE).strip()
+            message_content = SEPARATOR_LINES.sub("", message_content).strip()
 
             if message_content or title:
                 full_content = f"**{title}**\n\n{message_content}" if title and message_content else title or message_content
@@ -351,6 +626,11 @@ def _parse_board_current(content: str) -> List[Dict[str, Any]]:
     return messages
 
 
+MENTION = re.compile(r"@(\w+)")
+BUG_REF = re.compile(r"(BUG|IMP)-(\d+)")
+TASK_REF = re.compile(r"TASK-(\d+)")
+
+
 def normalize_author(author: str) -> str:
     """Normalize author name to valid VALID_AUTHORS."""
     author_map = {
@@ -366,7 +646,7 @@ def normalize_author(author: str) -> str:
 
 def extract_mentions(content: str) -> List[str]:
     """Extract @mentions from content."""
-    mentions = re.findall(r"@(\w+)", content)
+    mentions = MENTION.findall(content)
     # Normalize to @Name format
     return [f"@{m.capitalize()}" for m in mentions]
 
@@ -407,58 +687,82 @@ def extract_refs(content: str) -> Optional[Dict[str, Any]]:
     refs = {}
 
     # Find BUG-XXX or IMP-XXX references
-    bug_match = re.search(r"(BUG|IMP)-(\d+)", content)
+    bug_match = BUG_REF.search(content)
     if bug_match:
         refs["bug_id"] = f"{bug_match.group(1)}-{bug_match.group(2)}"
 
     # Find TASK-XXX references
-    task_match = re.search(r"TASK-(\d+)", content)
+    task_match = TASK_REF.search(content)
     if task_match:
         refs["task_id"] = f"TASK-{task_match.group(1)}"
 
     return refs if refs else None
 
 
-def migrate_board(board_md_path: str, dry_run: bool = False) -> Tuple[int, List[str]]:
+def migrate_board(
+    board_md_path: str,
+    dry_run: bool = False,
+    incremental: bool = False,
+) -> Dict[str, int]:
     """
     Migrate messages from BOARD.md or BOARD_HISTORY.md to the database.
 
     Preserves chronological order using created_at timestamps from date headers.
-    """
-    from .storage import store_message
+    Safe to repeat - see bulk_import(). Messages are keyed by author, date
+    (history only) and a hash of their content, so entries added above
+    others don't change existing keys; the hour in created_at, which
+    follows a message's position within its day, is an updatable column.
+    An edited message updates its row on the next full parse.
 
-    messages = parse_board_md(board_md_path)
-    stored_ids = []
+    With incremental=True only date sections from the last imported one on
+    are parsed. BOARD.md has no date sections and is always parsed whole.
 
-    for msg in messages:
-        if dry_run:
-            content_preview = msg['content'][:50].encode('ascii', 'replace').decode('ascii')
-            date_info = f" @ {msg['created_at']}" if msg.get('created_at') else ""
-            print(f"Would store [{msg['message_type']}] from {msg['author']}{date_info}: {content_preview}...")
-            stored_ids.append(str(len(stored_ids) + 1))
-        else:
-            try:
-                msg_id = store_message(
-                    author=msg["author"],
-                    message_type=msg["message_type"],
-                    content=msg["content"],
-                    refs=msg["refs"],
-                    mentions=msg["mentions"],
-                    created_at=msg.get("created_at"),  # Pass timestamp if available
-                )
-                stored_ids.append(str(msg_id))
-                date_info = f" @ {msg['created_at']}" if msg.get('created_at') else ""
-                print(f"Stored message {msg_id} [{msg['message_type']}] from {msg['author']}{date_info}")
-            except Exception as e:
-                print(f"Error storing message: {e}")
+    Returns:
+        {inserted, updated, unchanged, invalid}
+    """
+    source = Path(board_md_path).name
+    reader = SourceReader(board_md_path, source, HISTORY_SECTION, incremental)
+
+    records = []
+    invalid = 0
+    for position, msg in enumerate(iter_board_messages(reader), 1):
+        try:
+            model = MessageInput(
+                author=msg["author"],
+                message_type=msg["message_type"],
+                content=msg["content"],
+                refs=msg["refs"],
+                mentions=msg["mentions"],
+            )
+        except ValueError as e:
+            print(f"Skipping message {position}: {_first_error(e)}")
+            invalid += 1
+            continue
+        created_at = msg.get("created_at")
+        records.append((record_key(model.author, created_at and created_at[:10], text=model.content), {
+            "author": model.author,
+            "message_type": model.message_type,
+            "content": model.content,
+            "refs": model.refs_json(),
+            "mentions": model.mentions_json(),
+            "created_at": created_at,
+        }))
 
-    return len(stored_ids), stored_ids
+    counts = _import_source(reader, "messages", records, dry_run)
+    counts["invalid"] = invalid
+    return counts
 
 
 # =============================================================================
 # CLAUDE.MD LEARNINGS PARSER
 # =============================================================================
 
+LEARNINGS_SECTION = re.compile(r"## Learnings.*?\n([\s\S]*?)(?=\n## [A-Z]|\Z)", re.IGNORECASE)
+CATEGORY_SPLIT = re.compile(r"(?=^### )", re.MULTILINE)
+CATEGORY_HEADER = re.compile(r"^### (.+?)$", re.MULTILINE)
+BULLET = re.compile(r"^- (.+?)$", re.MULTILINE)
+
+
 def parse_learnings_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     """
     Parse CLAUDE.md and extract learnings from the Learnings section.
@@ -473,11 +777,7 @@ def parse_learnings_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     learnings = []
 
     # Find the Learnings section
-    learnings_match = re.search(
-        r"## Learnings.*?\n([\s\S]*?)(?=\n## [A-Z]|\Z)",
-        content,
-        re.IGNORECASE
-    )
+    learnings_match = LEARNINGS_SECTION.search(content)
 
     if not learnings_match:
         return learnings
@@ -485,14 +785,14 @@ def parse_learnings_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     learnings_section = learnings_match.group(1)
 
     # Split by category headers (### Category)
-    categories = re.split(r"(?=^### )", learnings_section, flags=re.MULTILINE)
+    categories = CATEGORY_SPLIT.split(learnings_section)
 
     for category_section in categories:
         if not category_section.strip():
             continue
 
         # Extract category name
-        cat_match = re.match(r"^### (.+?)$", category_section, re.MULTILINE)
+        cat_match = CATEGORY_HEADER.match(category_section)
         if not cat_match:
             continue
 
@@ -516,7 +816,7 @@ def parse_learnings_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
         category = category_map.get(category, "general")
 
         # Extract bullet points
-        bullets = re.findall(r"^- (.+?)$", category_section, re.MULTILINE)
+        bullets = BULLET.findall(category_section)
 
         for bullet in bullets:
             learnings.append({
@@ -529,32 +829,45 @@ def parse_learnings_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     return learnings
 
 
-def migrate_learnings(claude_md_path: str, dry_run: bool = False) -> Tuple[int, List[int]]:
+def migrate_learnings(claude_md_path: str, dry_run: bool = False) -> Dict[str, int]:
     """
     Migrate learnings from CLAUDE.md to the database.
-    """
-    learnings = parse_learnings_from_claude_md(claude_md_path)
-    stored_ids = []
 
-    for learning in learnings:
-        if dry_run:
-            print(f"Would store [{learning['category']}]: {learning['learning'][:50]}...")
-            stored_ids.append(len(stored_ids) + 1)
-        else:
-            try:
-                learning_id = store_learning(learning)
-                stored_ids.append(learning_id)
-                print(f"Stored learning {learning_id}: {learning['learning'][:50]}...")
-            except Exception as e:
-                print(f"Error storing learning: {e}")
+    Safe to repeat - see bulk_import(). Learnings are keyed by category and
+    a hash of their text; an edited bullet updates its row.
+
+    Returns:
+        {inserted, updated, unchanged, invalid}
+    """
+    records = []
+    invalid = 0
+    for learning in parse_learnings_from_claude_md(claude_md_path):
+        try:
+            model = LearningInput(**learning)
+        except ValueError as e:
+            print(f"Skipping learning '{learning['learning'][:40]}': {_first_error(e)}")
+            invalid += 1
+            continue
+        records.append((record_key(model.category, text=model.learning), {
+            "category": model.category,
+            "learning": model.learning,
+            "context": model.context,
+            "related_bug_id": model.related_bug_id,
+        }))
 
-    return len(stored_ids), stored_ids
+    counts = bulk_import(f"{Path(claude_md_path).name}#learnings", "learnings", records, dry_run, complete=True)
+    counts["invalid"] = invalid
+    return counts
 
 
 # =============================================================================
 # DECISIONS PARSER
 # =============================================================================
 
+DECISION_LOG_SECTION = re.compile(r"## Decision Log\s*\n([\s\S]*?)(?=\n## [A-Z]|\n---|\Z)", re.IGNORECASE)
+DECISION_ROW = re.compile(r"^\|\s*(\d{4}-\d{2}-\d{2})\s*\|\s*(.+?)\s*\|\s*(.+?)\s*\|$", re.MULTILINE)
+
+
 def parse_decisions_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     """
     Parse CLAUDE.md and extract decisions from the Decision Log section.
@@ -567,11 +880,7 @@ def parse_decisions_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     decisions = []
 
     # Find the Decision Log section
-    decision_match = re.search(
-        r"## Decision Log\s*\n([\s\S]*?)(?=\n## [A-Z]|\n---|\Z)",
-        content,
-        re.IGNORECASE
-    )
+    decision_match = DECISION_LOG_SECTION.search(content)
 
     if not decision_match:
         return decisions
@@ -579,11 +888,7 @@ def parse_decisions_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     decision_section = decision_match.group(1)
 
     # Parse markdown table rows (skip header and separator)
-    rows = re.findall(
-        r"^\|\s*(\d{4}-\d{2}-\d{2})\s*\|\s*(.+?)\s*\|\s*(.+?)\s*\|$",
-        decision_section,
-        re.MULTILINE
-    )
+    rows = DECISION_ROW.findall(decision_section)
 
     for date, decision, rationale in rows:
         decisions.append({
@@ -597,107 +902,149 @@ def parse_decisions_from_claude_md(file_path: str) -> List[Dict[str, Any]]:
     return decisions
 
 
-def migrate_decisions(claude_md_path: str, dry_run: bool = False) -> Tuple[int, List[int]]:
+def migrate_decisions(claude_md_path: str, dry_run: bool = False) -> Dict[str, int]:
     """
     Migrate decisions from CLAUDE.md to the database.
-    """
-    decisions = parse_decisions_from_claude_md(claude_md_path)
-    stored_ids = []
 
-    conn = get_connection()
-    try:
-        for decision in decisions:
-            if dry_run:
-                print(f"Would store [{decision['date']}]: {decision['decision'][:50]}...")
-                stored_ids.append(len(stored_ids) + 1)
-            else:
-                cursor = conn.execute(
-                    """
-                    INSERT INTO decisions (date, decision, rationale, alternatives_considered, related_area)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (
-                        decision["date"],
-                        decision["decision"],
-                        decision["rationale"],
-                        decision["alternatives_considered"],
-                        decision["related_area"],
-                    ),
-                )
-                stored_ids.append(cursor.lastrowid)
-                print(f"Stored decision {cursor.lastrowid}: {decision['decision'][:50]}...")
+    Safe to repeat - see bulk_import(). Decisions are keyed by date and a
+    hash of the decision text; the rationale is an updatable column.
 
-        if not dry_run:
-            conn.commit()
-    finally:
-        conn.close()
-
-    return len(stored_ids), stored_ids
+    Returns:
+        {inserted, updated, unchanged, invalid}
+    """
+    records = [
+        (record_key(decision["date"], text=decision["decision"]), decision)
+        for decision in parse_decisions_from_claude_md(claude_md_path)
+    ]
+
+    counts = bulk_import(f"{Path(claude_md_path).name}#decisions", "decisions", records, dry_run, complete=True)
+    counts["invalid"] = 0
+    return counts
+
+
+def _first_error(error: ValueError) -> str:
+    """First message of a (pydantic) validation error, for one-line reports."""
+    errors = getattr(error, "errors", None)
+    if callable(errors):
+        details = errors()
+        if details:
+            return details[0].get("msg", str(error))
+    return str(error)
+
+
+def format_import_counts(counts: Dict[str, int]) -> str:
+    """One-line summary of a migrate_* result."""
+    summary = f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+    if counts.get("invalid"):
+        summary += f", {counts['invalid']} invalid"
+    if counts.get("missing"):
+        summary += f", {counts['missing']} archived/deleted (left alone)"
+    if counts.get("full_reparse"):
+        summary += " (file changed before the last import - parsed in full)"
+    return summary
 
 
 # =============================================================================
 # LINK BUGS TO CODE
 # =============================================================================
 
-def link_bugs_to_code(dry_run: bool = False) -> int:
+LINE_SUFFIX = re.compile(r":\d+(-\d+)?$")
+
+# Bug -> code_doc pairs to link: every files_changed entry of every bug,
+# normalized by src_path(), joined on code_docs.file_path (indexed)
+BUG_FILE_MATCHES = """
+    WITH changed AS (
+        SELECT DISTINCT b.id AS bug_id, src_path(j.value) AS file_path
+        FROM bugs b, json_each(b.files_changed) j
+        WHERE json_valid(b.files_changed) AND j.type = 'text'
+    )
+    SELECT c.bug_id, d.id AS code_doc_id, d.file_path
+    FROM changed c
+    JOIN code_docs d ON d.file_path = c.file_path
+"""
+
+
+def normalize_changed_path(file_path: str) -> Optional[str]:
     """
-    After bugs and code_docs are populated, link them based on files_changed.
+    Normalize a files_changed entry to the src/... form used in code_docs.
 
-    For each bug with files_changed, find matching code_docs and create links.
+    Strips line numbers (:123, :10-20), converts backslashes and adds the
+    src/ prefix to paths given relative to it.
     """
-    from .storage import link_bug_to_code, query_bugs
+    from .annotator import to_src_relative
 
-    bugs = query_bugs(limit=1000)
-    links_created = 0
+    if not isinstance(file_path, str) or not file_path.strip():
+        return None
 
-    for bug in bugs:
-        if not bug.get("files_changed"):
-            continue
+    clean = to_src_relative(LINE_SUFFIX.sub("", file_path.strip()))
+    while clean.startswith("./"):
+        clean = clean[2:]
+    if not clean.startswith("src/"):
+        clean = "src/" + clean.lstrip("/")
+    return clean
 
-        import json
-        try:
-            files = json.loads(bug["files_changed"]) if isinstance(bug["files_changed"], str) else bug["files_changed"]
-        except:
-            continue
 
-        for file_path in files:
-            # Clean the file path (remove line numbers like :123)
-            clean_path = re.sub(r":\d+(-\d+)?$", "", file_path)
+def link_bugs_to_code(dry_run: bool = False) -> int:
+    """
+    After bugs and code_docs are populated, link them based on files_changed.
 
-            # Find matching code docs
-            code_docs = query_code_docs(file_path=clean_path, limit=10)
+    Every bug's files_changed JSON array is exploded with json_each and
+    joined against code_docs by exact (normalized) path, and the links are
+    created with a single INSERT OR IGNORE - re-running only adds what is
+    missing.
 
-            for doc in code_docs:
-                if dry_run:
-                    print(f"Would link {bug['id']} → code_doc {doc['id']} ({doc['file_path']})")
-                    links_created += 1
-                else:
-                    try:
-                        link_bug_to_code(
-                            bug_id=bug["id"],
-                            code_doc_id=doc["id"],
-                            relationship="fix_location",
-                            notes=f"From files_changed in bug report",
-                        )
-                        links_created += 1
-                        print(f"Linked {bug['id']} → code_doc {doc['id']}")
-                    except Exception as e:
-                        print(f"Error linking: {e}")
+    Returns:
+        Number of links created (or that would be created, with dry_run).
+    """
+    conn = get_connection()
+    try:
+        conn.create_function("src_path", 1, normalize_changed_path, deterministic=True)
 
-    return links_created
+        if dry_run:
+            cursor = conn.execute(
+                f"""
+                SELECT m.* FROM ({BUG_FILE_MATCHES}) m
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM bug_code_refs r
+                    WHERE r.bug_id = m.bug_id
+                      AND r.code_doc_id = m.code_doc_id
+                      AND r.relationship = 'fix_location'
+                )
+                ORDER BY m.bug_id, m.code_doc_id
+                """
+            )
+            links = 0
+            for row in cursor:
+                print(f"Would link {row['bug_id']} → code_doc {row['code_doc_id']} ({row['file_path']})")
+                links += 1
+            return links
+
+        cursor = conn.execute(
+            f"""
+            INSERT OR IGNORE INTO bug_code_refs (bug_id, code_doc_id, relationship, notes)
+            SELECT bug_id, code_doc_id, 'fix_location', 'From files_changed in bug report'
+            FROM ({BUG_FILE_MATCHES})
+            """
+        )
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
 
 
 # =============================================================================
 # CLI INTEGRATION
 # =============================================================================
 
-def migrate_all(team_dir: str, dry_run: bool = False) -> Dict[str, Any]:
+def migrate_all(team_dir: str, dry_run: bool = False, incremental: bool = False) -> Dict[str, Any]:
     """
     Run all migrations.
 
     Args:
         team_dir: Path to team/ directory
         dry_run: If True, just report what would be done
+        incremental: Only parse what was appended to BUGS.md and
+                     BOARD_HISTORY.md since the last import
 
     Returns:
         Summary of migrations
@@ -709,33 +1056,33 @@ def migrate_all(team_dir: str, dry_run: bool = False) -> Dict[str, Any]:
     bugs_path = team_path / "BUGS.md"
     if bugs_path.exists():
         print("\n=== Migrating BUGS.md ===")
-        count, ids = migrate_bugs(str(bugs_path), dry_run)
-        results["bugs"] = {"count": count, "ids": ids}
+        results["bugs"] = migrate_bugs(str(bugs_path), dry_run, incremental)
+        print(format_import_counts(results["bugs"]))
 
     # Migrate board messages
     board_path = team_path / "BOARD.md"
     if board_path.exists():
         print("\n=== Migrating BOARD.md ===")
-        count, ids = migrate_board(str(board_path), dry_run)
-        results["board_messages"] = {"count": count, "ids": ids}
+        results["board_messages"] = migrate_board(str(board_path), dry_run, incremental)
+        print(format_import_counts(results["board_messages"]))
 
     # Migrate board history
     history_path = team_path / "BOARD_HISTORY.md"
     if history_path.exists():
         print("\n=== Migrating BOARD_HISTORY.md ===")
-        count, ids = migrate_board(str(history_path), dry_run)
-        results["board_history"] = {"count": count, "ids": ids}
+        results["board_history"] = migrate_board(str(history_path), dry_run, incremental)
+        print(format_import_counts(results["board_history"]))
 
     # Migrate learnings from CLAUDE.md
     claude_path = team_path.parent / "CLAUDE.md"
     if claude_path.exists():
         print("\n=== Migrating CLAUDE.md learnings ===")
-        count, ids = migrate_learnings(str(claude_path), dry_run)
-        results["learnings"] = {"count": count, "ids": ids}
+        results["learnings"] = migrate_learnings(str(claude_path), dry_run)
+        print(format_import_counts(results["learnings"]))
 
         print("\n=== Migrating CLAUDE.md decisions ===")
-        count, ids = migrate_decisions(str(claude_path), dry_run)
-        results["decisions"] = {"count": count, "ids": ids}
+        results["decisions"] = migrate_decisions(str(claude_path), dry_run)
+        print(format_import_counts(results["decisions"]))
 
     # Link bugs to code (only if not dry run and code_docs exist)
     if not dry_run:
@@ -753,14 +1100,18 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python parser.py <team_dir> [--dry-run]")
+        print("Usage: python parser.py <team_dir> [--dry-run] [--incremental]")
         sys.exit(1)
 
     team_dir = sys.argv[1]
     dry_run = "--dry-run" in sys.argv
+    incremental = "--incremental" in sys.argv
 
-    results = migrate_all(team_dir, dry_run)
+    results = migrate_all(team_dir, dry_run, incremental)
 
     print("\n=== Migration Summary ===")
     for key, value in results.items():
-        print(f"{key}: {value.get('count', 0)} items")
+        if "inserted" in value:
+            print(f"{key}: {format_import_counts(value)}")
+        else:
+            print(f"{key}: {value.get('count', 0)} items")
@@ -0,0 +1,181 @@
+"""
+Path classification: owning area, file type and protected (test) paths.
+
+The rules live in path_rules.json, not in code. Each classifier is an ordered
+list of rules; the first rule that matches wins, otherwise the classifier's
+default applies:
+
+    {"contains": "/components/workbook/", "value": "workbook"}
+    {"field": "stem", "prefix": "use", "value": "hook"}
+    {"segment": "__tests__", "value": true}
+
+Match kinds: contains, prefix, suffix, equals, glob (fnmatch-style, * also
+matches /) and segment (a path component equals the text). "field" picks what
+is matched: path (default), parent (directory name), stem (file name without
+extension) or suffix (extension). Paths are lowercased with / separators
+before matching, and so are the rule texts.
+
+Each classifier compiles to one Python function: an if-chain in rule order
+with str tests (in, startswith, endswith, ==) and a precompiled regex per
+glob - as fast as the hand-written matchers it replaced. Results are memoized
+per path, so repeated classification is a dict lookup:
+
+    from .pathrules import classify, classify_many
+    classify("area", "src/components/workbook/WorkbookView.tsx")  # 'workbook'
+    classify_many("protected", changed_files)                     # [False, True, ...]
+
+After editing the rules file, reload_rules() picks up the change in a running
+process (the CLI daemon); new processes read it on first use.
+"""
+
+import fnmatch
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .constants import PATH_CACHE_SIZE, PATH_RULES_FILENAME, VALID_AREAS
+
+
+MATCH_KINDS = ("contains", "prefix", "suffix", "equals", "glob", "segment")
+FIELDS = ("path", "parent", "stem", "suffix")
+
+# Allowed values per classifier, where the toolbox has a fixed set
+_ALLOWED_VALUES = {"area": frozenset(VALID_AREAS)}
+
+
+def get_rules_path() -> Path:
+    """Get the path to the classification rules file."""
+    return Path(__file__).parent / PATH_RULES_FILENAME
+
+
+def normalize(file_path: str) -> str:
+    """Lowercase, forward-slash form that rules are matched against."""
+    return file_path.replace("\\", "/").lower()
+
+
+def split_path(path: str) -> Tuple[str, str, str]:
+    """(parent, stem, suffix) of a normalized path, as pathlib would give them."""
+    head, _, name = path.rpartition("/")
+    parent = head.rpartition("/")[2]
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return parent, name[:dot], name[dot:]
+    return parent, name, ""
+
+
+def compile_rule(rule: Dict[str, Any], globs: List[Any]) -> str:
+    """
+    Python condition for one rule over the FIELDS variables.
+
+    Glob rules append their compiled regex to globs and refer to it by index.
+
+    Raises:
+        ValueError: If the rule has no match kind, more than one, or a bad field
+    """
+    kinds = [kind for kind in MATCH_KINDS if kind in rule]
+    if len(kinds) != 1:
+        raise ValueError(f"rule needs exactly one of {MATCH_KINDS}: {rule}")
+    kind = kinds[0]
+    field = rule.get("field", "path")
+    if field not in FIELDS:
+        raise ValueError(f"field must be one of {FIELDS}: {rule}")
+    if kind == "segment" and field != "path":
+        raise ValueError(f"segment rules match the path field: {rule}")
+
+    text = str(rule[kind]).lower()
+    if kind == "glob":
+        globs.append(re.compile(fnmatch.translate(text)).match)
+        return f"_globs[{len(globs) - 1}]({field})"
+    return {
+        "contains": f"{text!r} in {field}",
+        "prefix": f"{field}.startswith({text!r})",
+        "suffix": f"{field}.endswith({text!r})",
+        "equals": f"{field} == {text!r}",
+        "segment": f"{'/' + text + '/'!r} in _segments",
+    }[kind]
+
+
+class Classifier:
+    """One compiled classifier: ordered rules, first match wins."""
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.default = spec.get("default")
+
+        allowed = _ALLOWED_VALUES.get(name)
+        values: List[Any] = []
+        globs: List[Any] = []
+        body = []
+        for index, rule in enumerate(spec.get("rules", [])):
+            if "value" not in rule:
+                raise ValueError(f"{name} rule {index} has no value: {rule}")
+            if allowed is not None and rule["value"] not in allowed:
+                raise ValueError(f"{name} rule {index}: {rule['value']!r} is not one of {sorted(allowed)}")
+            body.append(f"    if {compile_rule(rule, globs)}: return _values[{index}]")
+            values.append(rule["value"])
+
+        source = "\n".join(body)
+        setup = ["    path = _normalize(file_path)"]
+        if re.search(r"\b(parent|stem|suffix)\b", source):
+            setup.append("    parent, stem, suffix = _split(path)")
+        if "_segments" in source:
+            setup.append("    _segments = '/' + path + '/'")
+        source = "\n".join(["def _classify(file_path):", *setup, *body, "    return _default"])
+
+        namespace = {
+            "_normalize": normalize, "_split": split_path, "_values": values,
+            "_globs": globs, "_default": self.default,
+        }
+        exec(compile(source, f"<{PATH_RULES_FILENAME}:{name}>", "exec"), namespace)
+        self.source = source
+        self._classify = namespace["_classify"]
+        self.classify = lru_cache(maxsize=PATH_CACHE_SIZE)(self._classify)
+
+    def classify_many(self, file_paths: Iterable[str]) -> List[Any]:
+        """Classify many paths; each distinct path is matched once."""
+        classify = self.classify
+        return [classify(file_path) for file_path in file_paths]
+
+
+_classifiers: Optional[Dict[str, Classifier]] = None
+
+
+def load_rules(path: Optional[Path] = None) -> Dict[str, Classifier]:
+    """
+    Compile every classifier in a rules file.
+
+    Raises:
+        ValueError: If a rule is malformed
+    """
+    with open(path or get_rules_path(), encoding="utf-8") as f:
+        spec = json.load(f)
+    return {name: Classifier(name, classifier) for name, classifier in spec.items()}
+
+
+def reload_rules() -> None:
+    """Drop the compiled rules and cached results; the next call rereads the file."""
+    global _classifiers
+    _classifiers = None
+
+
+def get_classifier(kind: str) -> Classifier:
+    """Compiled classifier by name ("area", "file_type", "protected")."""
+    global _classifiers
+    if _classifiers is None:
+        _classifiers = load_rules()
+    try:
+        return _classifiers[kind]
+    except KeyError:
+        raise KeyError(f"no '{kind}' classifier in {get_rules_path().name}") from None
+
+
+def classify(kind: str, file_path: str) -> Any:
+    """Classify one path (memoized)."""
+    return get_classifier(kind).classify(file_path)
+
+
+def classify_many(kind: str, file_paths: Iterable[str]) -> List[Any]:
+    """Classify many paths, in order."""
+    return get_classifier(kind).classify_many(file_paths)
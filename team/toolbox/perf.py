@@ -0,0 +1,355 @@
+"""
+Performance checks for the toolbox itself.
+
+Query report - which statements cost the most, from the opt-in query log
+(see querylog.py):
+
+    TEAM_QUERY_LOG=1 python -m team.toolbox.cli board list
+    python -m team.toolbox.cli perf queries               # by total time
+    python -m team.toolbox.cli perf queries --sort p95
+
+Validation - per-row Pydantic models vs. schemas.validate_many for bulk loads:
+
+    python -m team.toolbox.cli perf validate --rows 50000
+
+Startup budget - every agent command is a fresh `python -m team.toolbox.cli`
+process, so import time is paid on every call:
+
+    python -m team.toolbox.cli perf startup              # cold `cli stats`
+    python -m team.toolbox.cli perf startup board list   # another command
+
+Each run starts a new interpreter with `-X importtime`. Import cost is the
+total of its top-level imports minus the same for bare `python -c pass`, so
+interpreter and site startup don't count against the budget. Wall-clock time
+is reported but not gated - it depends on the machine far more than imports do.
+"""
+
+import json
+import math
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .constants import STARTUP_BENCH_RUNS, STARTUP_IMPORT_BUDGET_MS, VALIDATION_BENCH_ROWS
+
+
+# Repository root - `-m team.toolbox.cli` resolves from here
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        (total ms of top-level imports, {module: self ms})
+    """
+    total_us = 0
+    self_us: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header row
+        own, cumulative, name = int(fields[0]), int(fields[1]), fields[2]
+        module = name.strip()
+        self_us[module] = self_us.get(module, 0) + own / 1000
+        if not name[1:].startswith(" "):
+            total_us += cumulative  # Top level - children are included
+    return total_us / 1000, self_us
+
+
+def _run(args: List[str]) -> Tuple[float, str, int]:
+    """Run one interpreter with -X importtime; returns (wall ms, stderr, exit code)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return (time.perf_counter() - started) * 1000, result.stderr, result.returncode
+
+
+def measure_startup(
+    argv: Sequence[str] = ("stats",),
+    runs: int = STARTUP_BENCH_RUNS,
+    budget_ms: float = STARTUP_IMPORT_BUDGET_MS,
+) -> Dict[str, Any]:
+    """
+    Measure cold-start cost of one CLI command.
+
+    Args:
+        argv: CLI arguments to run
+        runs: Fresh processes per measurement (medians are reported)
+        budget_ms: Allowed import time over bare Python
+
+    Returns:
+        {command, runs, import_ms, budget_ms, within_budget, wall_ms,
+         baseline_wall_ms, slowest: [(module, self ms)]}
+    """
+    command = ["-m", f"{__package__}.cli", *argv]
+    baseline_imports, baseline_walls = [], []
+    imports, walls = [], []
+    self_ms: Dict[str, List[float]] = {}
+
+    for _ in range(max(1, runs)):
+        wall, stderr, _ = _run(["-c", "pass"])
+        baseline_walls.append(wall)
+        baseline_imports.append(parse_importtime(stderr)[0])
+
+        wall, stderr, code = _run(command)
+        if code != 0:
+            raise RuntimeError(f"`cli {' '.join(argv)}` exited with {code}")
+        walls.append(wall)
+        total, modules = parse_importtime(stderr)
+        imports.append(total)
+        for module, ms in modules.items():
+            self_ms.setdefault(module, []).append(ms)
+
+    import_ms = max(0.0, statistics.median(imports) - statistics.median(baseline_imports))
+    baseline_modules = set(parse_importtime(_run(["-c", "pass"])[1])[1])
+    slowest = sorted(
+        ((module, statistics.median(ms)) for module, ms in self_ms.items() if module not in baseline_modules),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:10]
+
+    return {
+        "command": " ".join(argv),
+        "runs": len(walls),
+        "import_ms": round(import_ms, 1),
+        "budget_ms": budget_ms,
+        "within_budget": import_ms <= budget_ms,
+        "wall_ms": round(statistics.median(walls), 1),
+        "baseline_wall_ms": round(statistics.median(baseline_walls), 1),
+        "slowest": [(module, round(ms, 2)) for module, ms in slowest],
+    }
+
+
+def format_startup(result: Dict[str, Any]) -> str:
+    """Human-readable startup report."""
+    verdict = "OK" if result["within_budget"] else "OVER BUDGET"
+    lines = [
+        f"Startup: cli {result['command']} ({result['runs']} cold runs, medians)",
+        "=" * 60,
+        f"Imports:    {result['import_ms']:>7.1f} ms  (budget {result['budget_ms']:.0f} ms) {verdict}",
+        f"Wall clock: {result['wall_ms']:>7.1f} ms  (bare python {result['baseline_wall_ms']:.1f} ms)",
+        "",
+        "Slowest imports (self ms):",
+    ]
+    for module, ms in result["slowest"]:
+        lines.append(f"  {ms:>7.2f}  {module}")
+    return "\n".join(lines)
+
+
+# =============================================================================
+# QUERY REPORT
+# =============================================================================
+
+QUERY_LOG_COLUMNS = ("sql", "params", "duration_ms", "statements", "caller", "plan", "command")
+
+
+def load_query_log(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Logged statements from a JSONL file, or from the query_log table."""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    from .storage import get_connection
+
+    conn = get_connection()
+    try:
+        rows = conn.execute(f"SELECT {', '.join(QUERY_LOG_COLUMNS)} FROM query_log")
+        return [dict(zip(QUERY_LOG_COLUMNS, row)) for row in rows]
+    finally:
+        conn.close()
+
+
+def clear_query_log() -> int:
+    """Delete everything in the query_log table; returns rows deleted."""
+    from .storage import get_connection
+
+    conn = get_connection()
+    try:
+        deleted = conn.execute("DELETE FROM query_log").rowcount
+        conn.commit()
+        return deleted
+    finally:
+        conn.close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (sorted or not)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def query_report(records: List[Dict[str, Any]], sort: str = "total", top: int = 20) -> List[Dict[str, Any]]:
+    """
+    Aggregate logged statements by SQL text.
+
+    Args:
+        records: From load_query_log()
+        sort: "total", "p95", "max" or "count"
+        top: Statements to return
+
+    Returns:
+        [{sql, count, total_ms, avg_ms, p95_ms, max_ms, callers, params, plan}],
+        worst first. plan is the one captured for the slowest execution.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record["sql"], []).append(record)
+
+    report = []
+    for sql, group in groups.items():
+        durations = [r["duration_ms"] for r in group]
+        slowest_planned = max((r for r in group if r.get("plan")), key=lambda r: r["duration_ms"], default=None)
+        report.append({
+            "sql": sql,
+            "count": len(group),
+            "total_ms": round(sum(durations), 3),
+            "avg_ms": round(sum(durations) / len(durations), 3),
+            "p95_ms": round(percentile(durations, 95), 3),
+            "max_ms": round(max(durations), 3),
+            "callers": [caller for caller, _ in Counter(r["caller"] for r in group).most_common(3)],
+            "params": Counter(r["params"] for r in group).most_common(1)[0][0],
+            "plan": slowest_planned["plan"] if slowest_planned else None,
+        })
+
+    key = {"total": "total_ms", "p95": "p95_ms", "max": "max_ms", "count": "count"}[sort]
+    report.sort(key=lambda row: row[key], reverse=True)
+    return report[:top]
+
+
+def format_query_report(report: List[Dict[str, Any]], sort: str) -> str:
+    """Human-readable query report with plans for slow statements."""
+    if not report:
+        return "No queries logged. Run commands with TEAM_QUERY_LOG=1 first."
+
+    lines = [
+        f"Top {len(report)} statements by {sort}",
+        "=" * 78,
+        f"{'calls':>7} {'total ms':>10} {'avg ms':>8} {'p95 ms':>8} {'max ms':>8}  caller",
+        "-" * 78,
+    ]
+    for row in report:
+        lines.append(
+            f"{row['count']:>7} {row['total_ms']:>10.1f} {row['avg_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['max_ms']:>8.2f}  {', '.join(row['callers'])}"
+        )
+        sql = row["sql"] if len(row["sql"]) <= 300 else row["sql"][:297] + "..."
+        lines.append(f"        {sql}")
+        if row["params"]:
+            lines.append(f"        params: {row['params']}")
+        if row["plan"]:
+            lines.extend(f"        | {plan_line}" for plan_line in row["plan"].splitlines())
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+# =============================================================================
+# VALIDATION BENCHMARK
+# =============================================================================
+
+VALIDATION_MODES = ("per_row", "batch", "trusted")
+
+
+def sample_rows(model_name: str, rows: int) -> List[Dict[str, Any]]:
+    """Synthetic rows shaped like rebuild/annotate output."""
+    from .constants import VALID_AREAS, VALID_CALL_TYPES
+
+    if model_name == "CodeCallInput":
+        return [
+            {
+                "caller_id": i + 1,
+                "callee_id": i + 2,
+                "callee_name": f"handler{i % 500}",
+                "call_type": VALID_CALL_TYPES[i % len(VALID_CALL_TYPES)],
+                "line_number": i % 900 + 1,
+            }
+            for i in range(rows)
+        ]
+    return [
+        {
+            "file_path": f"src/components/feature{i % 40}/Widget{i}.tsx",
+            "symbol_name": f"Widget{i}",
+            "symbol_type": "function",
+            "line_start": i % 900 + 1,
+            "line_end": i % 900 + 20,
+            "signature": f"function Widget{i}(props: Props): JSX.Element",
+            "purpose": "Renders one widget and wires its event handlers",
+            "connections": [f"src/hooks/useWidget{i % 30}.ts"],
+            "area": VALID_AREAS[i % len(VALID_AREAS)],
+        }
+        for i in range(rows)
+    ]
+
+
+def measure_validation(rows: int = VALIDATION_BENCH_ROWS, runs: int = 3) -> Dict[str, Any]:
+    """
+    Time building models row by row vs. schemas.validate_many.
+
+    Args:
+        rows: Rows per model
+        runs: Repeats per mode (the fastest is reported)
+
+    Returns:
+        {rows, runs, models: {model: {mode: {ms, rows_per_s, speedup}}}}
+    """
+    from . import schemas
+
+    results: Dict[str, Any] = {}
+    for model in (schemas.CodeCallInput, schemas.CodeDocInput):
+        data = sample_rows(model.__name__, rows)
+        modes = {
+            "per_row": lambda: [model(**row) for row in data],
+            "batch": lambda: schemas.validate_many(model, data),
+            "trusted": lambda: schemas.validate_many(model, data, trusted=True),
+        }
+        schemas.validate_many(model, data[:1])  # Build the cached adapter outside the timing
+
+        timings = {}
+        for mode, fn in modes.items():
+            best = math.inf
+            for _ in range(max(1, runs)):
+                started = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - started)
+            timings[mode] = best * 1000
+
+        results[model.__name__] = {
+            mode: {
+                "ms": round(ms, 1),
+                "rows_per_s": round(rows / (ms / 1000)) if ms else None,
+                "speedup": round(timings["per_row"] / ms, 2) if ms else None,
+            }
+            for mode, ms in timings.items()
+        }
+
+    return {"rows": rows, "runs": runs, "models": results}
+
+
+def format_validation(result: Dict[str, Any]) -> str:
+    """Human-readable validation benchmark."""
+    lines = [
+        f"Validation: {result['rows']} rows per model (best of {result['runs']})",
+        "=" * 60,
+        f"{'model':<16} {'mode':<9} {'ms':>9} {'rows/s':>11} {'speedup':>8}",
+        "-" * 60,
+    ]
+    for model, modes in result["models"].items():
+        for mode in VALIDATION_MODES:
+            row = modes[mode]
+            lines.append(
+                f"{model:<16} {mode:<9} {row['ms']:>9.1f} {row['rows_per_s']:>11,} {row['speedup']:>7.2f}x"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,678 @@
+"""
+Single-pass rebuild pipeline.
+
+The nightly rebuild used to walk src/ three times (annotate, call graph,
+orphan check), reading and regex-parsing every file on each pass. The
+pipeline reads and parses each file once and feeds every stage from the
+same parse result:
+
+    parse  --[queue]-->  store  --[queue]-->  write-back
+    (thread)             (caller's thread)    (thread)
+
+- parse:      read file, extract symbols, nested functions and calls
+- store:      annotate (find/create code_docs), create missing nested docs,
+              resolve call edges, record the live symbol set
+- write-back: write code_id-annotated sources to disk
+
+Queues are bounded (PIPELINE_QUEUE_SIZE) so parsing, DB work and disk
+writes overlap without buffering the whole tree. When the stream ends the
+collected edges are applied with sync_calls() and orphans are cleaned
+against the recorded symbol set - no second parse.
+
+Checkpoints: the store stage commits every REBUILD_BATCH_FILES files in one
+transaction together with the batch's call edges (rebuild_edges) and the
+run's progress (rebuild_runs). Annotated sources are only written once
+their docs are committed. A killed run loses at most one batch, and
+RebuildPipeline(..., resume=True) continues after the last committed file.
+With defer_writes=True (shadow rebuilds) nothing is written: the annotated
+sources are returned for the caller to write once the docs they reference
+are live - see write_sources().
+
+Usage:
+    from .pipeline import RebuildPipeline
+    result = RebuildPipeline(src_dir).run()
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .annotator import annotate_lines, infer_area, to_src_relative
+from .constants import PIPELINE_QUEUE_SIZE, REBUILD_BATCH_FILES
+from .instrument import count, span
+from .crawler import Symbol, extract_symbols_regex
+from .deep_crawler import FunctionCall, NestedSymbol, extract_function_calls, extract_nested_functions
+from .schemas import CodeCallInput, validate_many
+from .storage import get_connection, store_nested_code_docs, sync_calls
+
+
+# Symbol types without a body - no annotation, nested functions or calls
+BODILESS_TYPES = ('interface', 'type', 'constant', 'variable')
+
+# End-of-stream marker
+_DONE = object()
+
+
+@dataclass
+class ParsedFile:
+    """Everything the pipeline stages need from one source file."""
+    path: Path
+    rel_path: str
+    lines: List[str] = field(default_factory=list)  # keepends=True
+    symbols: List[Symbol] = field(default_factory=list)
+    nested: Dict[str, List[NestedSymbol]] = field(default_factory=dict)
+    calls: Dict[str, List[FunctionCall]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def iter_source_files(src_dir: Path) -> Iterator[Path]:
+    """Yield TS/TSX files under src_dir in sorted order."""
+    files = []
+    for pattern in ('**/*.ts', '**/*.tsx'):
+        files.extend(src_dir.glob(pattern))
+    # Sorted by POSIX path string so checkpoints (last_file) compare consistently
+    yield from sorted(files, key=lambda p: p.as_posix())
+
+
+def parse_source_file(path: Path, base_dir: Path) -> ParsedFile:
+    """Read and parse one file. Errors are recorded, not raised."""
+    parsed = ParsedFile(path=path, rel_path=to_src_relative(str(path), str(base_dir)))
+
+    try:
+        with span("pipeline.read"):
+            source = path.read_text(encoding='utf-8')
+    except Exception as e:
+        parsed.error = f"Error reading {parsed.rel_path}: {e}"
+        return parsed
+    count("pipeline.bytes_read", len(source))
+
+    try:
+        parsed.lines = source.splitlines(keepends=True)
+        parsed.symbols = extract_symbols_regex(source, parsed.rel_path)
+        for symbol in parsed.symbols:
+            parsed.calls[symbol.name] = extract_function_calls(source, symbol)
+            if symbol.type not in BODILESS_TYPES:
+                parsed.nested[symbol.name] = extract_nested_functions(source, symbol)
+    except Exception as e:
+        parsed.error = f"Error parsing {parsed.rel_path}: {e}"
+
+    return parsed
+
+
+class RebuildPipeline:
+    """Streaming annotate + nested docs + call graph + orphan rebuild."""
+
+    def __init__(
+        self,
+        src_dir: Path,
+        verbose: bool = True,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        nested: bool = True,
+        batch_size: int = REBUILD_BATCH_FILES,
+        resume: bool = False,
+        defer_writes: bool = False,
+    ):
+        self.src_dir = Path(src_dir)
+        self.base_dir = self.src_dir.parent
+        self.verbose = verbose
+        self.nested = nested
+        self.batch_size = max(1, batch_size)
+        self.resume = resume
+        self.defer_writes = defer_writes
+
+        self._parsed: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writes: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._failures: List[BaseException] = []
+
+        self.run_id: Optional[int] = None
+        self.phase = 'annotate'
+        self.last_file: Optional[str] = None  # Last committed file
+        self._batch_edges: List[tuple] = []
+        self._batch_writes: List[tuple] = []
+        self.deferred_writes: List[Tuple[Path, str]] = []  # With defer_writes
+
+        self.docs_by_file: Dict[str, List[Dict[str, Any]]] = {}
+        self.known_symbols: Dict[str, Set[str]] = {}
+        self.totals = {
+            'files': 0, 'annotated': 0, 'created': 0, 'skipped': 0,
+            'errors': 0, 'nested': 0, 'written': 0,
+        }
+
+    # -------------------------------------------------------------------------
+    # Driver
+    # -------------------------------------------------------------------------
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all stages and return the combined result.
+
+        Returns:
+            {run_id, resumed_from, files, annotated, created, skipped, errors,
+             nested, written, calls: sync_calls() counts,
+             orphans: clean_orphans() counts, deferred_writes: [(path, text)]
+             left for the caller when defer_writes is set}
+        """
+        from .rebuild import clean_orphans
+
+        if not self.src_dir.exists():
+            print(f"Error: Source directory not found: {self.src_dir}")
+            return dict(self.totals, run_id=None, resumed_from=None, calls={}, orphans={},
+                        deferred_writes=[])
+
+        resumed_from = self._start_run()
+
+        try:
+            if self.phase == 'annotate':
+                self._stream()
+                self._set_phase('calls')
+
+            if self.phase == 'calls':
+                edges = self._load_staged_edges()
+                with span("pipeline.sync_calls", edges=len(edges)):
+                    calls = sync_calls(edges)
+                self._set_phase('orphans')
+            else:
+                calls = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+            calls['calls'] = calls['inserted'] + calls['updated'] + calls['unchanged']
+
+            with span("pipeline.clean_orphans"):
+                orphans = clean_orphans(self.verbose, known_symbols=self.known_symbols)
+            self._finish_run()
+        except BaseException as e:
+            self._fail_run(e)
+            raise
+
+        return dict(self.totals, run_id=self.run_id, resumed_from=resumed_from,
+                    calls=calls, orphans=orphans, deferred_writes=self.deferred_writes)
+
+    def _stream(self) -> None:
+        """Run the parse -> store -> write-back stages over the tree."""
+        with span("pipeline.load_docs"):
+            self._load_docs()
+
+        parser = threading.Thread(target=self._guard, args=(self._parse_stage,), name="rebuild-parse", daemon=True)
+        writer = threading.Thread(target=self._guard, args=(self._write_stage,), name="rebuild-write", daemon=True)
+        parser.start()
+        writer.start()
+
+        try:
+            self._store_stage()
+        except BaseException as e:
+            self._failures.append(e)
+            self._stop.set()
+        finally:
+            self._close(self._writes)
+            parser.join()
+            writer.join()
+
+        if self._failures:
+            raise self._failures[0]
+
+    def _guard(self, stage) -> None:
+        """Run a stage thread, recording failures and stopping the others."""
+        try:
+            stage()
+        except BaseException as e:
+            self._failures.append(e)
+            self._stop.set()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Put with backpressure; gives up once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _close(self, q: queue.Queue) -> None:
+        """Send the end-of-stream marker, dropping queued work if stopping."""
+        while True:
+            try:
+                q.put(_DONE, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _load_docs(self) -> None:
+        """Load every code_doc once, grouped by file."""
+        conn = get_connection()
+        try:
+            for row in conn.execute(
+                "SELECT id, file_path, symbol_name, symbol_type, line_start, parent_id FROM code_docs"
+            ):
+                self.docs_by_file.setdefault(row['file_path'], []).append(dict(row))
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    # Run tracking (rebuild_runs / rebuild_edges)
+    # -------------------------------------------------------------------------
+
+    def _start_run(self) -> Optional[int]:
+        """
+        Create a rebuild_runs row, or pick up an interrupted one.
+
+        Returns:
+            The run id being resumed, or None for a fresh run.
+        """
+        src = self.src_dir.as_posix()
+        conn = get_connection()
+        try:
+            previous = get_resumable_run(src, conn) if self.resume else None
+
+            if previous:
+                self.run_id = previous['id']
+                self.phase = previous['phase']
+                self.last_file = previous['last_file']
+                self.totals.update(json.loads(previous['counts'] or '{}'))
+                conn.execute(
+                    "UPDATE rebuild_runs SET status = 'running', error = NULL, "
+                    "updated_at = datetime('now') WHERE id = ?",
+                    (self.run_id,),
+                )
+                if self.verbose:
+                    print(f"Resuming rebuild run {self.run_id} ({self.phase}) after "
+                          f"{self.last_file or 'start'} - {previous['files_done']} files done")
+            else:
+                if self.resume and self.verbose:
+                    print("No interrupted rebuild to resume - starting a fresh run")
+
+                # A fresh run supersedes anything left unfinished
+                stale = [row[0] for row in conn.execute(
+                    "SELECT id FROM rebuild_runs WHERE status IN ('running', 'failed')"
+                )]
+                conn.executemany(
+                    "UPDATE rebuild_runs SET status = 'abandoned', updated_at = datetime('now') WHERE id = ?",
+                    [(run_id,) for run_id in stale],
+                )
+                conn.executemany("DELETE FROM rebuild_edges WHERE run_id = ?", [(run_id,) for run_id in stale])
+                self.run_id = conn.execute(
+                    "INSERT INTO rebuild_runs (src_dir, counts) VALUES (?, ?)",
+                    (src, json.dumps(self.totals)),
+                ).lastrowid
+            conn.commit()
+        finally:
+            conn.close()
+
+        return previous['id'] if previous else None
+
+    def _checkpoint(self, conn: sqlite3.Connection) -> None:
+        """Commit the current batch: docs, staged edges and progress together."""
+        conn.executemany(
+            """
+            INSERT INTO rebuild_edges (run_id, caller_id, callee_id, callee_name, call_type, line_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            self._batch_edges,
+        )
+        conn.execute(
+            """
+            UPDATE rebuild_runs
+            SET last_file = ?, files_done = ?, counts = ?, updated_at = datetime('now')
+            WHERE id = ?
+            """,
+            (self.last_file, self.totals['files'], json.dumps(self.totals), self.run_id),
+        )
+        with span("pipeline.checkpoint", files=len(self._batch_writes)):
+            conn.commit()
+        count("pipeline.checkpoints")
+        self._batch_edges = []
+
+        # Sources reference the new code_ids, so write them only after commit
+        if self.defer_writes:
+            self.deferred_writes.extend(self._batch_writes)
+        else:
+            for item in self._batch_writes:
+                self._put(self._writes, item)
+        self._batch_writes = []
+
+    def _set_phase(self, phase: str) -> None:
+        """Record that the run moved on to phase."""
+        self.phase = phase
+        conn = get_connection()
+        try:
+            conn.execute(
+                "UPDATE rebuild_runs SET phase = ?, counts = ?, updated_at = datetime('now') WHERE id = ?",
+                (phase, json.dumps(self.totals), self.run_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _load_staged_edges(self) -> List[Dict[str, Any]]:
+        """All call edges committed by this run (checked by _collect_calls before staging)."""
+        conn = get_connection()
+        try:
+            return [
+                dict(row)
+                for row in conn.execute(
+                    """
+                    SELECT caller_id, callee_id, callee_name, call_type, line_number
+                    FROM rebuild_edges WHERE run_id = ?
+                    """,
+                    (self.run_id,),
+                )
+            ]
+        finally:
+            conn.close()
+
+    def _finish_run(self) -> None:
+        """Mark the run done and drop its staged edges."""
+        conn = get_connection()
+        try:
+            conn.execute(
+                """
+                UPDATE rebuild_runs
+                SET status = 'done', phase = 'done', counts = ?,
+                    updated_at = datetime('now'), finished_at = datetime('now')
+                WHERE id = ?
+                """,
+                (json.dumps(self.totals), self.run_id),
+            )
+            conn.execute("DELETE FROM rebuild_edges WHERE run_id = ?", (self.run_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _fail_run(self, error: BaseException) -> None:
+        """Best-effort: record the failure so --resume can pick the run up."""
+        if self.run_id is None:
+            return
+        try:
+            conn = get_connection()
+            try:
+                conn.execute(
+                    "UPDATE rebuild_runs SET status = 'failed', error = ?, updated_at = datetime('now') WHERE id = ?",
+                    (f"{type(error).__name__}: {error}", self.run_id),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    # -------------------------------------------------------------------------
+    # Stages
+    # -------------------------------------------------------------------------
+
+    def _parse_stage(self) -> None:
+        """Producer: walk the tree once, parse each file once."""
+        try:
+            for path in iter_source_files(self.src_dir):
+                if self.last_file and to_src_relative(str(path), str(self.base_dir)) <= self.last_file:
+                    continue  # Committed by the run being resumed
+                with span("pipeline.parse_file"):
+                    parsed = parse_source_file(path, self.base_dir)
+                if not self._put(self._parsed, parsed):
+                    return
+        finally:
+            self._close(self._parsed)
+
+    def _store_stage(self) -> None:
+        """Consumer: all DB-facing work for each parsed file, in batches."""
+        conn = get_connection()
+        try:
+            in_batch = 0
+            while True:
+                with span("pipeline.store_wait"):
+                    parsed = self._parsed.get()
+                if parsed is _DONE or self._stop.is_set():
+                    break
+
+                self._store_file(parsed, conn)
+                self.last_file = parsed.rel_path
+                in_batch += 1
+
+                if in_batch >= self.batch_size:
+                    self._checkpoint(conn)
+                    in_batch = 0
+
+            if not self._stop.is_set():
+                self._checkpoint(conn)
+        finally:
+            conn.close()  # Uncommitted batch (if any) is rolled back
+
+    def _store_file(self, parsed: ParsedFile, conn: sqlite3.Connection) -> None:
+        """Annotate, store nested docs and collect edges for one file."""
+        self.totals['files'] += 1
+        count("pipeline.files")
+        if self.verbose:
+            print(parsed.rel_path)
+
+        if parsed.error:
+            if self.verbose:
+                print(f"  ! {parsed.error}")
+            self.totals['errors'] += 1
+            return
+
+        if not parsed.symbols:
+            self.known_symbols[parsed.rel_path] = set()
+            return
+
+        with span("pipeline.annotate"):
+            self._annotate(parsed, conn)
+        if self.nested:
+            with span("pipeline.nested"):
+                self._store_nested(parsed, conn)
+        with span("pipeline.calls"):
+            self._collect_calls(parsed)
+
+        names = {symbol.name for symbol in parsed.symbols}
+        for nested in parsed.nested.values():
+            names.update(n.name for n in nested)
+        self.known_symbols[parsed.rel_path] = names
+
+    def _write_stage(self) -> None:
+        """Write annotated sources back to disk."""
+        while True:
+            item = self._writes.get()
+            if item is _DONE:
+                return
+            path, text = item
+            try:
+                with span("pipeline.write"):
+                    path.write_text(text, encoding='utf-8')
+                self.totals['written'] += 1
+            except Exception as e:
+                if self.verbose:
+                    print(f"  ! Error writing {path}: {e}")
+                self.totals['errors'] += 1
+
+    # -------------------------------------------------------------------------
+    # Store-stage steps
+    # -------------------------------------------------------------------------
+
+    def _annotate(self, parsed: ParsedFile, conn: sqlite3.Connection) -> None:
+        """Find/create top-level docs and stage the annotated source."""
+        result = annotate_lines(
+            parsed.rel_path,
+            parsed.lines,
+            parsed.symbols,
+            self.docs_by_file,
+            str(self.base_dir),
+            dry_run=False,
+            verbose=self.verbose,
+            conn=conn,
+        )
+        if result.pop('modified'):
+            self._batch_writes.append((parsed.path, ''.join(parsed.lines)))
+        for key, n in result.items():
+            self.totals[key] += n
+
+    def _store_nested(self, parsed: ParsedFile, conn: sqlite3.Connection) -> None:
+        """Create docs for nested functions that don't have one yet."""
+        docs = self.docs_by_file.setdefault(parsed.rel_path, [])
+        top_level = {d['symbol_name']: d['id'] for d in docs if d.get('symbol_name') and not d.get('parent_id')}
+        existing = {(d['parent_id'], d['symbol_name']) for d in docs if d.get('parent_id')}
+        # code_docs is UNIQUE(file_path, symbol_name, line_start) - arrow functions
+        # the symbol regex already picked up as top-level docs must not be re-stored
+        taken = {(d['symbol_name'], d['line_start']) for d in docs}
+        area = infer_area(parsed.rel_path)
+
+        rows = []
+        for parent_name, nested_funcs in parsed.nested.items():
+            parent_id = top_level.get(parent_name)
+            if not parent_id:
+                continue
+
+            for nested in nested_funcs:
+                if (parent_id, nested.name) in existing or (nested.name, nested.line_start) in taken:
+                    continue
+
+                rows.append({
+                    'file_path': parsed.rel_path,
+                    'symbol_name': nested.name,
+                    'symbol_type': nested.type,
+                    'parent_id': parent_id,
+                    'line_start': nested.line_start,
+                    'line_end': nested.line_end,
+                    'signature': nested.signature,
+                    'purpose': f"TODO: Document {nested.name}",
+                    'area': area,
+                })
+                existing.add((parent_id, nested.name))
+                taken.add((nested.name, nested.line_start))
+
+        # One trusted validation and a few multi-row INSERTs per file
+        for row, nested_id in zip(rows, store_nested_code_docs(rows, conn=conn)):
+            docs.append({'id': nested_id, 'file_path': row['file_path'], 'symbol_name': row['symbol_name'],
+                         'symbol_type': row['symbol_type'], 'line_start': row['line_start'],
+                         'parent_id': row['parent_id']})
+            self.totals['nested'] += 1
+            if self.verbose:
+                print(f"    + nested: {row['symbol_name']} ({row['symbol_type']}) -> code_id:{nested_id}")
+
+    def _collect_calls(self, parsed: ParsedFile) -> None:
+        """
+        Resolve same-file call edges against the file's docs.
+
+        Nested docs make names ambiguous within a file (two components may
+        each define handleKeyDown), so the caller is matched on its start
+        line and the callee prefers a doc under the caller's top-level
+        symbol, then a top-level doc.
+        """
+        docs = [d for d in self.docs_by_file.get(parsed.rel_path, []) if d.get('symbol_name')]
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for d in docs:
+            by_name.setdefault(d['symbol_name'], []).append(d)
+        parents = {d['id']: d.get('parent_id') for d in docs}
+
+        def root(doc_id: int) -> int:
+            while parents.get(doc_id):
+                doc_id = parents[doc_id]
+            return doc_id
+
+        def resolve_caller(call: Any) -> Optional[int]:
+            candidates = by_name.get(call.caller_name)
+            if not candidates:
+                return None
+            for d in candidates:
+                if d['line_start'] == call.caller_line_start:
+                    return d['id']
+            return candidates[-1]['id']
+
+        def resolve_callee(name: str, caller_id: int) -> Optional[int]:
+            candidates = by_name.get(name)
+            if not candidates:
+                return None
+            if len(candidates) > 1:
+                scope = root(caller_id)
+                for d in candidates:
+                    if d.get('parent_id') and root(d['id']) == scope:
+                        return d['id']
+                top_level = [d for d in candidates if not d.get('parent_id')]
+                if top_level:
+                    return top_level[-1]['id']
+            return candidates[-1]['id']
+
+        rows = []
+        for calls in parsed.calls.values():
+            for call in calls:
+                caller_id = resolve_caller(call)
+                callee_id = resolve_callee(call.callee_name, caller_id) if caller_id else None  # Same file for now
+
+                if caller_id and callee_id and caller_id != callee_id:
+                    rows.append({
+                        'caller_id': caller_id,
+                        'callee_name': call.callee_name,
+                        'call_type': call.call_type,
+                        'callee_id': callee_id,
+                        'line_number': call.line_number,
+                    })
+
+        # Ids come from code_docs and lines from the parser - only call_type is checked
+        for edge in validate_many(CodeCallInput, rows, trusted=True):
+            self._batch_edges.append((
+                self.run_id, edge['caller_id'], edge['callee_id'],
+                edge['callee_name'], edge['call_type'], edge['line_number'],
+            ))
+
+
+# =============================================================================
+# RUN HISTORY
+# =============================================================================
+
+def write_sources(writes: List[Tuple[Path, str]], verbose: bool = True) -> Dict[str, int]:
+    """
+    Write annotated sources held back by a defer_writes pipeline.
+
+    Returns:
+        {written, errors}
+    """
+    counts = {'written': 0, 'errors': 0}
+    for path, text in writes:
+        try:
+            with span("pipeline.write"):
+                path.write_text(text, encoding='utf-8')
+            counts['written'] += 1
+        except Exception as e:
+            if verbose:
+                print(f"  ! Error writing {path}: {e}")
+            counts['errors'] += 1
+    return counts
+
+
+def get_resumable_run(src_dir: str, conn: Optional[sqlite3.Connection] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get the most recent unfinished (running or failed) run for src_dir.
+
+    A run left 'running' was killed without a chance to record the failure.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        row = conn.execute(
+            """
+            SELECT * FROM rebuild_runs
+            WHERE status IN ('running', 'failed') AND src_dir = ?
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (src_dir,),
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def list_rebuild_runs(limit: int = 10) -> List[Dict[str, Any]]:
+    """Recent rebuild runs, newest first."""
+    conn = get_connection()
+    try:
+        cursor = conn.execute("SELECT * FROM rebuild_runs ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
@@ -0,0 +1,280 @@
+"""
+Opt-in query log: statement timings, callers and slow-query plans.
+
+Off by default. Turn it on per process with environment variables:
+
+    TEAM_QUERY_LOG=1              log to the query_log table in team.db
+    TEAM_QUERY_LOG=queries.jsonl  log to a JSON Lines file instead
+    TEAM_SLOW_QUERY_MS=10         plan threshold (default SLOW_QUERY_MS)
+
+While enabled, get_connection() opens TracedConnection instead of a plain
+connection (except where the caller opts out, e.g. the watch poller). Every execute/executemany/commit is timed and attributed to the
+toolbox function that issued it. A set_trace_callback hook counts the
+statements SQLite actually ran for the call (implicit BEGIN, trigger steps).
+Statements over the threshold also get their EXPLAIN QUERY PLAN.
+
+A SELECT is timed until execute() returns, which includes any sort but not
+rows fetched later. Records are buffered and written by flush(), which runs
+at exit (the CLI daemon flushes after every command, the writer process
+whenever flush_due() says so). Buffering keeps log writes out of the
+caller's transactions.
+
+Report with `python -m team.toolbox.cli perf queries`.
+"""
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from .constants import QUERY_LOG_FLUSH_RECORDS, QUERY_LOG_FLUSH_SECONDS, SLOW_QUERY_MS
+
+
+# Statement kinds EXPLAIN QUERY PLAN says something useful about
+_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+# Wrapper frames skipped when attributing a statement to its caller
+_WRAPPER_FUNCTIONS = frozenset({"execute", "executemany", "commit", "rollback", "unit"})
+
+_sink: Optional[str] = None          # "db" or a JSONL path; None = disabled
+_threshold_ms: float = SLOW_QUERY_MS
+_records: Deque[Dict[str, Any]] = deque()  # Appended from any thread, drained by flush()
+_db_path: Optional[Path] = None      # Where "db" records go (set by the first traced connect)
+_atexit_registered = False
+_last_flush = time.monotonic()
+
+
+def enable(sink: str = "db", threshold_ms: Optional[float] = None) -> None:
+    """
+    Start logging statements from connections opened after this call.
+
+    Args:
+        sink: "db" for the query_log table, or a .jsonl file path
+        threshold_ms: Capture EXPLAIN QUERY PLAN above this duration
+    """
+    global _sink, _threshold_ms, _atexit_registered
+    # Resolve now - the CLI daemon changes directory per command
+    _sink = sink if sink == "db" else str(Path(sink).resolve())
+    if threshold_ms is not None:
+        _threshold_ms = float(threshold_ms)
+    if not _atexit_registered:
+        atexit.register(flush)
+        _atexit_registered = True
+
+
+def disable() -> None:
+    """Flush buffered records and stop logging new connections."""
+    global _sink
+    flush()
+    _sink = None
+
+
+def is_enabled() -> bool:
+    """Whether new connections are traced."""
+    return _sink is not None
+
+
+def connection_factory(db_path: Path, traced: bool = True) -> type:
+    """
+    Connection class for sqlite3.connect(factory=...).
+
+    Args:
+        traced: False for connections whose statements don't belong to any
+                command (background pollers)
+    """
+    global _db_path
+    if _sink is None or not traced:
+        return sqlite3.Connection
+    if _db_path is None:
+        _db_path = db_path
+    return TracedConnection
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+def _value_type(value: Any) -> str:
+    return "None" if value is None else type(value).__name__
+
+
+def params_shape(parameters: Any) -> str:
+    """Describe bound parameters without their values, e.g. "(int, str)"."""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {_value_type(v)}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_value_type(v) for v in parameters) + ")"
+    return ""
+
+
+def _caller() -> str:
+    """module.function of the toolbox code that issued the statement."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module != __name__ and not (
+            module.startswith(__package__ or "") and frame.f_code.co_name in _WRAPPER_FUNCTIONS
+        ):
+            return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _format_plan(rows: Iterable[tuple]) -> str:
+    """EXPLAIN QUERY PLAN rows (id, parent, notused, detail) as an indented tree."""
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines)
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3.Connection that times statements into the query log."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._traced = 0
+        self._explaining = False
+        self.set_trace_callback(self._on_statement)
+
+    def _on_statement(self, statement: str) -> None:
+        if not self._explaining:
+            self._traced += 1
+
+    def _record(self, sql: str, params: str, started: float, plan_params: Any = None) -> None:
+        duration_ms = (time.perf_counter() - started) * 1000
+        record = {
+            "sql": _WHITESPACE.sub(" ", sql).strip(),
+            "params": params,
+            "duration_ms": round(duration_ms, 3),
+            "statements": self._traced,
+            "caller": _caller(),
+            "plan": None,
+        }
+        if duration_ms >= _threshold_ms and plan_params is not None and _EXPLAINABLE.match(sql):
+            record["plan"] = self._explain(sql, plan_params)
+        _records.append(record)
+
+    def _explain(self, sql: str, parameters: Any) -> Optional[str]:
+        self._explaining = True
+        try:
+            return _format_plan(super().execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall())
+        except sqlite3.Error as e:
+            return f"(plan unavailable: {e})"
+        finally:
+            self._explaining = False
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        self._traced = 0
+        started = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        self._record(sql, params_shape(parameters), started, parameters)
+        return cursor
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        rows = seq_of_parameters if isinstance(seq_of_parameters, list) else list(seq_of_parameters)
+        self._traced = 0
+        started = time.perf_counter()
+        cursor = super().executemany(sql, rows)
+        shape = f"{len(rows)} x {params_shape(rows[0])}" if rows else "0 rows"
+        self._record(sql, shape, started, rows[0] if rows else None)
+        return cursor
+
+    def commit(self) -> None:
+        if not self.in_transaction:
+            return super().commit()
+        self._traced = 0
+        started = time.perf_counter()
+        super().commit()
+        self._record("COMMIT", "", started)
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+def flush_due() -> bool:
+    """Whether a long-running process should flush now (by size or age)."""
+    if not _records or _sink is None:
+        return False
+    return (
+        len(_records) >= QUERY_LOG_FLUSH_RECORDS
+        or time.monotonic() - _last_flush >= QUERY_LOG_FLUSH_SECONDS
+    )
+
+
+def _drain() -> List[Dict[str, Any]]:
+    """Take every buffered record. popleft() is atomic, so appends from
+    other threads are either taken now or left for the next flush."""
+    records = []
+    while True:
+        try:
+            records.append(_records.popleft())
+        except IndexError:
+            return records
+
+
+def flush(command: Optional[str] = None) -> int:
+    """
+    Write buffered records to the sink.
+
+    Never raises - a broken query log must not fail the command.
+
+    Args:
+        command: What the records belong to (default: this process's argv)
+
+    Returns:
+        Number of records written.
+    """
+    global _last_flush
+    if not _records or _sink is None:
+        return 0
+
+    records = _drain()
+    _last_flush = time.monotonic()
+    command = (command if command is not None else " ".join(sys.argv[1:]))[:200]
+    try:
+        if _sink == "db":
+            # Plain connection - logging its own inserts would never end
+            conn = sqlite3.connect(str(_db_path), timeout=5)
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO query_log (sql, params, duration_ms, statements, caller, plan, command)
+                    VALUES (:sql, :params, :duration_ms, :statements, :caller, :plan, :command)
+                    """,
+                    [{**r, "command": command} for r in records],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        else:
+            with open(_sink, "a", encoding="utf-8") as f:
+                for r in records:
+                    f.write(json.dumps({**r, "command": command}) + "\n")
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: could not write query log: {e}", file=sys.stderr)
+        return 0
+    return len(records)
+
+
+def enable_from_env() -> None:
+    """Apply TEAM_QUERY_LOG / TEAM_SLOW_QUERY_MS."""
+    setting = os.environ.get("TEAM_QUERY_LOG", "").strip()
+    if not setting or setting.lower() in ("0", "false", "off"):
+        return
+    threshold = os.environ.get("TEAM_SLOW_QUERY_MS")
+    sink = setting if setting.lower().endswith(".jsonl") else "db"
+    enable(sink, float(threshold) if threshold else None)
+
+
+enable_from_env()
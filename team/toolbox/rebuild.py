@@ -1,23 +1,52 @@
 """
 Nightly documentation rebuild.
 
-Keeps code_docs and code_calls fresh by:
-1. Running the annotator to update/create docs
-2. Rebuilding the call graph
-3. Cleaning orphaned docs (deleted files)
-
-Run: python -m team.toolbox.rebuild
+Keeps code_docs and code_calls fresh in a single pass over src/ (see
+pipeline.py) that:
+1. Runs the annotator to update/create docs (and nested docs)
+2. Rebuilds the call graph (diffed against the stored edges)
+3. Cleans orphaned docs (deleted files and removed symbols)
+
+With --shadow the rebuild runs against a snapshot copy of team.db and the
+derived tables (code_docs, code_calls) are swapped into team.db in one short
+transaction at the end, so agents never query a half-rebuilt graph and the
+write lock is held for milliseconds rather than the whole run.
+
+Run: python -m team.toolbox.rebuild [--shadow | --resume] [--quiet]
+     [--profile] [--trace rebuild.trace.json] [--cprofile rebuild.prof]
 """
 
+import sqlite3
 from pathlib import Path
-from .annotator import annotate_codebase
+from typing import Dict, Optional, Set, Tuple
+
 from .crawler import extract_symbols_regex
-from .deep_crawler import extract_function_calls
-from .storage import get_connection, query_code_docs, store_call
+from .instrument import span, timed, profiling
+from .pipeline import RebuildPipeline, write_sources
+from .storage import get_connection, get_db_path, use_database
+
+
+# Tables rebuilt from source - everything else in team.db is authored data
+DERIVED_TABLES = ('code_docs', 'code_calls')
+
+# Reference tables pointing into code_docs; rows for removed docs are dropped on swap
+CODE_REF_TABLES = ('bug_code_refs', 'changelog_code_refs', 'learning_code_refs')
+
+
+class RebuildError(Exception):
+    """Shadow rebuild could not be applied."""
+    pass
 
 
-def rebuild_docs(verbose: bool = True):
-    """Full rebuild of code_docs and code_calls."""
+def rebuild_docs(verbose: bool = True, resume: bool = False, defer_writes: bool = False):
+    """
+    Full rebuild of code_docs and code_calls in one pass over src/.
+
+    Progress is checkpointed in rebuild_runs every REBUILD_BATCH_FILES files.
+    With resume=True an interrupted run continues after its last checkpoint.
+    With defer_writes=True no source file is touched; the annotated sources
+    are returned as 'deferred_writes' (see pipeline.write_sources()).
+    """
 
     if verbose:
         print("=" * 60)
@@ -25,48 +54,47 @@ def rebuild_docs(verbose: bool = True):
         print("=" * 60)
         print()
 
-    # 1. Clear stale code_calls (will rebuild fresh)
-    if verbose:
-        print("Clearing old code_calls...")
-    conn = get_connection()
-    conn.execute("DELETE FROM code_calls")
-    conn.commit()
-    conn.close()
-
-    # 2. Run annotator - creates/updates code_docs, adds code_id comments
+    # Annotate, nested docs, call graph and orphan tracking all run from a
+    # single parse of each file (see pipeline.py)
     if verbose:
-        print("\n=== PHASE 1: ANNOTATE CODEBASE ===\n")
+        print("\n=== ANNOTATE + CALL GRAPH (single pass) ===\n")
 
     src_dir = Path(__file__).parent.parent.parent / 'src'
-    result = annotate_codebase(str(src_dir), dry_run=False, verbose=verbose)
+    with span("rebuild.pipeline"):
+        result = RebuildPipeline(src_dir, verbose=verbose, resume=resume, defer_writes=defer_writes).run()
+    graph = result['calls']
+    orphans = result['orphans']
+    orphaned = sum(orphans.get(key, 0) for key in ('files', 'symbols', 'nested'))
 
     if verbose:
         print(f"\n--- Annotation Summary ---")
+        if result['resumed_from']:
+            print(f"Resumed run: {result['resumed_from']}")
         print(f"Files processed: {result['files']}")
         print(f"Symbols annotated: {result['annotated']}")
         print(f"New docs created: {result['created']}")
+        print(f"Nested docs created: {result['nested']}")
         print(f"Skipped (already done): {result['skipped']}")
+        if defer_writes:
+            print(f"Files to rewrite: {len(result['deferred_writes'])}")
+        else:
+            print(f"Files rewritten: {result['written']}")
         print(f"Errors: {result['errors']}")
 
-    # 3. Rebuild code_calls from fresh AST
-    if verbose:
-        print(f"\n=== PHASE 2: REBUILD CALL GRAPH ===\n")
-
-    calls_created = rebuild_call_graph(src_dir, verbose)
-
-    if verbose:
         print(f"\n--- Call Graph Summary ---")
-        print(f"Call relationships created: {calls_created}")
-
-    # 4. Clean orphaned docs (file no longer exists)
-    if verbose:
-        print(f"\n=== PHASE 3: CLEAN ORPHANS ===\n")
-
-    orphaned = clean_orphans(verbose)
+        print(f"Call relationships: {graph.get('calls', 0)}")
+        print(f"  Inserted:  {graph.get('inserted', 0)}")
+        print(f"  Updated:   {graph.get('updated', 0)}")
+        print(f"  Deleted:   {graph.get('deleted', 0)}")
+        print(f"  Unchanged: {graph.get('unchanged', 0)}")
 
-    if verbose:
         print(f"\n--- Cleanup Summary ---")
         print(f"Orphaned docs removed: {orphaned}")
+        print(f"  Deleted files:   {orphans.get('files', 0)}")
+        print(f"  Removed symbols: {orphans.get('symbols', 0)}")
+        print(f"  Nested docs:     {orphans.get('nested', 0)}")
+        print(f"Call relationships removed: {orphans.get('calls', 0)}")
+        print(f"Code refs removed: {orphans.get('refs', 0)}")
 
     if verbose:
         print("\n" + "=" * 60)
@@ -74,108 +102,319 @@ def rebuild_docs(verbose: bool = True):
         print("=" * 60)
 
     return {
+        'run_id': result['run_id'],
         'files': result['files'],
         'annotated': result['annotated'],
         'created': result['created'],
-        'calls': calls_created,
+        'nested': result['nested'],
+        'written': result['written'],
+        'deferred_writes': result['deferred_writes'],
+        'calls': graph.get('calls', 0),
+        'call_changes': graph,
         'orphans_cleaned': orphaned,
+        'orphans': orphans,
     }
 
 
-def rebuild_call_graph(src_dir: Path, verbose: bool = True) -> int:
-    """Rebuild code_calls table from fresh AST analysis."""
-    calls_created = 0
+@timed("rebuild.clean_orphans")
+def clean_orphans(
+    verbose: bool = True,
+    known_symbols: Optional[Dict[str, Set[str]]] = None,
+) -> Dict[str, int]:
+    """
+    Remove docs for files/symbols that no longer exist.
+
+    Checks each distinct file once, re-extracts symbols from surviving
+    TS/TSX files (unless the caller already parsed them and passes
+    known_symbols: {rel_path: symbol names}), then deletes orphaned
+    code_docs (plus nested docs under them) and their code_calls and
+    CODE_REF_TABLES rows with set-based statements in a single transaction.
+
+    Returns:
+        Counts per category: files, symbols, nested (docs removed because
+        their file, symbol or parent is gone), calls and refs (rows removed).
+    """
+    base_dir = Path(__file__).parent.parent.parent
+    counts = {'files': 0, 'symbols': 0, 'nested': 0, 'calls': 0, 'refs': 0}
 
-    # Get all code_docs to map symbol names to IDs
-    all_docs = query_code_docs(limit=10000)
-    symbol_to_id = {}
-    for doc in all_docs:
-        key = f"{doc['file_path']}:{doc['symbol_name']}"
-        symbol_to_id[key] = doc['id']
+    conn = get_connection()
+    try:
+        doc_files = [row[0] for row in conn.execute("SELECT DISTINCT file_path FROM code_docs")]
+
+        # Current file set and, for TS/TSX files, current symbol set
+        live_files = []
+        scanned_files = []
+        live_symbols = []
+        for rel_path in doc_files:
+            path = base_dir / rel_path
+            if not path.is_file():
+                continue
+            live_files.append((rel_path,))
+
+            if known_symbols is not None and rel_path in known_symbols:
+                scanned_files.append((rel_path,))
+                live_symbols.extend((rel_path, name) for name in known_symbols[rel_path])
+                continue
+
+            if path.suffix not in ('.ts', '.tsx'):
+                continue
+            try:
+                content = path.read_text(encoding='utf-8')
+                symbols = extract_symbols_regex(content, rel_path)
+            except Exception as e:
+                if verbose:
+                    print(f"  Skipping symbol check for {rel_path}: {e}")
+                continue
+            scanned_files.append((rel_path,))
+            live_symbols.extend((rel_path, symbol.name) for symbol in symbols)
+
+        conn.executescript("""
+            CREATE TEMP TABLE IF NOT EXISTS live_files (file_path TEXT PRIMARY KEY);
+            CREATE TEMP TABLE IF NOT EXISTS scanned_files (file_path TEXT PRIMARY KEY);
+            CREATE TEMP TABLE IF NOT EXISTS live_symbols (
+                file_path TEXT, symbol_name TEXT, PRIMARY KEY (file_path, symbol_name)
+            );
+            CREATE TEMP TABLE IF NOT EXISTS orphan_docs (id INTEGER PRIMARY KEY, reason TEXT);
+        """)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO live_files VALUES (?)", live_files)
+            conn.executemany("INSERT OR IGNORE INTO scanned_files VALUES (?)", scanned_files)
+            conn.executemany("INSERT OR IGNORE INTO live_symbols VALUES (?, ?)", live_symbols)
+
+            # File deleted
+            conn.execute("""
+                INSERT INTO orphan_docs (id, reason)
+                SELECT id, 'files' FROM code_docs
+                WHERE file_path NOT IN (SELECT file_path FROM live_files)
+            """)
+
+            # File still exists but the top-level symbol is gone
+            conn.execute("""
+                INSERT OR IGNORE INTO orphan_docs (id, reason)
+                SELECT d.id, 'symbols' FROM code_docs d
+                WHERE d.parent_id IS NULL
+                  AND d.symbol_name IS NOT NULL
+                  AND d.symbol_type != 'file'
+                  AND d.file_path IN (SELECT file_path FROM scanned_files)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM live_symbols s
+                      WHERE s.file_path = d.file_path AND s.symbol_name = d.symbol_name
+                  )
+            """)
+
+            # Nested docs under anything removed above
+            conn.execute("""
+                INSERT OR IGNORE INTO orphan_docs (id, reason)
+                WITH RECURSIVE descendants(id) AS (
+                    SELECT id FROM orphan_docs
+                    UNION
+                    SELECT d.id FROM code_docs d JOIN descendants p ON d.parent_id = p.id
+                )
+                SELECT id, 'nested' FROM descendants
+            """)
+
+            for reason, count in conn.execute(
+                "SELECT reason, COUNT(*) FROM orphan_docs GROUP BY reason"
+            ):
+                counts[reason] = count
 
-    # Find all TS/TSX files
-    patterns = ['**/*.ts', '**/*.tsx']
-    files = []
-    for pattern in patterns:
-        files.extend(src_dir.glob(pattern))
+            if verbose:
+                for row in conn.execute("""
+                    SELECT d.symbol_name, d.file_path, o.reason
+                    FROM orphan_docs o JOIN code_docs d ON d.id = o.id
+                    ORDER BY d.file_path, d.line_start
+                """):
+                    print(f"  Removing orphan ({row[2]}): {row[0]} ({row[1]})")
+
+            counts['calls'] = conn.execute("""
+                DELETE FROM code_calls
+                WHERE caller_id IN (SELECT id FROM orphan_docs)
+                   OR callee_id IN (SELECT id FROM orphan_docs)
+            """).rowcount
+
+            for table in CODE_REF_TABLES:
+                counts['refs'] += conn.execute(
+                    f"DELETE FROM {table} WHERE code_doc_id IN (SELECT id FROM orphan_docs)"
+                ).rowcount
+
+            conn.execute("DELETE FROM code_docs WHERE id IN (SELECT id FROM orphan_docs)")
+            conn.execute("DELETE FROM orphan_docs")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
 
-    for file_path in sorted(files):
-        rel_path = str(file_path.relative_to(src_dir.parent)).replace('\\', '/')
+    return counts
 
-        try:
-            content = file_path.read_text(encoding='utf-8')
-        except Exception as e:
-            if verbose:
-                print(f"  Error reading {rel_path}: {e}")
-            continue
 
-        # First extract symbols from the file
-        try:
-            symbols = extract_symbols_regex(content, rel_path)
-        except Exception as e:
-            if verbose:
-                print(f"  Error extracting symbols from {rel_path}: {e}")
-            continue
+# =============================================================================
+# SHADOW REBUILD
+# =============================================================================
+
+def get_shadow_path() -> Path:
+    """Get the path of the shadow database used by rebuild_docs_shadow()."""
+    db_path = get_db_path()
+    return db_path.with_name(db_path.name + '.shadow')
+
+
+def _code_docs_fingerprint(conn: sqlite3.Connection) -> Tuple:
+    """Cheap change detector for code_docs edits made outside the rebuild."""
+    return tuple(conn.execute(
+        "SELECT COUNT(*), MAX(id), MAX(updated_at) FROM code_docs"
+    ).fetchone())
 
-        # For each symbol, extract function calls
-        for symbol in symbols:
+
+@timed("rebuild.snapshot")
+def snapshot_database(dest: Path) -> None:
+    """
+    Copy team.db to dest as a consistent snapshot.
+
+    Uses VACUUM INTO (SQLite 3.27+), which only needs a read transaction,
+    falling back to the online backup API.
+    """
+    for path in (dest, dest.with_name(dest.name + '-journal')):
+        path.unlink(missing_ok=True)
+
+    conn = get_connection()
+    try:
+        if sqlite3.sqlite_version_info >= (3, 27, 0):
+            conn.execute("VACUUM INTO ?", (str(dest),))
+        else:
+            target = sqlite3.connect(str(dest))
             try:
-                calls = extract_function_calls(content, symbol)
-
-                for call in calls:
-                    # Find caller and callee IDs
-                    caller_key = f"{rel_path}:{call.caller_name}"
-                    callee_key = f"{rel_path}:{call.callee_name}"  # Same file for now
-
-                    caller_id = symbol_to_id.get(caller_key)
-                    callee_id = symbol_to_id.get(callee_key)
-
-                    if caller_id and callee_id and caller_id != callee_id:
-                        store_call(
-                            caller_id=caller_id,
-                            callee_name=call.callee_name,
-                            call_type=call.call_type,
-                            callee_id=callee_id,
-                            line_number=call.line_number,
-                        )
-                        calls_created += 1
+                conn.backup(target)
+            finally:
+                target.close()
+    finally:
+        conn.close()
 
-            except Exception as e:
-                if verbose:
-                    print(f"  Error extracting calls from {symbol.name} in {rel_path}: {e}")
 
-    return calls_created
+@timed("rebuild.swap")
+def swap_derived_tables(shadow_path: Path, expected_fingerprint: Tuple) -> Dict[str, int]:
+    """
+    Replace code_docs/code_calls in team.db with the shadow's copies.
 
+    Runs in one BEGIN IMMEDIATE transaction - WAL readers keep seeing the old
+    graph until it commits. Code refs pointing at docs that no longer exist
+    are dropped; refs added to team.db during the rebuild are kept.
 
-def clean_orphans(verbose: bool = True) -> int:
-    """Remove docs for files/symbols that no longer exist."""
-    all_docs = query_code_docs(limit=10000)
-    orphaned = 0
-    base_dir = Path(__file__).parent.parent.parent
+    Raises:
+        RebuildError: If code_docs in team.db changed since the snapshot
+            (someone documented a symbol mid-rebuild - rerun to pick it up).
+    """
+    counts = {}
 
-    for doc in all_docs:
-        file_path = base_dir / doc['file_path']
+    conn = get_connection()
+    try:
+        conn.execute("ATTACH DATABASE ? AS shadow", (str(shadow_path),))
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if _code_docs_fingerprint(conn) != expected_fingerprint:
+                    raise RebuildError(
+                        "code_docs changed in team.db during the shadow rebuild; "
+                        "nothing was swapped - rerun the rebuild"
+                    )
+
+                for table in DERIVED_TABLES:
+                    conn.execute(f"DELETE FROM main.{table}")
+                    counts[table] = conn.execute(
+                        f"INSERT INTO main.{table} SELECT * FROM shadow.{table}"
+                    ).rowcount
+
+                counts['refs_removed'] = 0
+                for table in CODE_REF_TABLES:
+                    counts['refs_removed'] += conn.execute(
+                        f"DELETE FROM main.{table} "
+                        f"WHERE code_doc_id NOT IN (SELECT id FROM main.code_docs)"
+                    ).rowcount
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute("DETACH DATABASE shadow")
+    finally:
+        conn.close()
+
+    return counts
+
+
+def rebuild_docs_shadow(verbose: bool = True):
+    """
+    Rebuild into a shadow copy of team.db, then swap the derived tables in.
+
+    The code_id comments in src/ name shadow ids, so annotated sources are
+    only written once the swap has committed those ids to team.db. A refused
+    swap (RebuildError) leaves src/ untouched.
+
+    Returns:
+        rebuild_docs() result plus 'swapped' (rows per derived table).
+    """
+    shadow_path = get_shadow_path()
 
-        if not file_path.exists():
-            # File deleted - remove doc
-            if verbose:
-                print(f"  Removing orphan: {doc['symbol_name']} ({doc['file_path']})")
+    conn = get_connection()
+    try:
+        fingerprint = _code_docs_fingerprint(conn)
+    finally:
+        conn.close()
 
-            conn = get_connection()
-            conn.execute("DELETE FROM code_docs WHERE id = ?", (doc['id'],))
-            conn.commit()
-            conn.close()
-            orphaned += 1
+    if verbose:
+        print(f"Snapshotting team.db to {shadow_path.name}...")
+    snapshot_database(shadow_path)
+
+    try:
+        with use_database(shadow_path):
+            result = rebuild_docs(verbose, defer_writes=True)
+
+        if verbose:
+            print("\nSwapping rebuilt tables into team.db...")
+        result['swapped'] = swap_derived_tables(shadow_path, fingerprint)
 
-    return orphaned
+        if verbose:
+            for table, count in result['swapped'].items():
+                print(f"  {table}: {count}")
+
+        writes = write_sources(result.pop('deferred_writes'), verbose)
+        result['written'] = writes['written']
+        if verbose:
+            print(f"Files rewritten: {writes['written']} ({writes['errors']} errors)")
+    finally:
+        for path in (shadow_path, shadow_path.with_name(shadow_path.name + '-journal')):
+            path.unlink(missing_ok=True)
+
+    return result
 
 
 def main():
     """CLI entry point."""
-    import sys
-
-    verbose = '--quiet' not in sys.argv
-    rebuild_docs(verbose=verbose)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Nightly documentation rebuild")
+    parser.add_argument("--quiet", action="store_true", help="Only print errors")
+    parser.add_argument("--shadow", action="store_true", help="Rebuild into a shadow DB and swap it in")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its last checkpoint")
+    parser.add_argument("--profile", action="store_true", help="Print a per-phase timing breakdown")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace_event JSON file")
+    parser.add_argument("--cprofile", metavar="FILE", help="Write a cProfile dump (python -m pstats FILE)")
+    args = parser.parse_args()
+
+    if args.resume and args.shadow:
+        # The shadow copy (and its checkpoints) is discarded when a run dies
+        parser.error("--resume cannot be combined with --shadow")
+
+    verbose = not args.quiet
+    with profiling(args.profile, args.trace, args.cprofile):
+        with span("rebuild.total"):
+            if args.shadow:
+                rebuild_docs_shadow(verbose=verbose)
+            else:
+                rebuild_docs(verbose=verbose, resume=args.resume)
 
 
 if __name__ == '__main__':
@@ -4,9 +4,10 @@ Pydantic models for validating inputs to the Team Knowledge Base.
 These models ensure consistent data structure before database insertion.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Type, TypeVar
 from datetime import datetime
-from pydantic import BaseModel, Field, field_validator
+from functools import lru_cache
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 import json
 
 from .constants import (
@@ -26,6 +27,23 @@ from .constants import (
     VALID_NESTED_TYPES,
 )
 
+# Membership sets for the validators. The constants stay lists - their order
+# is what error messages and help text show.
+_AREAS = frozenset(VALID_AREAS)
+_SYMBOL_TYPES = frozenset(VALID_SYMBOL_TYPES)
+_OWNERS = frozenset(VALID_OWNERS)
+_AUTHORS = frozenset(VALID_AUTHORS)
+_MESSAGE_TYPES = frozenset(VALID_MESSAGE_TYPES)
+_BUG_STATUSES = frozenset(VALID_BUG_STATUSES)
+_PRIORITIES = frozenset(VALID_PRIORITIES)
+_TASK_STATUSES = frozenset(VALID_TASK_STATUSES)
+_RELATIONSHIPS = frozenset(VALID_RELATIONSHIPS)
+_CHANGE_TYPES = frozenset(VALID_CHANGE_TYPES)
+_DOC_CATEGORIES = frozenset(VALID_DOC_CATEGORIES)
+_LEARNING_CATEGORIES = frozenset(VALID_LEARNING_CATEGORIES)
+_CALL_TYPES = frozenset(VALID_CALL_TYPES)
+_NESTED_TYPES = frozenset(VALID_NESTED_TYPES)
+
 
 class CodeDocInput(BaseModel):
     """Input model for storing code documentation."""
@@ -44,14 +62,14 @@ class CodeDocInput(BaseModel):
     @field_validator("symbol_type")
     @classmethod
     def validate_symbol_type(cls, v: str) -> str:
-        if v not in VALID_SYMBOL_TYPES:
+        if v not in _SYMBOL_TYPES:
             raise ValueError(f"symbol_type must be one of {VALID_SYMBOL_TYPES}")
         return v
 
     @field_validator("area")
     @classmethod
     def validate_area(cls, v: str) -> str:
-        if v not in VALID_AREAS:
+        if v not in _AREAS:
             raise ValueError(f"area must be one of {VALID_AREAS}")
         return v
 
@@ -65,7 +83,7 @@ class CodeDocInput(BaseModel):
 
     def connections_json(self) -> str:
         """Return connections as JSON string for database storage."""
-        return json.dumps(self.connections)
+        return json.dumps(self.connections) if self.connections else "[]"
 
 
 class BugInput(BaseModel):
@@ -90,28 +108,28 @@ class BugInput(BaseModel):
     @field_validator("status")
     @classmethod
     def validate_status(cls, v: str) -> str:
-        if v not in VALID_BUG_STATUSES:
+        if v not in _BUG_STATUSES:
             raise ValueError(f"status must be one of {VALID_BUG_STATUSES}")
         return v
 
     @field_validator("priority")
     @classmethod
     def validate_priority(cls, v: str) -> str:
-        if v not in VALID_PRIORITIES:
+        if v not in _PRIORITIES:
             raise ValueError(f"priority must be one of {VALID_PRIORITIES}")
         return v
 
     @field_validator("area")
     @classmethod
     def validate_area(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None and v not in VALID_AREAS:
+        if v is not None and v not in _AREAS:
             raise ValueError(f"area must be one of {VALID_AREAS}")
         return v
 
     @field_validator("owner")
     @classmethod
     def validate_owner(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None and v not in VALID_OWNERS:
+        if v is not None and v not in _OWNERS:
             raise ValueError(f"owner must be one of {VALID_OWNERS}")
         return v
 
@@ -157,7 +175,7 @@ class LearningInput(BaseModel):
     @field_validator("category")
     @classmethod
     def validate_category(cls, v: str) -> str:
-        if v not in VALID_LEARNING_CATEGORIES:
+        if v not in _LEARNING_CATEGORIES:
             raise ValueError(f"category must be one of {VALID_LEARNING_CATEGORIES}")
         return v
 
@@ -177,14 +195,14 @@ class TaskInput(BaseModel):
     @field_validator("owner")
     @classmethod
     def validate_owner(cls, v: str) -> str:
-        if v not in VALID_OWNERS:
+        if v not in _OWNERS:
             raise ValueError(f"owner must be one of {VALID_OWNERS}")
         return v
 
     @field_validator("status")
     @classmethod
     def validate_status(cls, v: str) -> str:
-        if v not in VALID_TASK_STATUSES:
+        if v not in _TASK_STATUSES:
             raise ValueError(f"status must be one of {VALID_TASK_STATUSES}")
         return v
 
@@ -204,14 +222,14 @@ class MessageInput(BaseModel):
     @field_validator("author")
     @classmethod
     def validate_author(cls, v: str) -> str:
-        if v not in VALID_AUTHORS:
+        if v not in _AUTHORS:
             raise ValueError(f"author must be one of {VALID_AUTHORS}")
         return v
 
     @field_validator("message_type")
     @classmethod
     def validate_message_type(cls, v: str) -> str:
-        if v not in VALID_MESSAGE_TYPES:
+        if v not in _MESSAGE_TYPES:
             raise ValueError(f"message_type must be one of {VALID_MESSAGE_TYPES}")
         return v
 
@@ -235,7 +253,7 @@ class DocsIndexInput(BaseModel):
     @field_validator("category")
     @classmethod
     def validate_category(cls, v: str) -> str:
-        if v not in VALID_DOC_CATEGORIES:
+        if v not in _DOC_CATEGORIES:
             raise ValueError(f"category must be one of {VALID_DOC_CATEGORIES}")
         return v
 
@@ -254,7 +272,7 @@ class BugCodeRefInput(BaseModel):
     @field_validator("relationship")
     @classmethod
     def validate_relationship(cls, v: str) -> str:
-        if v not in VALID_RELATIONSHIPS:
+        if v not in _RELATIONSHIPS:
             raise ValueError(f"relationship must be one of {VALID_RELATIONSHIPS}")
         return v
 
@@ -269,7 +287,7 @@ class ChangelogCodeRefInput(BaseModel):
     @field_validator("change_type")
     @classmethod
     def validate_change_type(cls, v: str) -> str:
-        if v not in VALID_CHANGE_TYPES:
+        if v not in _CHANGE_TYPES:
             raise ValueError(f"change_type must be one of {VALID_CHANGE_TYPES}")
         return v
 
@@ -286,7 +304,7 @@ class CodeCallInput(BaseModel):
     @field_validator("call_type")
     @classmethod
     def validate_call_type(cls, v: str) -> str:
-        if v not in VALID_CALL_TYPES:
+        if v not in _CALL_TYPES:
             raise ValueError(f"call_type must be one of {VALID_CALL_TYPES}")
         return v
 
@@ -307,13 +325,80 @@ class NestedCodeDocInput(BaseModel):
     @field_validator("symbol_type")
     @classmethod
     def validate_symbol_type(cls, v: str) -> str:
-        if v not in VALID_NESTED_TYPES:
+        if v not in _NESTED_TYPES:
             raise ValueError(f"symbol_type must be one of {VALID_NESTED_TYPES}")
         return v
 
     @field_validator("area")
     @classmethod
     def validate_area(cls, v: str) -> str:
-        if v not in VALID_AREAS:
+        if v not in _AREAS:
             raise ValueError(f"area must be one of {VALID_AREAS}")
         return v
+
+
+# =============================================================================
+# BATCH VALIDATION
+# =============================================================================
+
+M = TypeVar("M", bound=BaseModel)
+
+# What a trusted row can still get wrong. Ids and line numbers come from the
+# database and the parser; these values come from parser output and config
+# that can drift from the constants.
+TRUSTED_CHECKS: Dict[type, Dict[str, frozenset]] = {
+    CodeDocInput: {"symbol_type": _SYMBOL_TYPES, "area": _AREAS},
+    NestedCodeDocInput: {"symbol_type": _NESTED_TYPES, "area": _AREAS},
+    CodeCallInput: {"call_type": _CALL_TYPES},
+}
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[M]) -> TypeAdapter:
+    """TypeAdapter for List[model], built once per model."""
+    return TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=None)
+def _row_defaults(model: Type[BaseModel]) -> Tuple[Dict[str, Any], Tuple[Tuple[str, Any], ...]]:
+    """(static defaults, (field, default_factory) pairs) of a model's optional fields."""
+    static: Dict[str, Any] = {}
+    factories = []
+    for name, info in model.model_fields.items():
+        if info.default_factory is not None:
+            factories.append((name, info.default_factory))
+        elif not info.is_required():
+            static[name] = info.default
+    return static, tuple(factories)
+
+
+def validate_many(model: Type[M], rows: Iterable[Dict[str, Any]], trusted: bool = False) -> List[Any]:
+    """
+    Validate many rows in one call.
+
+    By default every field and validator runs, exactly as model(**row) would,
+    through one cached TypeAdapter over the whole list. Returns model instances.
+
+    trusted=True is for rows the toolbox generated itself (rebuild, bulk
+    annotate, staged edges) and writes straight to the database. Building
+    Pydantic instances is most of the per-row cost, so this path builds none:
+    each TRUSTED_CHECKS field is checked with one set difference over all rows,
+    defaults are filled in, and the rows come back as plain dicts.
+
+    Raises:
+        ValidationError: An untrusted row is invalid
+        ValueError: A trusted row has a value outside its allowed set
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    if not trusted:
+        return list_adapter(model).validate_python(rows)
+
+    static, factories = _row_defaults(model)
+    for name, allowed in TRUSTED_CHECKS.get(model, {}).items():
+        invalid = {row.get(name, static.get(name)) for row in rows} - allowed
+        if invalid:
+            raise ValueError(f"{model.__name__}: invalid {name} {', '.join(sorted(map(repr, invalid)))}")
+
+    if factories:
+        return [{**static, **{name: make() for name, make in factories}, **row} for row in rows]
+    return [{**static, **row} for row in rows]
@@ -35,30 +35,21 @@ Usage:
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from fnmatch import fnmatch
 import json
 
 from .storage import get_connection
+from .writer import write_op, execute_write
 from .constants import VALID_AREAS, VALID_LEARNING_CATEGORIES
+from .pathrules import classify, classify_many
 
 
 # =============================================================================
 # PROTECTED PATHS (Test Immutability)
 # =============================================================================
 
-# Files matching these patterns CANNOT be modified during bug fixes.
-# Test changes require separate approval from user.
-PROTECTED_PATHS = [
-    "QA/*",
-    "QA/**/*",
-    "**/*.spec.ts",
-    "**/*.test.ts",
-    "**/*.spec.tsx",
-    "**/*.test.tsx",
-    "**/test/**",
-    "**/tests/**",
-    "**/__tests__/**",
-]
+# Protected (test) paths CANNOT be modified during bug fixes - see the
+# "protected" rules in path_rules.json. Test changes require separate
+# approval from user.
 
 
 def is_protected_path(file_path: str) -> bool:
@@ -74,29 +65,7 @@ def is_protected_path(file_path: str) -> bool:
     Returns:
         True if file is protected
     """
-    # Normalize path separators
-    normalized = file_path.replace("\\", "/").lower()
-
-    # Direct pattern checks
-    for pattern in PROTECTED_PATHS:
-        if fnmatch(normalized, pattern.lower()):
-            return True
-
-    # Check for QA/ prefix
-    if normalized.startswith("qa/"):
-        return True
-
-    # Check for test directories anywhere in path
-    path_parts = normalized.split("/")
-    test_dirs = {"test", "tests", "__tests__", "e2e", "spec"}
-    if any(part in test_dirs for part in path_parts):
-        return True
-
-    # Check for test file extensions
-    if any(normalized.endswith(ext) for ext in [".spec.ts", ".test.ts", ".spec.tsx", ".test.tsx"]):
-        return True
-
-    return False
+    return classify("protected", file_path)
 
 
 # =============================================================================
@@ -244,6 +213,71 @@ class CompletionGateError(SessionError):
     pass
 
 
+# =============================================================================
+# WRITE OPERATIONS (run via writer.execute_write)
+# =============================================================================
+
+@write_op("session.complete")
+def _complete_bug_work(
+    conn,
+    author: str,
+    bug_id: str,
+    bug_title: str,
+    summary: str,
+    root_cause: str,
+    files_changed: List[str],
+) -> None:
+    """Move a bug to review, log the completion and create its changelog entry."""
+    # Update bug record
+    conn.execute(
+        """
+        UPDATE bugs
+        SET status = 'review',
+            root_cause = ?,
+            fix_applied = ?,
+            files_changed = ?,
+            updated_at = datetime('now')
+        WHERE id = ?
+        """,
+        (
+            root_cause,
+            summary,
+            json.dumps(files_changed),
+            bug_id,
+        )
+    )
+
+    # Log completion message
+    conn.execute(
+        """
+        INSERT INTO messages (author, message_type, content, refs, created_at)
+        VALUES (?, 'status', ?, ?, datetime('now'))
+        """,
+        (
+            author,
+            f"Completed {bug_id}: {summary}",
+            json.dumps({"bug_id": bug_id}),
+        )
+    )
+
+    # Create changelog entry
+    conn.execute(
+        """
+        INSERT INTO changelog (date, title, what_changed, what_it_was, why,
+                               files_affected, related_bug_id, created_at)
+        VALUES (date('now'), ?, ?, ?, ?, ?, ?, datetime('now'))
+        """,
+        (
+            f"Fix {bug_id}: {bug_title}",
+            summary,
+            root_cause,
+            f"Bug fix: {root_cause}",
+            json.dumps(files_changed),
+            bug_id,
+        )
+    )
+
+
 # =============================================================================
 # WORK SESSION
 # =============================================================================
@@ -527,8 +561,8 @@ class WorkSession:
             )
 
         # Gate 4: No test files allowed (test immutability)
-        for f in final_files:
-            if is_protected_path(f):
+        for f, protected in zip(final_files, classify_many("protected", final_files)):
+            if protected:
                 raise CompletionGateError(
                     f"Cannot complete with test file '{f}' in changes. "
                     f"Fix the code, not the tests. "
@@ -536,69 +570,19 @@ class WorkSession:
                 )
 
         # All gates passed - update the bug
-        conn = get_connection()
-        conn.execute("PRAGMA journal_mode=WAL")
-
         try:
-            conn.execute("BEGIN")
-
-            # Update bug record
-            conn.execute(
-                """
-                UPDATE bugs
-                SET status = 'review',
-                    root_cause = ?,
-                    fix_applied = ?,
-                    files_changed = ?,
-                    updated_at = datetime('now')
-                WHERE id = ?
-                """,
-                (
-                    root_cause,
-                    summary,
-                    json.dumps(final_files),
-                    self.bug_id,
-                )
-            )
-
-            # Log completion message
-            conn.execute(
-                """
-                INSERT INTO messages (author, message_type, content, refs, created_at)
-                VALUES (?, 'status', ?, ?, datetime('now'))
-                """,
-                (
-                    self.author,
-                    f"Completed {self.bug_id}: {summary}",
-                    json.dumps({"bug_id": self.bug_id}),
-                )
+            execute_write(
+                "session.complete",
+                author=self.author,
+                bug_id=self.bug_id,
+                bug_title=self.context.bug.title if self.context else self.bug_id,
+                summary=summary,
+                root_cause=root_cause,
+                files_changed=final_files,
             )
-
-            # Create changelog entry
-            conn.execute(
-                """
-                INSERT INTO changelog (date, title, what_changed, what_it_was, why,
-                                       files_affected, related_bug_id, created_at)
-                VALUES (date('now'), ?, ?, ?, ?, ?, ?, datetime('now'))
-                """,
-                (
-                    f"Fix {self.bug_id}: {self.context.bug.title if self.context else self.bug_id}",
-                    summary,
-                    root_cause,
-                    f"Bug fix: {root_cause}",
-                    json.dumps(final_files),
-                    self.bug_id,
-                )
-            )
-
-            conn.execute("COMMIT")
             self.completed_at = datetime.now()
-
         except Exception as e:
-            conn.execute("ROLLBACK")
             raise SessionError(f"Failed to complete session: {e}")
-        finally:
-            conn.close()
 
     # =========================================================================
     # LEARNING CAPTURE
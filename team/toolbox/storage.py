@@ -5,97 +5,436 @@ Provides functions to insert and query data from team.db.
 All inputs are validated via Pydantic models before insertion.
 """
 
+import hashlib
+import heapq
+import itertools
+import os
+import re
 import sqlite3
+import threading
 import json
+from contextlib import contextmanager
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union
-
-from .constants import DB_FILENAME, SCHEMA_FILENAME
-from .schemas import (
-    CodeDocInput,
-    BugInput,
-    ChangelogInput,
-    LearningInput,
-    TaskInput,
-    MessageInput,
-    DocsIndexInput,
-    BugCodeRefInput,
-    ChangelogCodeRefInput,
-    CodeCallInput,
-    NestedCodeDocInput,
-)
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Set, Union, Tuple, Iterable, Iterator
+
+from .constants import BOARD_MD_FILENAME, BOARD_RENDER_LIMIT, BUSY_TIMEOUT_MS, DB_FILENAME, MIGRATIONS_DIRNAME
+from .instrument import count, span, timed
+from .querylog import connection_factory
+
+# Pydantic models are imported where they are first used - building them is
+# most of the import cost of this module, and read-only commands never need them
+if TYPE_CHECKING:
+    from .schemas import BugInput, ChangelogInput, CodeCallInput, LearningInput
+
+
+# Set by use_database() to point every storage function at another file
+_db_path_override: Optional[Path] = None
 
 
 def get_db_path() -> Path:
-    """Get the path to team.db."""
+    """Get the path to team.db (or the database selected by use_database())."""
+    if _db_path_override is not None:
+        return _db_path_override
     return Path(__file__).parent.parent / DB_FILENAME
 
 
-def get_schema_path() -> Path:
-    """Get the path to schema.sql."""
-    return Path(__file__).parent.parent / SCHEMA_FILENAME
+@contextmanager
+def use_database(db_path: Union[str, Path]) -> Iterator[Path]:
+    """
+    Temporarily point get_connection() at another database file.
+
+    Used by the shadow rebuild to run the normal storage functions against a
+    copy of team.db. Not thread-safe - affects the whole process.
+    """
+    global _db_path_override
+    previous = _db_path_override
+    _db_path_override = Path(db_path)
+    try:
+        yield _db_path_override
+    finally:
+        _db_path_override = previous
+
+
+def get_migrations_dir() -> Path:
+    """Get the path to the schema migrations directory."""
+    return Path(__file__).parent / MIGRATIONS_DIRNAME
+
+
+# Databases whose schema version has been checked in this process
+_schema_checked: set = set()
+
+# How long a connection waits on a locked database before raising
+_busy_timeout_ms: int = int(os.environ.get("TEAM_DB_BUSY_TIMEOUT_MS", BUSY_TIMEOUT_MS))
+
+# Cached (version, name, path) list - the migrations dir is read once per process
+_migrations: Optional[List[Tuple[int, str, Path]]] = None
 
 
 def get_connection() -> sqlite3.Connection:
-    """Get a connection to the database."""
+    """
+    Get a connection to the database.
+
+    Inside shared_connection() this is the shared connection (for the
+    thread and database that opened it); otherwise see open_connection().
+    """
+    if _shared_here():
+        count("storage.shared_connections")
+        return _shared
+
+    return open_connection()
+
+
+def open_connection(check_same_thread: bool = True, traced: bool = True) -> sqlite3.Connection:
+    """
+    Open a new connection, even inside shared_connection().
+
+    For callers that attach databases or keep the connection beyond the
+    current command. The first connection per process applies any pending
+    migrations; after that the check is skipped entirely.
+
+    Args:
+        check_same_thread: False for a connection shared between threads -
+                           the caller must serialize its use
+        traced: False to keep the connection out of the query log (pollers
+                whose statements would be charged to unrelated commands)
+    """
     db_path = get_db_path()
-    conn = sqlite3.connect(str(db_path))
+    count("storage.connections")
+    with span("storage.connect"):
+        conn = sqlite3.connect(
+            str(db_path),
+            timeout=_busy_timeout_ms / 1000,
+            check_same_thread=check_same_thread,
+            factory=connection_factory(db_path, traced),  # TracedConnection when TEAM_QUERY_LOG is set
+        )
     conn.row_factory = sqlite3.Row  # Enable dict-like access
+
+    if str(db_path) not in _schema_checked:
+        try:
+            with span("storage.migrate"):
+                migrate_schema(conn)
+        except Exception:
+            conn.close()
+            raise
+        _schema_checked.add(str(db_path))
+
     return conn
 
 
-def init_db() -> bool:
+def set_busy_timeout(timeout_ms: int) -> None:
     """
-    Initialize the database by running schema.sql.
+    Set the busy_timeout used by new connections.
 
-    SAFE: Uses CREATE TABLE IF NOT EXISTS - will NOT destroy existing data.
-    Only creates tables that don't already exist.
+    Defaults to BUSY_TIMEOUT_MS, overridable with TEAM_DB_BUSY_TIMEOUT_MS.
+    """
+    global _busy_timeout_ms
+    _busy_timeout_ms = max(0, int(timeout_ms))
 
-    Returns:
-        True if initialization succeeded.
+
+def get_busy_timeout() -> int:
+    """busy_timeout (ms) used by new connections."""
+    return _busy_timeout_ms
+
+
+# =============================================================================
+# SHARED CONNECTION
+# =============================================================================
+
+# Savepoint wrapping each unit of work inside a shared transaction
+SHARED_SAVEPOINT = "shared_unit"
+
+# BEGIN/COMMIT/END/ROLLBACK issued by code running inside a shared transaction
+_TRANSACTION_CONTROL = re.compile(
+    r"\s*(?:(BEGIN|COMMIT|END)\b.*|(ROLLBACK)(?:\s+TRANSACTION)?\s*;?\s*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class SharedConnection:
     """
-    db_path = get_db_path()
-    schema_path = get_schema_path()
+    Connection returned by get_connection() inside shared_connection().
 
-    if not schema_path.exists():
-        raise FileNotFoundError(f"Schema file not found: {schema_path}")
+    Forwards everything to one underlying connection; close() is a no-op.
+    When the scope owns the transaction, the transaction control done by
+    storage functions is folded into it: BEGIN/COMMIT are skipped, commit()
+    does nothing and rollback() only undoes the current unit (savepoint).
+    """
 
-    # Check if database has existing data
-    existing_data = False
-    if db_path.exists():
-        conn = get_connection()
+    def __init__(self, conn: sqlite3.Connection, owns_transaction: bool):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "owns_transaction", owns_transaction)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._conn, name, value)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        if self.owns_transaction:
+            match = _TRANSACTION_CONTROL.match(sql)
+            if match:
+                if match.group(2):
+                    self.rollback()
+                return self._conn.cursor()
+        return self._conn.execute(sql, parameters)
+
+    def commit(self) -> None:
+        if not self.owns_transaction:
+            self._conn.commit()
+
+    def rollback(self) -> None:
+        if not self.owns_transaction:
+            self._conn.rollback()
+        elif self._conn.in_transaction:
+            self._conn.execute(f"ROLLBACK TO {SHARED_SAVEPOINT}")
+
+    def close(self) -> None:
+        pass
+
+    @contextmanager
+    def unit(self) -> Iterator[None]:
+        """
+        Scope one unit of work (e.g. one batch command) in a savepoint.
+
+        Released on success, rolled back if the body raises. Without a
+        shared transaction this only yields.
+        """
+        if not self.owns_transaction:
+            yield
+            return
+
+        self._conn.execute(f"SAVEPOINT {SHARED_SAVEPOINT}")
         try:
-            cursor = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'")
-            table_count = cursor.fetchone()[0]
-            if table_count > 0:
-                cursor = conn.execute("SELECT COUNT(*) FROM code_docs")
-                doc_count = cursor.fetchone()[0]
-                existing_data = doc_count > 0
-        except:
-            pass
-        finally:
+            yield
+        except BaseException:
+            self._conn.execute(f"ROLLBACK TO {SHARED_SAVEPOINT}")
+            self._conn.execute(f"RELEASE {SHARED_SAVEPOINT}")
+            raise
+        self._conn.execute(f"RELEASE {SHARED_SAVEPOINT}")
+
+    def discard_unit(self) -> None:
+        """Undo the current unit's writes (the unit itself still completes)."""
+        if self.owns_transaction:
+            self._conn.execute(f"ROLLBACK TO {SHARED_SAVEPOINT}")
+
+
+# Set by shared_connection() - get_connection() hands this out instead of
+# opening, but only on the thread that set it and for the same database
+_shared: Optional[SharedConnection] = None
+_shared_scope: Optional[Tuple[int, Path]] = None  # (thread ident, db path)
+
+
+def _shared_here() -> bool:
+    return _shared is not None and _shared_scope == (threading.get_ident(), get_db_path())
+
+
+def in_shared_connection() -> bool:
+    """Whether get_connection() currently returns the shared connection."""
+    return _shared_here()
+
+
+def in_shared_transaction() -> bool:
+    """Whether get_connection() returns a shared connection holding one write transaction."""
+    return _shared_here() and _shared.owns_transaction
+
+
+@contextmanager
+def shared_connection(
+    transaction: bool = True,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[SharedConnection]:
+    """
+    Route every get_connection() call through one connection.
+
+    Used by `cli batch` so a run of commands pays for one connect and, with
+    transaction=True, one BEGIN IMMEDIATE/COMMIT. The transaction commits
+    when the block exits normally and rolls back if it raises. Only
+    get_connection() calls from this thread, for this database, are routed;
+    one block can be active per process.
+
+    Args:
+        transaction: Hold one write transaction for the whole block. When
+                     False, storage functions commit as usual.
+        conn: Connection to share (the CLI daemon's warm one). It is left
+              open, and a transaction a command left open is rolled back
+              as closing it would.
+    """
+    global _shared, _shared_scope
+    if _shared is not None:
+        raise RuntimeError("shared_connection() is already active")
+
+    owned = conn is None
+    if owned:
+        conn = open_connection()
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        if transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        _shared = SharedConnection(conn, owns_transaction=transaction)
+        _shared_scope = (threading.get_ident(), get_db_path())
+        try:
+            yield _shared
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        if conn.in_transaction:
+            if owned or transaction:
+                conn.commit()
+            else:
+                conn.rollback()
+    finally:
+        _shared = None
+        _shared_scope = None
+        if owned:
             conn.close()
 
-    schema_sql = schema_path.read_text()
 
-    conn = get_connection()
+# =============================================================================
+# SCHEMA MIGRATIONS
+# =============================================================================
+
+def list_migrations() -> List[Tuple[int, str, Path]]:
+    """
+    List schema migrations in version order.
+
+    Migrations are files named NNNN_description.sql in get_migrations_dir().
+
+    Returns:
+        List of (version, name, path) tuples.
+    """
+    global _migrations
+    if _migrations is None:
+        migrations_dir = get_migrations_dir()
+        if not migrations_dir.is_dir():
+            raise FileNotFoundError(f"Migrations directory not found: {migrations_dir}")
+
+        found = []
+        for path in migrations_dir.glob("*.sql"):
+            prefix = path.stem.split("_", 1)[0]
+            if prefix.isdigit():
+                found.append((int(prefix), path.stem, path))
+        _migrations = sorted(found)
+
+    return _migrations
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the schema version recorded in the database header."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def split_sql_statements(script: str) -> List[str]:
+    """Split a SQL script into complete statements."""
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+
+    # Anything left over must be trailing comments
+    remainder = [l for l in buffer.splitlines() if l.strip() and not l.strip().startswith("--")]
+    if remainder:
+        raise ValueError(f"Incomplete SQL statement: {remainder[0][:80]}")
+    return statements
+
+
+def migrate_schema(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply pending schema migrations.
+
+    Fast path: a single PRAGMA user_version read when the schema is current.
+    Otherwise each pending migration runs in its own transaction together with
+    its schema_migrations row and the user_version bump, so a failed migration
+    leaves the database at the previous version.
+
+    Args:
+        conn: Open database connection
+
+    Returns:
+        List of migration versions applied (empty if already current).
+    """
+    migrations = list_migrations()
+    latest = migrations[-1][0] if migrations else 0
+
+    if get_schema_version(conn) >= latest:
+        return []
+
+    applied = []
+    for version, name, path in migrations:
+        statements = split_sql_statements(path.read_text(encoding="utf-8"))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the write lock - another process may have migrated
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+
+            for statement in statements:
+                conn.execute(statement)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_migrations (version, name) VALUES (?, ?)",
+                (version, name),
+            )
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(version)
+
+    return applied
+
+
+def init_db() -> bool:
+    """
+    Initialize the database by applying pending schema migrations.
+
+    SAFE: Migrations only add tables, columns and indexes - will NOT destroy
+    existing data. When the schema is already current no DDL runs.
+
+    Returns:
+        True if initialization succeeded.
+    """
+    db_path = get_db_path()
+    existing_db = db_path.exists()
+
+    conn = sqlite3.connect(str(db_path), timeout=_busy_timeout_ms / 1000)
     try:
-        conn.executescript(schema_sql)
-        conn.commit()
-        if existing_data:
-            print(f"Schema updated (existing data preserved) at {db_path}")
+        applied = migrate_schema(conn)
+        version = get_schema_version(conn)
+        _schema_checked.add(str(db_path))
+
+        if not applied:
+            print(f"Schema up to date (version {version}) at {db_path}")
+        elif existing_db:
+            print(f"Schema updated to version {version} (existing data preserved) at {db_path}")
         else:
-            print(f"Database initialized at {db_path}")
+            print(f"Database initialized at {db_path} (schema version {version})")
         return True
     finally:
         conn.close()
 
 
+def _sql_limit(limit: Optional[int]) -> int:
+    """LIMIT parameter for a row limit - SQLite treats -1 as no limit."""
+    return limit if limit and limit > 0 else -1
+
+
 # =============================================================================
 # CODE DOCS
 # =============================================================================
 
+@timed("storage.store_code_doc")
 def store_code_doc(
     file_path: str,
     symbol_name: Optional[str],
@@ -107,6 +446,7 @@ def store_code_doc(
     connections: List[str],
     area: str,
     signature: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
 ) -> int:
     """
     Store a code documentation entry.
@@ -122,10 +462,14 @@ def store_code_doc(
         connections: List of related code references
         area: Area that owns this code
         signature: Function signature (optional)
+        conn: Optional open connection - the caller commits (used for
+            batched writes); by default a connection is opened and committed
 
     Returns:
         The ID of the inserted row.
     """
+    from .schemas import CodeDocInput
+
     # Validate input
     doc = CodeDocInput(
         file_path=file_path,
@@ -140,7 +484,9 @@ def store_code_doc(
         area=area,
     )
 
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     try:
         cursor = conn.execute(
             """
@@ -173,10 +519,101 @@ def store_code_doc(
                 datetime.now().isoformat(),
             ),
         )
-        conn.commit()
+        if own_conn:
+            conn.commit()
         return cursor.lastrowid
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
+
+
+# Multi-row INSERTs stay under SQLite's default 999 bound parameters
+_CODE_DOC_PARAMS = 999
+
+
+def _upsert_code_docs(
+    conn: sqlite3.Connection,
+    columns: Tuple[str, ...],
+    updates: Tuple[str, ...],
+    rows: List[Tuple[Any, ...]],
+) -> List[int]:
+    """
+    Upsert code_docs rows in multi-row INSERTs; ids in the order of rows.
+
+    columns must start with file_path, symbol_name, line_start - RETURNING
+    order is unspecified, so ids are matched back on that unique key.
+    """
+    ids: Dict[Tuple[Any, ...], int] = {}
+    per_insert = max(1, _CODE_DOC_PARAMS // len(columns))
+    placeholders = "(" + ", ".join("?" * len(columns)) + ")"
+    assignments = ",\n                ".join(f"{c} = excluded.{c}" for c in updates)
+    for start in range(0, len(rows), per_insert):
+        chunk = rows[start:start + per_insert]
+        cursor = conn.execute(
+            f"""
+            INSERT INTO code_docs ({", ".join(columns)})
+            VALUES {", ".join([placeholders] * len(chunk))}
+            ON CONFLICT(file_path, symbol_name, line_start) DO UPDATE SET
+                {assignments},
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id, file_path, symbol_name, line_start
+            """,
+            [value for row in chunk for value in row],
+        )
+        for row_id, file_path, symbol_name, line_start in cursor:
+            ids[(file_path, symbol_name, line_start)] = row_id
+    return [ids[row[:3]] for row in rows]
+
+
+@timed("storage.store_code_docs")
+def store_code_docs(
+    docs: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[int]:
+    """
+    Store many toolbox-generated code docs (placeholders from the annotator).
+
+    Same upsert as store_code_doc, but the rows are checked once with
+    validate_many(CodeDocInput, ..., trusted=True) and written in multi-row
+    INSERTs instead of one validated statement each.
+
+    Args:
+        docs: CodeDocInput fields per doc
+        conn: Optional open connection - the caller commits
+
+    Returns:
+        Row ids, in the order of docs.
+    """
+    from .schemas import CodeDocInput, validate_many
+
+    if not docs:
+        return []
+    verified = datetime.now().isoformat()
+    rows = [
+        (
+            d["file_path"], d["symbol_name"], d["line_start"], d["symbol_type"], d["line_end"],
+            d["signature"], d["purpose"], d["why"], json.dumps(d["connections"] or []), d["area"], verified,
+        )
+        for d in validate_many(CodeDocInput, docs, trusted=True)
+    ]
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        ids = _upsert_code_docs(
+            conn,
+            ("file_path", "symbol_name", "line_start", "symbol_type", "line_end",
+             "signature", "purpose", "why", "connections", "area", "last_verified"),
+            ("symbol_type", "line_end", "signature", "purpose", "why", "connections", "area", "last_verified"),
+            rows,
+        )
+        if own_conn:
+            conn.commit()
+        return ids
+    finally:
+        if own_conn:
+            conn.close()
 
 
 def query_code_docs(
@@ -201,6 +638,25 @@ def query_code_docs(
     Returns:
         List of matching code doc entries.
     """
+    return list(iter_code_docs(file_path, symbol_name, symbol_type, area, search, limit))
+
+
+def iter_code_docs(
+    file_path: Optional[str] = None,
+    symbol_name: Optional[str] = None,
+    symbol_type: Optional[str] = None,
+    area: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: Optional[int] = 100,
+    after_id: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream code documentation entries (see query_code_docs).
+
+    Args:
+        limit: Maximum number of results (0 or None for all)
+        after_id: Keyset paging - only ids above this, in id order
+    """
     conditions = []
     params = []
 
@@ -224,6 +680,13 @@ def query_code_docs(
         conditions.append("(purpose LIKE ? OR why LIKE ?)")
         params.extend([f"%{search}%", f"%{search}%"])
 
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+        order_by = "id"
+    else:
+        order_by = "file_path, line_start"
+
     where_clause = " AND ".join(conditions) if conditions else "1=1"
 
     conn = get_connection()
@@ -232,12 +695,13 @@ def query_code_docs(
             f"""
             SELECT * FROM code_docs
             WHERE {where_clause}
-            ORDER BY file_path, line_start
+            ORDER BY {order_by}
             LIMIT ?
             """,
-            params + [limit],
+            params + [_sql_limit(limit)],
         )
-        return [dict(row) for row in cursor.fetchall()]
+        for row in cursor:
+            yield dict(row)
     finally:
         conn.close()
 
@@ -246,21 +710,61 @@ def query_code_docs(
 # BUGS
 # =============================================================================
 
-def store_bug(bug: Union[BugInput, Dict[str, Any]]) -> str:
+# Sequence that numbers new BUG-NNN ids (see migration 0006)
+BUG_SEQUENCE = "BUG"
+
+
+def next_sequence_value(conn: sqlite3.Connection, name: str) -> int:
+    """
+    Allocate the next value of a named sequence.
+
+    One UPDATE ... RETURNING under the write lock, so concurrent callers
+    never get the same value. The UPDATE is part of the caller's
+    transaction: if that rolls back, the increment is undone too and the
+    value is handed out again - it was never visible to anyone else.
+    Caller commits.
+    """
+    row = conn.execute(
+        """
+        INSERT INTO id_sequences (name, value) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET
+            value = value + 1,
+            updated_at = datetime('now')
+        RETURNING value
+        """,
+        (name,),
+    ).fetchone()
+    return row[0]
+
+
+def allocate_bug_id(conn: sqlite3.Connection) -> str:
+    """Allocate the next BUG-NNN id. Caller commits."""
+    return f"{BUG_SEQUENCE}-{next_sequence_value(conn, BUG_SEQUENCE):03d}"
+
+
+def store_bug(bug: Union["BugInput", Dict[str, Any]]) -> str:
     """
     Store a bug report.
 
     Args:
-        bug: BugInput model or dict with bug data
+        bug: BugInput model or dict with bug data. A dict without an "id"
+             gets the next BUG-NNN, allocated in the same transaction.
 
     Returns:
         The bug ID.
     """
+    from .schemas import BugInput
+
+    allocate = isinstance(bug, dict) and not bug.get("id")
     if isinstance(bug, dict):
-        bug = BugInput(**bug)
+        # Validate before allocating so a rejected bug doesn't burn an id
+        bug = BugInput(**({**bug, "id": f"{BUG_SEQUENCE}-0"} if allocate else bug))
 
     conn = get_connection()
     try:
+        if allocate:
+            bug = bug.model_copy(update={"id": allocate_bug_id(conn)})
+
         conn.execute(
             """
             INSERT INTO bugs (
@@ -331,6 +835,23 @@ def query_bugs(
     Returns:
         List of matching bugs.
     """
+    return list(iter_bugs(bug_id, status, area, owner, priority, limit))
+
+
+def iter_bugs(
+    bug_id: Optional[str] = None,
+    status: Optional[str] = None,
+    area: Optional[str] = None,
+    owner: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: Optional[int] = 100,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream bug reports (see query_bugs).
+
+    Args:
+        limit: Maximum number of results (0 or None for all)
+    """
     conditions = []
     params = []
 
@@ -372,9 +893,10 @@ def query_bugs(
                 created_at DESC
             LIMIT ?
             """,
-            params + [limit],
+            params + [_sql_limit(limit)],
         )
-        return [dict(row) for row in cursor.fetchall()]
+        for row in cursor:
+            yield dict(row)
     finally:
         conn.close()
 
@@ -424,7 +946,7 @@ def update_bug(
 # CHANGELOG
 # =============================================================================
 
-def store_changelog(changelog: Union[ChangelogInput, Dict[str, Any]]) -> int:
+def store_changelog(changelog: Union["ChangelogInput", Dict[str, Any]]) -> int:
     """
     Store a changelog entry.
 
@@ -434,6 +956,8 @@ def store_changelog(changelog: Union[ChangelogInput, Dict[str, Any]]) -> int:
     Returns:
         The changelog entry ID.
     """
+    from .schemas import ChangelogInput
+
     if isinstance(changelog, dict):
         changelog = ChangelogInput(**changelog)
 
@@ -517,7 +1041,7 @@ def query_changelog(
 # LEARNINGS
 # =============================================================================
 
-def store_learning(learning: Union[LearningInput, Dict[str, Any]]) -> int:
+def store_learning(learning: Union["LearningInput", Dict[str, Any]]) -> int:
     """
     Store a learning.
 
@@ -527,6 +1051,8 @@ def store_learning(learning: Union[LearningInput, Dict[str, Any]]) -> int:
     Returns:
         The learning ID.
     """
+    from .schemas import LearningInput
+
     if isinstance(learning, dict):
         learning = LearningInput(**learning)
 
@@ -605,7 +1131,14 @@ def link_bug_to_code(
     relationship: str,
     notes: Optional[str] = None,
 ) -> int:
-    """Link a bug to a code documentation entry."""
+    """
+    Link a bug to a code documentation entry.
+
+    Idempotent - linking the same pair with the same relationship again
+    returns the existing ref's ID.
+    """
+    from .schemas import BugCodeRefInput
+
     ref = BugCodeRefInput(
         bug_id=bug_id,
         code_doc_id=code_doc_id,
@@ -617,13 +1150,21 @@ def link_bug_to_code(
     try:
         cursor = conn.execute(
             """
-            INSERT INTO bug_code_refs (bug_id, code_doc_id, relationship, notes)
+            INSERT OR IGNORE INTO bug_code_refs (bug_id, code_doc_id, relationship, notes)
             VALUES (?, ?, ?, ?)
             """,
             (ref.bug_id, ref.code_doc_id, ref.relationship, ref.notes),
         )
         conn.commit()
-        return cursor.lastrowid
+        if cursor.rowcount:
+            return cursor.lastrowid
+
+        # Already linked - return the existing ref
+        row = conn.execute(
+            "SELECT id FROM bug_code_refs WHERE bug_id = ? AND code_doc_id = ? AND relationship = ?",
+            (ref.bug_id, ref.code_doc_id, ref.relationship),
+        ).fetchone()
+        return row["id"]
     finally:
         conn.close()
 
@@ -634,6 +1175,8 @@ def link_changelog_to_code(
     change_type: str,
 ) -> int:
     """Link a changelog entry to a code documentation entry."""
+    from .schemas import ChangelogCodeRefInput
+
     ref = ChangelogCodeRefInput(
         changelog_id=changelog_id,
         code_doc_id=code_doc_id,
@@ -721,6 +1264,8 @@ def store_message(
     Returns:
         The message ID.
     """
+    from .schemas import MessageInput
+
     msg = MessageInput(
         author=author,
         message_type=message_type,
@@ -797,6 +1342,7 @@ def query_messages(
     after: Optional[str] = None,
     mentions: Optional[str] = None,
     limit: int = 100,
+    include_archived: bool = False,
 ) -> List[Dict[str, Any]]:
     """
     Query board messages.
@@ -808,10 +1354,32 @@ def query_messages(
         after: Filter messages after this date (YYYY-MM-DD)
         mentions: Filter by mentioned @name (partial match)
         limit: Maximum number of results
+        include_archived: Also search archived months (see archive.py).
+            Off by default so board reads only touch the live table.
 
     Returns:
         List of matching messages, newest first.
     """
+    return list(iter_messages(author, message_type, resolved, after, mentions, limit, include_archived))
+
+
+def iter_messages(
+    author: Optional[str] = None,
+    message_type: Optional[str] = None,
+    resolved: Optional[bool] = None,
+    after: Optional[str] = None,
+    mentions: Optional[str] = None,
+    limit: Optional[int] = 100,
+    include_archived: bool = False,
+    after_id: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream board messages (see query_messages).
+
+    Args:
+        limit: Maximum number of results (0 or None for all)
+        after_id: Keyset paging - only ids above this, oldest first
+    """
     conditions = []
     params = []
 
@@ -835,20 +1403,47 @@ def query_messages(
         conditions.append("mentions LIKE ?")
         params.append(f"%{mentions}%")
 
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+        order_by = "id"
+    else:
+        order_by = "created_at DESC"
+
     where_clause = " AND ".join(conditions) if conditions else "1=1"
 
+    table = "messages_all" if include_archived else "messages"
+    sql = f"""
+        SELECT * FROM {table}
+        WHERE {where_clause}
+        ORDER BY {order_by}
+        LIMIT ?
+        """
+    params.append(_sql_limit(limit))
+
+    if include_archived:
+        # One connection per batch of attached archives - merge their
+        # already ordered results
+        from .archive import get_history_connections
+        connections = get_history_connections(since=after)
+        streams = [conn.execute(sql, params) for conn in connections]
+        if after_id is not None:
+            rows = heapq.merge(*streams, key=lambda row: row["id"])
+        else:
+            rows = heapq.merge(*streams, key=lambda row: row["created_at"] or "", reverse=True)
+        try:
+            for row in itertools.islice(rows, limit if limit and limit > 0 else None):
+                yield dict(row)
+        finally:
+            rows.close()  # Before its cursors' connections go away
+            for conn in connections:
+                conn.close()
+        return
+
     conn = get_connection()
     try:
-        cursor = conn.execute(
-            f"""
-            SELECT * FROM messages
-            WHERE {where_clause}
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
-            params + [limit],
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        for row in conn.execute(sql, params):
+            yield dict(row)
     finally:
         conn.close()
 
@@ -909,60 +1504,164 @@ def get_open_messages(message_type: Optional[str] = None) -> List[Dict[str, Any]
         conn.close()
 
 
-def render_board_md() -> str:
+# Rendered BOARD.md entries: message id -> (rendered columns, entry). The
+# columns are compared, not just the id: bulk_import() rewrites messages in
+# place and `cli init` on the same path starts ids over.
+_board_entries: Dict[int, Tuple[tuple, str]] = {}
+
+# (database, change state or None, rendered columns of every entry, markdown)
+# from the last render - see render_board_md()
+_board_rendered: Optional[Tuple[Path, Optional[tuple], List[tuple], str]] = None
+
+_BOARD_HEADER = "\n".join([
+    "# Team Board",
+    "",
+    "_Auto-generated from team.db. Do not edit directly._",
+    "",
+    "---",
+    "",
+])
+
+
+def _render_board_entry(msg: sqlite3.Row) -> str:
+    """One message as a BOARD.md entry."""
+    timestamp = msg["created_at"][:16] if msg["created_at"] else "?"
+    mentions_str = ""
+    if msg["mentions"]:
+        try:
+            mentions = json.loads(msg["mentions"])
+        except ValueError:
+            mentions = None
+        if mentions and isinstance(mentions, list):
+            mentions_str = f" -> {', '.join(str(m) for m in mentions)}"
+
+    return "\n".join([
+        f"### [{msg['message_type'].upper()}] {msg['author']}{mentions_str}",
+        f"_{timestamp}_",
+        "",
+        msg["content"],
+        "",
+        "---",
+        "",
+    ])
+
+
+def render_board_md(incremental: bool = True) -> str:
     """
     Render messages as markdown for human reading.
 
+    The board is the BOARD_RENDER_LIMIT newest unresolved messages. Entries
+    rendered before are reused while the message's rendered columns are
+    unchanged, so a render costs one index scan plus formatting whatever
+    is new or edited. When every entry is the same as last time, the
+    previous markdown is returned as is.
+
+    On a kept connection (the CLI daemon's shared one) the scan is skipped
+    too while nothing changed: PRAGMA data_version moves when another
+    connection commits, total_changes when this one writes, and the
+    unresolved watermark (max id, count) is one index lookup. A fresh
+    connection has no earlier data_version to compare, so it always scans.
+
+    Args:
+        incremental: Reuse earlier entries (False renders every message)
+
     Returns:
         Markdown-formatted board content.
     """
+    global _board_rendered
+
+    db_path = get_db_path()
+    if not incremental or (_board_rendered is not None and _board_rendered[0] != db_path):
+        _board_entries.clear()
+        _board_rendered = None
+
     conn = get_connection()
     try:
-        cursor = conn.execute(
-            """
-            SELECT * FROM messages
-            WHERE resolved = 0
-            ORDER BY created_at DESC
-            LIMIT 50
+        state = None
+        if in_shared_connection() and not conn.in_transaction:  # A rollback doesn't lower total_changes
+            state = (
+                _shared._conn,
+                conn.execute("PRAGMA data_version").fetchone()[0],
+                conn.total_changes,
+                tuple(conn.execute("SELECT MAX(id), COUNT(*) FROM messages WHERE resolved = 0").fetchone()),
+            )
+            if _board_rendered is not None and _board_rendered[1] == state:
+                count("storage.board_render_skipped")
+                return _board_rendered[3]
+
+        rows = conn.execute(
             """
-        )
-        messages = cursor.fetchall()
-
-        lines = [
-            "# Team Board",
-            "",
-            "_Auto-generated from team.db. Do not edit directly._",
-            "",
-            "---",
-            "",
-        ]
-
-        for msg in messages:
-            timestamp = msg["created_at"][:16] if msg["created_at"] else "?"
-            msg_type = msg["message_type"].upper()
-            author = msg["author"]
-            content = msg["content"]
-            mentions_str = ""
-            if msg["mentions"]:
-                try:
-                    mentions = json.loads(msg["mentions"])
-                    if mentions:
-                        mentions_str = f" -> {', '.join(mentions)}"
-                except:
-                    pass
-
-            lines.append(f"### [{msg_type}] {author}{mentions_str}")
-            lines.append(f"_{timestamp}_")
-            lines.append("")
-            lines.append(content)
-            lines.append("")
-            lines.append("---")
-            lines.append("")
-
-        return "\n".join(lines)
+            SELECT id, author, message_type, content, created_at, mentions
+            FROM messages WHERE resolved = 0 ORDER BY created_at DESC LIMIT ?
+            """,
+            (BOARD_RENDER_LIMIT,),
+        ).fetchall()
     finally:
         conn.close()
 
+    values = [tuple(msg) for msg in rows]
+    if _board_rendered is not None and _board_rendered[2] == values:
+        count("storage.board_render_unchanged")
+        _board_rendered = (db_path, state, values, _board_rendered[3])
+        return _board_rendered[3]
+
+    rendered = 0
+    entries = []
+    for columns, msg in zip(values, rows):
+        cached = _board_entries.get(columns[0])
+        if cached is None or cached[0] != columns:
+            cached = _board_entries[columns[0]] = (columns, _render_board_entry(msg))
+            rendered += 1
+        entries.append(cached[1])
+    count("storage.board_entries_rendered", rendered)
+
+    # Forget entries that left the board (resolved, archived or pushed out)
+    for msg_id in set(_board_entries).difference(columns[0] for columns in values):
+        del _board_entries[msg_id]
+
+    md = "\n".join([_BOARD_HEADER, *entries])
+    _board_rendered = (db_path, state, values, md)
+    return md
+
+
+def get_board_md_path() -> Path:
+    """Get the path to BOARD.md (next to team.db)."""
+    return get_db_path().parent / BOARD_MD_FILENAME
+
+
+def write_board_md(path: Optional[Union[str, Path]] = None, incremental: bool = True) -> bool:
+    """
+    Render the board into BOARD.md.
+
+    Skips the write when the file already holds the same markdown; otherwise
+    writes a temp file and renames it over BOARD.md, so readers never see a
+    half-written board.
+
+    Args:
+        path: Output file (default: BOARD.md next to team.db)
+        incremental: Passed to render_board_md()
+
+    Returns:
+        True if the file was written, False if it was already current.
+    """
+    path = Path(path) if path else get_board_md_path()
+    md = render_board_md(incremental=incremental)
+    try:
+        if path.read_text(encoding="utf-8") == md:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(md)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return True
+
 
 # =============================================================================
 # STATISTICS
@@ -1002,10 +1701,415 @@ def get_stats() -> Dict[str, Any]:
         conn.close()
 
 
+# =============================================================================
+# BULK IMPORTS (markdown migration)
+# =============================================================================
+
+# Columns written by bulk_import(), per target table
+IMPORT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "bugs": (
+        "id", "title", "status", "priority", "area", "owner", "trivial",
+        "description", "expected_behavior", "root_cause", "fix_applied",
+        "files_changed", "acceptance_criteria", "found_by", "verified_by",
+    ),
+    "messages": ("author", "message_type", "content", "refs", "mentions", "created_at"),
+    "learnings": ("category", "learning", "context", "related_bug_id"),
+    "decisions": ("date", "decision", "rationale", "alternatives_considered", "related_area"),
+}
+
+# Columns identifying a row stored before import tracking existed, so the
+# first tracked import adopts it instead of inserting a duplicate
+IMPORT_MATCH_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "bugs": ("id",),
+    "messages": ("author", "content", "created_at"),
+    "learnings": ("category", "learning"),
+    "decisions": ("date", "decision"),
+}
+
+
+def content_hash(values: Tuple[Any, ...]) -> str:
+    """Stable hash of a row's column values."""
+    payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _adoption_candidates(
+    conn: sqlite3.Connection,
+    source: str,
+    table: str,
+    columns: Tuple[str, ...],
+    match_columns: Tuple[str, ...],
+    untracked: List[Tuple[Any, ...]],
+    natural_id: bool,
+) -> Tuple[Dict[Tuple[Any, ...], List[Tuple[str, str]]], Dict[str, List[str]]]:
+    """
+    Stored rows that untracked records may adopt, found by an indexed join.
+
+    Only rows whose IMPORT_MATCH_COLUMNS equal an untracked record's are
+    read. A row another record already points at is not up for adoption -
+    unless it is a natural id (shared), or the record is this source's own
+    under a key the current import no longer produces (keys re-derived).
+
+    Returns:
+        ({match values: [(row id, content hash), ...] in id order},
+         {row id: this source's stale keys pointing at it})
+    """
+    conn.execute("DROP TABLE IF EXISTS temp.import_match")
+    conn.execute(f"CREATE TEMP TABLE import_match ({', '.join(match_columns)})")
+    positions = [columns.index(col) for col in match_columns]
+    conn.executemany(
+        f"INSERT INTO temp.import_match VALUES ({', '.join('?' for _ in match_columns)})",
+        {tuple(values[i] for i in positions) for values in untracked},
+    )
+    on = " AND ".join(f"t.{col} IS m.{col}" for col in match_columns)
+    rows = conn.execute(
+        f"""
+        SELECT DISTINCT t.id, {', '.join(f't.{col}' for col in columns)}
+        FROM temp.import_match m JOIN {table} t ON {on}
+        ORDER BY t.id
+        """
+    ).fetchall()
+    conn.execute("DROP TABLE temp.import_match")
+
+    blocked = set()
+    rekeyed: Dict[str, List[str]] = {}
+    if rows and not natural_id:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_ids (target_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.import_ids")
+        conn.executemany("INSERT OR IGNORE INTO temp.import_ids VALUES (?)", [(str(row["id"]),) for row in rows])
+        for target_id, owner, key, live in conn.execute(
+            """
+            SELECT r.target_id, r.source, r.record_key,
+                   r.record_key IN (SELECT record_key FROM temp.import_keys)
+            FROM temp.import_ids i
+            JOIN import_records r ON r.target_table = ? AND r.target_id = i.target_id
+            """,
+            (table,),
+        ):
+            if owner != source or live:
+                blocked.add(target_id)
+            else:
+                rekeyed.setdefault(target_id, []).append(key)
+
+    existing: Dict[Tuple[Any, ...], List[Tuple[str, str]]] = {}
+    for row in rows:
+        row_id = str(row["id"])
+        if row_id in blocked:
+            continue
+        match = tuple(row[col] for col in match_columns)
+        stored = tuple(row[col] for col in columns)
+        existing.setdefault(match, []).append((row_id, content_hash(stored)))
+    return existing, rekeyed
+
+
+def _record_group(key: str) -> Optional[str]:
+    """Group of a "group:hash" record key (None for other key formats)."""
+    group, sep, _digest = key.partition("#")[0].rpartition(":")
+    return group if sep else None
+
+
+def _vanished_records(
+    conn: sqlite3.Connection,
+    source: str,
+    table: str,
+    released: Set[str],
+) -> Dict[Optional[str], List[Tuple[str, str]]]:
+    """
+    This source's tracked keys that the current records no longer produce.
+
+    Returns:
+        {group: [(record_key, target_id), ...] in id order}, without the
+        keys in released (already handed over to an adopted row)
+    """
+    vanished: Dict[Optional[str], List[Tuple[str, str]]] = {}
+    for key, target_id in conn.execute(
+        """
+        SELECT record_key, target_id FROM import_records
+        WHERE source = ? AND target_table = ?
+          AND record_key NOT IN (SELECT record_key FROM temp.import_keys)
+        ORDER BY CAST(target_id AS INTEGER)
+        """,
+        (source, table),
+    ):
+        if key not in released:
+            vanished.setdefault(_record_group(key), []).append((key, str(target_id)))
+    return vanished
+
+
+def bulk_import(
+    source: str,
+    table: str,
+    records: List[Tuple[str, Dict[str, Any]]],
+    dry_run: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+    complete: bool = False,
+) -> Dict[str, int]:
+    """
+    Import parsed markdown records idempotently.
+
+    Every record is (record_key, {column: value}) with values already in
+    their stored form (JSON strings, 0/1 for booleans). The content hash of
+    each record is compared with the one saved in import_records for
+    (source, record_key): unchanged records are skipped, changed ones are
+    updated in place and new ones inserted - all with executemany in one
+    transaction. Rows stored by older, untracked imports are matched on
+    IMPORT_MATCH_COLUMNS and adopted rather than duplicated. Every lookup
+    is an indexed join against the given records, so the cost follows the
+    size of the import, not of the table.
+
+    Keys of the form "group:hash" (parser.record_key) change when a record's
+    text is edited. When the records are the whole source, a new key takes
+    over the row of a key of the same group that is no longer in the file,
+    so an edited entry updates its row instead of adding a second one.
+
+    Args:
+        source: Name of the source (e.g. "BOARD_HISTORY.md")
+        table: Target table - a key of IMPORT_COLUMNS
+        records: Parsed records in file order; repeated keys get #2, #3 ...
+                 (for natural-id tables like bugs the last one wins)
+        dry_run: Compute the counts without writing anything
+        conn: Optional open connection. When given, the caller owns the
+              transaction (BEGIN IMMEDIATE / commit); otherwise one is opened.
+        complete: records are every record of the source (a full parse, not
+                  an incremental tail), so a tracked key missing from them
+                  was edited or removed
+
+    Returns:
+        {inserted, updated, unchanged, missing (changed records whose row
+        has since been archived or deleted - left alone)}
+    """
+    columns = IMPORT_COLUMNS[table]
+    match_columns = IMPORT_MATCH_COLUMNS[table]
+    natural_id = match_columns == ("id",)
+
+    fresh: Dict[str, Tuple[Any, ...]] = {}
+    for key, values in records:
+        unique_key, n = key, 1
+        while unique_key in fresh and not natural_id:
+            n += 1
+            unique_key = f"{key}#{n}"
+        fresh[unique_key] = tuple(values.get(col) for col in columns)
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "missing": 0}
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        if own_conn and not dry_run:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Work in proportion to the records given, not to the table:
+            # their keys and match values go into temp tables and every
+            # lookup below is an indexed join against them
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_keys (record_key TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.import_keys")
+            conn.executemany("INSERT OR IGNORE INTO temp.import_keys VALUES (?)", [(key,) for key in fresh])
+            tracked = {
+                row["record_key"]: (row["target_id"], row["content_hash"])
+                for row in conn.execute(
+                    """
+                    SELECT r.record_key, r.target_id, r.content_hash
+                    FROM temp.import_keys k
+                    JOIN import_records r ON r.source = ? AND r.record_key = k.record_key
+                    WHERE r.target_table = ?
+                    """,
+                    (source, table),
+                )
+            }
+
+            untracked = [key for key in fresh if key not in tracked]
+            existing: Dict[Tuple[Any, ...], List[Tuple[str, str]]] = {}
+            rekeyed: Dict[str, List[str]] = {}  # target_id -> this source's stale keys for it
+            if untracked:
+                existing, rekeyed = _adoption_candidates(
+                    conn, source, table, columns, match_columns,
+                    [fresh[key] for key in untracked], natural_id,
+                )
+
+            to_insert = []
+            to_update = []
+            to_track = []
+            to_forget = []
+            for key, values in fresh.items():
+                digest = content_hash(values)
+                if key in tracked:
+                    target_id, stored_hash = tracked[key]
+                else:
+                    match = tuple(values[columns.index(col)] for col in match_columns)
+                    candidates = existing.get(match)
+                    if candidates:
+                        target_id, stored_hash = candidates.pop(0)
+                        to_forget.extend((source, stale) for stale in rekeyed.get(target_id, ()))
+                    else:
+                        to_insert.append((key, values, digest))
+                        continue
+
+                if digest == stored_hash:
+                    counts["unchanged"] += 1
+                    if key not in tracked:
+                        to_track.append((source, key, table, target_id, digest))
+                else:
+                    to_update.append(values + (target_id,))
+                    to_track.append((source, key, table, target_id, digest))
+
+            replaced: Dict[str, str] = {}  # target_id -> vanished key it was tracked under
+            if complete and to_insert and not natural_id:
+                vanished = _vanished_records(conn, source, table, {key for _s, key in to_forget})
+                remaining = []
+                for key, values, digest in to_insert:
+                    stale = vanished.get(_record_group(key))
+                    if stale:
+                        old_key, target_id = stale.pop(0)
+                        replaced[target_id] = old_key
+                        to_update.append(values + (target_id,))
+                        to_track.append((source, key, table, target_id, digest))
+                    else:
+                        remaining.append((key, values, digest))
+                to_insert = remaining
+
+            gone: Set[str] = set()
+            if to_update:
+                # A tracked row that is gone (archived, deleted) stays gone:
+                # it is neither updated nor inserted again
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_ids (target_id TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM temp.import_ids")
+                conn.executemany("INSERT OR IGNORE INTO temp.import_ids VALUES (?)",
+                                 [(str(row[-1]),) for row in to_update])
+                gone = {
+                    str(row[0]) for row in conn.execute(
+                        f"""
+                        SELECT i.target_id FROM temp.import_ids i
+                        WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.id = i.target_id)
+                        """
+                    )
+                }
+                if gone:
+                    to_update = [row for row in to_update if str(row[-1]) not in gone]
+                    to_track = [record for record in to_track if record[3] not in gone]
+                    counts["missing"] = len(gone)
+            to_forget.extend((source, old_key) for target_id, old_key in replaced.items() if target_id not in gone)
+
+            counts["inserted"] = len(to_insert)
+            counts["updated"] = len(to_update)
+            if dry_run:
+                return counts
+
+            # Assign ids up front so one executemany can insert every row
+            # and the import records can point at them
+            if natural_id:
+                insert_columns = columns
+                insert_rows = [values for _key, values, _digest in to_insert]
+                new_ids = [str(values[0]) for _key, values, _digest in to_insert]
+            else:
+                next_id = conn.execute(
+                    f"""
+                    SELECT MAX(COALESCE((SELECT MAX(id) FROM {table}), 0),
+                               COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0)) + 1
+                    """,
+                    (table,),
+                ).fetchone()[0]
+                insert_columns = ("id",) + columns
+                insert_rows = [(next_id + i,) + values for i, (_k, values, _d) in enumerate(to_insert)]
+                new_ids = [str(row[0]) for row in insert_rows]
+
+            for (key, _values, digest), target_id in zip(to_insert, new_ids):
+                to_track.append((source, key, table, target_id, digest))
+
+            placeholders = ", ".join("?" for _ in insert_columns)
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(insert_columns)}) VALUES ({placeholders})",
+                insert_rows,
+            )
+
+            assignments = ", ".join(f"{col} = ?" for col in columns)
+            if table == "bugs":
+                assignments += ", updated_at = CURRENT_TIMESTAMP"
+            conn.executemany(f"UPDATE {table} SET {assignments} WHERE id = ?", to_update)
+
+            conn.executemany("DELETE FROM import_records WHERE source = ? AND record_key = ?", to_forget)
+            conn.executemany(
+                """
+                INSERT INTO import_records (source, record_key, target_table, target_id, content_hash)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(source, record_key) DO UPDATE SET
+                    target_table = excluded.target_table,
+                    target_id = excluded.target_id,
+                    content_hash = excluded.content_hash,
+                    updated_at = datetime('now')
+                """,
+                to_track,
+            )
+            if own_conn:
+                with span("storage.commit"):
+                    conn.commit()
+        except Exception:
+            if own_conn and not dry_run:
+                conn.rollback()
+            raise
+
+        return counts
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def get_import_source(source: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the incremental-import state recorded for a source file.
+
+    Returns:
+        Dict with path, imported_size, imported_hash, tail_offset, or None.
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT * FROM import_sources WHERE source = ?", (source,)
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def save_import_source(
+    conn: sqlite3.Connection,
+    source: str,
+    path: str,
+    imported_size: int,
+    imported_hash: str,
+    tail_offset: int,
+) -> None:
+    """
+    Record how far a source file has been imported (caller commits).
+
+    Args:
+        conn: Open connection, normally inside the import transaction
+        source: Source name, as used in import_records
+        path: File that was read
+        imported_size: Number of bytes imported
+        imported_hash: sha1 of those bytes
+        tail_offset: Byte offset where the last imported section starts
+    """
+    conn.execute(
+        """
+        INSERT INTO import_sources (source, path, imported_size, imported_hash, tail_offset)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            path = excluded.path,
+            imported_size = excluded.imported_size,
+            imported_hash = excluded.imported_hash,
+            tail_offset = excluded.tail_offset,
+            updated_at = datetime('now')
+        """,
+        (source, path, imported_size, imported_hash, tail_offset),
+    )
+
+
 # =============================================================================
 # CODE CALLS (Dependency Tree)
 # =============================================================================
 
+@timed("storage.store_nested_code_doc")
 def store_nested_code_doc(
     file_path: str,
     symbol_name: str,
@@ -1016,6 +2120,7 @@ def store_nested_code_doc(
     signature: Optional[str] = None,
     purpose: str = "TODO: Document",
     area: str = "lib",
+    conn: Optional[sqlite3.Connection] = None,
 ) -> int:
     """
     Store a nested function as a code_doc with parent_id.
@@ -1030,10 +2135,13 @@ def store_nested_code_doc(
         signature: Function signature
         purpose: What the function does
         area: Area that owns this code
+        conn: Optional open connection - the caller commits
 
     Returns:
         The ID of the inserted row.
     """
+    from .schemas import NestedCodeDocInput
+
     doc = NestedCodeDocInput(
         file_path=file_path,
         symbol_name=symbol_name,
@@ -1046,7 +2154,9 @@ def store_nested_code_doc(
         area=area,
     )
 
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     try:
         cursor = conn.execute(
             """
@@ -1078,12 +2188,65 @@ def store_nested_code_doc(
                 datetime.now().isoformat(),
             ),
         )
-        conn.commit()
+        if own_conn:
+            conn.commit()
         return cursor.lastrowid
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
+
+
+@timed("storage.store_nested_code_docs")
+def store_nested_code_docs(
+    docs: List[Dict[str, Any]],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[int]:
+    """
+    Store many nested functions found by the parser (see store_nested_code_doc).
+
+    Checked once with validate_many(NestedCodeDocInput, ..., trusted=True)
+    and written in multi-row INSERTs.
+
+    Args:
+        docs: NestedCodeDocInput fields per doc
+        conn: Optional open connection - the caller commits
+
+    Returns:
+        Row ids, in the order of docs.
+    """
+    from .schemas import NestedCodeDocInput, validate_many
+
+    if not docs:
+        return []
+    verified = datetime.now().isoformat()
+    rows = [
+        (
+            d["file_path"], d["symbol_name"], d["line_start"], d["symbol_type"], d["parent_id"],
+            d["line_end"], d["signature"], d["purpose"], d["area"], "[]", verified,
+        )
+        for d in validate_many(NestedCodeDocInput, docs, trusted=True)
+    ]
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        ids = _upsert_code_docs(
+            conn,
+            ("file_path", "symbol_name", "line_start", "symbol_type", "parent_id",
+             "line_end", "signature", "purpose", "area", "connections", "last_verified"),
+            ("symbol_type", "parent_id", "line_end", "signature", "purpose", "area"),
+            rows,
+        )
+        if own_conn:
+            conn.commit()
+        return ids
+    finally:
+        if own_conn:
+            conn.close()
 
 
+@timed("storage.store_call")
 def store_call(
     caller_id: int,
     callee_name: str,
@@ -1104,6 +2267,8 @@ def store_call(
     Returns:
         The ID of the inserted row.
     """
+    from .schemas import CodeCallInput
+
     call = CodeCallInput(
         caller_id=caller_id,
         callee_id=callee_id,
@@ -1127,6 +2292,86 @@ def store_call(
         conn.close()
 
 
+def sync_calls(calls: Iterable[Union["CodeCallInput", Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Make code_calls match a freshly computed edge set.
+
+    Edges are compared as whole rows (caller_id, callee_id, callee_name,
+    call_type, line_number), counting repeats, so every edge the old
+    wipe-and-insert kept is kept - including several on one line. Rows that
+    don't match are paired by call site (caller_id, callee_name,
+    line_number) and updated in place when the callee was re-resolved;
+    the rest are inserted or deleted. Everything is applied in one
+    transaction, so readers never see a partial graph and unchanged rows
+    keep their ids.
+
+    Args:
+        calls: The complete, current set of call relationships - models, or
+               rows from validate_many(CodeCallInput, ..., trusted=True)
+
+    Returns:
+        {inserted, updated, deleted, unchanged}
+    """
+    fresh: Counter = Counter()
+    for call in calls:
+        row = call if isinstance(call, dict) else dict(call)
+        fresh[(row["caller_id"], row["callee_id"], row["callee_name"], row["call_type"], row["line_number"])] += 1
+
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Stored rows with no identical fresh edge, by call site
+            stale: Dict[Tuple[int, str, Optional[int]], List[int]] = {}
+            for row in conn.execute(
+                "SELECT id, caller_id, callee_id, callee_name, call_type, line_number FROM code_calls"
+            ):
+                edge = (row["caller_id"], row["callee_id"], row["callee_name"], row["call_type"], row["line_number"])
+                if fresh[edge] > 0:
+                    fresh[edge] -= 1
+                    counts["unchanged"] += 1
+                else:
+                    stale.setdefault((row["caller_id"], row["callee_name"], row["line_number"]), []).append(row["id"])
+
+            to_update = []
+            to_insert = []
+            for edge in fresh.elements():
+                caller_id, callee_id, callee_name, call_type, line_number = edge
+                ids = stale.get((caller_id, callee_name, line_number))
+                if ids:
+                    to_update.append((callee_id, call_type, ids.pop()))
+                else:
+                    to_insert.append(edge)
+            to_delete = [(row_id,) for ids in stale.values() for row_id in ids]
+
+            conn.executemany("DELETE FROM code_calls WHERE id = ?", to_delete)
+            conn.executemany(
+                "UPDATE code_calls SET callee_id = ?, call_type = ? WHERE id = ?",
+                to_update,
+            )
+            conn.executemany(
+                """
+                INSERT INTO code_calls (caller_id, callee_id, callee_name, call_type, line_number)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                to_insert,
+            )
+            with span("storage.commit"):
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        counts["deleted"] = len(to_delete)
+        counts["updated"] = len(to_update)
+        counts["inserted"] = len(to_insert)
+        return counts
+    finally:
+        conn.close()
+
+
 def query_calls(
     caller_id: Optional[int] = None,
     callee_id: Optional[int] = None,
@@ -1147,6 +2392,24 @@ def query_calls(
     Returns:
         List of matching call relationships.
     """
+    return list(iter_calls(caller_id, callee_id, callee_name, call_type, limit))
+
+
+def iter_calls(
+    caller_id: Optional[int] = None,
+    callee_id: Optional[int] = None,
+    callee_name: Optional[str] = None,
+    call_type: Optional[str] = None,
+    limit: Optional[int] = 100,
+    after_id: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream function call relationships (see query_calls).
+
+    Args:
+        limit: Maximum number of results (0 or None for all)
+        after_id: Keyset paging - only code_calls ids above this, in id order
+    """
     conditions = []
     params = []
 
@@ -1166,6 +2429,13 @@ def query_calls(
         conditions.append("c.call_type = ?")
         params.append(call_type)
 
+    if after_id is not None:
+        conditions.append("c.id > ?")
+        params.append(after_id)
+        order_by = "c.id"
+    else:
+        order_by = "c.line_number"
+
     where_clause = " AND ".join(conditions) if conditions else "1=1"
 
     conn = get_connection()
@@ -1182,12 +2452,13 @@ def query_calls(
             JOIN code_docs caller ON c.caller_id = caller.id
             LEFT JOIN code_docs callee ON c.callee_id = callee.id
             WHERE {where_clause}
-            ORDER BY c.line_number
+            ORDER BY {order_by}
             LIMIT ?
             """,
-            params + [limit],
+            params + [_sql_limit(limit)],
         )
-        return [dict(row) for row in cursor.fetchall()]
+        for row in cursor:
+            yield dict(row)
     finally:
         conn.close()
 
@@ -1218,6 +2489,92 @@ def get_calls_to(code_doc_id: int) -> List[Dict[str, Any]]:
     return query_calls(callee_id=code_doc_id, limit=1000)
 
 
+class CallGraphIndex:
+    """
+    code_calls and the code_docs they touch, held in memory for call trees.
+
+    A tree walk otherwise runs one query per node. The index is reloaded
+    when the database changed: PRAGMA data_version moves on commits by
+    other connections, total_changes on writes through conn itself. Used by
+    the CLI daemon (see use_call_graph_index()).
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._version: Optional[Tuple[int, int]] = None
+        self.docs: Dict[int, Tuple[str, str, str]] = {}   # id -> (name, type, file)
+        self.down: Dict[int, List[Tuple[Any, ...]]] = {}  # caller_id -> calls by line
+        self.up: Dict[int, List[Tuple[Any, ...]]] = {}    # callee_id -> calls by line
+
+    def refresh(self) -> None:
+        """Reload if anything was committed since the last load."""
+        version = (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes)
+        if version == self._version:
+            return
+        with span("storage.call_graph_load"):
+            self.docs = {
+                row[0]: (row[1], row[2], row[3])
+                for row in self.conn.execute("SELECT id, symbol_name, symbol_type, file_path FROM code_docs")
+            }
+            self.down, self.up = {}, {}
+            for row in self.conn.execute(
+                "SELECT caller_id, callee_id, callee_name, call_type, line_number "
+                "FROM code_calls ORDER BY line_number"
+            ):
+                call = tuple(row)
+                self.down.setdefault(call[0], []).append(call)
+                if call[1] is not None:
+                    self.up.setdefault(call[1], []).append(call)
+        self._version = version
+        count("storage.call_graph_loads")
+
+    def tree(self, code_doc_id: int, depth: int, direction: str) -> Dict[str, Any]:
+        """Same result as get_call_tree(), from memory."""
+        doc = self.docs.get(code_doc_id)
+        if doc is None:
+            return {}
+        result = {"id": code_doc_id, "name": doc[0], "type": doc[1], "file": doc[2], "children": []}
+        if depth <= 0:
+            return result
+
+        if direction == "down":
+            calls = self.down.get(code_doc_id, [])
+        else:
+            # Callers without a doc are left out, as the SQL join does
+            calls = [call for call in self.up.get(code_doc_id, []) if call[0] in self.docs]
+        for caller_id, callee_id, callee_name, call_type, line_number in calls:
+            if direction == "down":
+                child = {"name": callee_name, "type": call_type, "line": line_number,
+                         "external": callee_id not in self.docs}
+                child_id = callee_id
+            else:
+                child = {"name": self.docs[caller_id][0], "type": call_type, "line": line_number,
+                         "external": False}
+                child_id = caller_id
+            if child_id and depth > 1:
+                subtree = self.tree(child_id, depth - 1, direction)
+                if subtree.get("children"):
+                    child["children"] = subtree["children"]
+            result["children"].append(child)
+        return result
+
+
+# Set by use_call_graph_index() - get_call_tree() answers from it
+_call_graph_index: Optional[CallGraphIndex] = None
+
+
+@contextmanager
+def use_call_graph_index(index: Optional[CallGraphIndex]) -> Iterator[None]:
+    """Answer get_call_tree() from index within the block (loaded on first use)."""
+    global _call_graph_index
+    previous = _call_graph_index
+    _call_graph_index = index
+    try:
+        yield
+    finally:
+        _call_graph_index = previous
+
+
 def get_call_tree(
     code_doc_id: int,
     depth: int = 3,
@@ -1226,6 +2583,9 @@ def get_call_tree(
     """
     Build a call tree from a starting function.
 
+    Inside use_call_graph_index() the tree comes from the index instead of
+    one query per node.
+
     Args:
         code_doc_id: Starting code_doc ID
         depth: Maximum depth to traverse
@@ -1234,6 +2594,10 @@ def get_call_tree(
     Returns:
         Nested dict representing the call tree.
     """
+    if _call_graph_index is not None:
+        _call_graph_index.refresh()
+        return _call_graph_index.tree(code_doc_id, depth, direction)
+
     conn = get_connection()
     try:
         # Get the starting node
@@ -0,0 +1,313 @@
+"""
+Board subscriptions: deliver new messages as they are posted.
+
+Polling get_recent() / get_my_assignments() opens a connection and runs a
+query every time. A watcher keeps one connection and checks
+PRAGMA data_version instead - it only changes when another connection
+commits, and reading it touches no table. Only then are rows above the
+high-water messages.id read. While idle, the check interval backs off from
+WATCH_POLL_MIN_S to WATCH_POLL_MAX_S and drops back on the next message.
+
+    board = Board("Fizz")
+    for msg in board.follow(types=["assignment"], mentions=["Fizz"]):
+        ...
+    board.watch(handle_question, types=["question"], timeout=60)
+
+    python -m team.toolbox.cli board watch --mentions @Fizz --format jsonl
+
+WatchHub runs one watcher thread for any number of subscribers, each with
+its own filters. The CLI daemon serves `board watch` through a hub, so
+agents watching through the client share a single poller.
+"""
+
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from .constants import WATCH_BACKOFF, WATCH_POLL_MAX_S, WATCH_POLL_MIN_S
+from .storage import get_connection, open_connection
+
+
+# Columns delivered to subscribers (Board._row_to_message reads them by index)
+WATCH_COLUMNS = "id, author, message_type, content, created_at, resolved, mentions, routed_to, routed_id"
+
+
+def _names(mentions: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    """Normalized mention names ('@Fizz' and 'fizz' are the same), or None."""
+    if not mentions:
+        return None
+    return {m.strip().lstrip("@").lower() for m in mentions if m.strip()}
+
+
+def matches(row: Any, types: Optional[Set[str]], names: Optional[Set[str]]) -> bool:
+    """Whether a message row passes a subscription's type and mention filters."""
+    if types and row["message_type"] not in types:
+        return False
+    if names:
+        mentioned = _names(json.loads(row["mentions"]) if row["mentions"] else None)
+        if not mentioned or not names & mentioned:
+            return False
+    return True
+
+
+class MessageWatcher:
+    """One connection that reports messages committed since the last check."""
+
+    def __init__(self, since_id: Optional[int] = None):
+        """
+        Args:
+            since_id: Deliver messages above this id (default: only new ones)
+        """
+        # Kept - PRAGMA data_version is per connection. Untraced: in the daemon
+        # its polls would be logged against whichever command runs next
+        self.conn = open_connection(traced=False)
+        try:
+            self._data_version = self._read_data_version()
+            if since_id is None:
+                since_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+                self._pending = False
+            else:
+                self._pending = True  # Backlog above since_id - read it on the first poll
+        except Exception:
+            self.conn.close()
+            raise
+        self.high_water = since_id
+
+    def _read_data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self) -> List[sqlite3.Row]:
+        """New messages since the last call, oldest first. Reads no table unless something was committed."""
+        version = self._read_data_version()
+        if version == self._data_version and not self._pending:
+            return []
+        self._data_version = version
+        self._pending = False
+
+        rows = self.conn.execute(
+            f"SELECT {WATCH_COLUMNS} FROM messages WHERE id > ? ORDER BY id",
+            (self.high_water,),
+        ).fetchall()
+        if rows:
+            self.high_water = rows[-1]["id"]
+        return rows
+
+    def wait(
+        self,
+        timeout: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+        min_interval: float = WATCH_POLL_MIN_S,
+        max_interval: float = WATCH_POLL_MAX_S,
+        backoff: float = WATCH_BACKOFF,
+    ) -> List[sqlite3.Row]:
+        """
+        Block until new messages arrive, timeout passes or stop is set.
+
+        Returns:
+            The new messages ([] on timeout or stop)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = min_interval
+        while True:
+            rows = self.poll()
+            if rows:
+                return rows
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                interval = min(interval, remaining)
+            if stop is not None:
+                if stop.wait(interval):
+                    return []
+            else:
+                time.sleep(interval)
+            interval = min(interval * backoff, max_interval)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def follow_messages(
+    types: Optional[Iterable[str]] = None,
+    mentions: Optional[Iterable[str]] = None,
+    since_id: Optional[int] = None,
+    timeout: Optional[float] = None,
+    stop: Optional[threading.Event] = None,
+    min_interval: float = WATCH_POLL_MIN_S,
+    max_interval: float = WATCH_POLL_MAX_S,
+    backoff: float = WATCH_BACKOFF,
+) -> Iterator[sqlite3.Row]:
+    """
+    Yield matching messages as they are committed.
+
+    Args:
+        types: Message types to deliver (default: all)
+        mentions: Deliver only messages mentioning one of these names
+        since_id: Start above this id (default: only messages posted from now on)
+        timeout: Stop after this many seconds (default: run until closed)
+        stop: Event that ends the stream when set
+        min_interval / max_interval / backoff: Idle check interval, in seconds
+
+    Yields:
+        Rows with WATCH_COLUMNS, oldest first
+    """
+    type_set = set(types) if types else None
+    names = _names(mentions)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    watcher = MessageWatcher(since_id)
+    try:
+        while stop is None or not stop.is_set():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return
+            for row in watcher.wait(remaining, stop, min_interval, max_interval, backoff):
+                if matches(row, type_set, names):
+                    yield row
+    finally:
+        watcher.close()
+
+
+# =============================================================================
+# SHARED WATCHER (one poller, many subscribers)
+# =============================================================================
+
+class Subscription:
+    """A WatchHub subscriber: its filters and a queue of matching messages."""
+
+    def __init__(self, types: Optional[Iterable[str]], mentions: Optional[Iterable[str]]):
+        self.types = set(types) if types else None
+        self.names = _names(mentions)
+        self.messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.high_water = 0  # Highest id queued or skipped (guarded by WatchHub._lock)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next message, or None if none arrived within timeout."""
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class WatchHub:
+    """
+    One MessageWatcher thread fanning messages out to subscribers.
+
+    The thread starts with the first subscriber and exits after the last one
+    leaves, so an idle hub runs no queries at all.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = WATCH_POLL_MIN_S,
+        max_interval: float = WATCH_POLL_MAX_S,
+        backoff: float = WATCH_BACKOFF,
+    ):
+        self._intervals = (min_interval, max_interval, backoff)
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscription] = []
+        self._stop: Optional[threading.Event] = None
+        self._delivered = 0  # Highest id handed to subscribers (guarded by _lock)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(
+        self,
+        types: Optional[Iterable[str]] = None,
+        mentions: Optional[Iterable[str]] = None,
+        since_id: Optional[int] = None,
+    ) -> Subscription:
+        """
+        Start delivering matching messages to a new subscription.
+
+        Args:
+            since_id: Also queue existing messages above this id
+        """
+        sub = Subscription(types, mentions)
+        with self._lock:
+            if self._stop is None:
+                self._start()
+
+            sub.high_water = self._delivered if since_id is None else since_id
+            if since_id is not None and since_id < self._delivered:
+                # Backlog up to what the thread has delivered - it sends
+                # everything above that, so nothing is missed or sent twice
+                conn = get_connection()
+                try:
+                    for row in conn.execute(
+                        f"SELECT {WATCH_COLUMNS} FROM messages WHERE id > ? AND id <= ? ORDER BY id",
+                        (since_id, self._delivered),
+                    ):
+                        if matches(row, sub.types, sub.names):
+                            sub.messages.put(dict(row))
+                finally:
+                    conn.close()
+                sub.high_water = self._delivered
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Stop a subscription; the last one out stops the watcher thread."""
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+            if not self._subscribers and self._stop is not None:
+                self._stop.set()
+                self._stop = None
+
+    def _start(self) -> None:
+        """Start the watcher thread (caller holds _lock)."""
+        stop = threading.Event()
+        ready: "queue.Queue[Any]" = queue.Queue()
+        thread = threading.Thread(target=self._run, args=(stop, ready), name="board-watch", daemon=True)
+        thread.start()
+        # The connection belongs to the thread that opened it - wait for its high-water mark
+        result = ready.get()
+        if isinstance(result, Exception):
+            raise result
+        self._delivered = result
+        self._stop = stop
+
+    def _run(self, stop: threading.Event, ready: "queue.Queue[Any]") -> None:
+        min_interval, max_interval, backoff = self._intervals
+        try:
+            watcher = MessageWatcher()
+        except Exception as e:
+            ready.put(e)
+            return
+        ready.put(watcher.high_water)
+
+        try:
+            while not stop.is_set():
+                try:
+                    rows = watcher.wait(None, stop, min_interval, max_interval, backoff)
+                except sqlite3.OperationalError as e:
+                    print(f"Warning: board watch: {e}", file=sys.__stderr__)  # Not a client's redirected stream
+                    stop.wait(max_interval)
+                    continue
+                with self._lock:
+                    # A stopped thread may still hold rows while a restarted
+                    # one delivers the same ids - drop them
+                    if stop.is_set():
+                        break
+                    for row in rows:
+                        message = dict(row)
+                        for sub in self._subscribers:
+                            # Each subscription starts at its own since_id
+                            if row["id"] <= sub.high_water:
+                                continue
+                            sub.high_water = row["id"]
+                            if matches(row, sub.types, sub.names):
+                                sub.messages.put(message)
+                    if rows:
+                        self._delivered = rows[-1]["id"]
+        finally:
+            watcher.close()
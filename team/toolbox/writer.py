@@ -0,0 +1,613 @@
+"""
+Write coordination for team.db.
+
+Five agents write to the same database. Each coordinated write is a named
+operation - a function that takes an open connection and performs its
+INSERTs/UPDATEs - registered with @write_op. execute_write() runs it:
+
+1. Through the single-writer process when one is listening on
+   team/writer.sock. The writer group-commits queued operations in one
+   transaction, isolating each with a SAVEPOINT.
+2. Otherwise in-process, inside BEGIN IMMEDIATE with a busy_timeout and
+   exponential-backoff retry when the database is locked.
+
+Usage:
+    from .writer import write_op, execute_write
+
+    @write_op("board.post")
+    def _post_message(conn, author, content):
+        return conn.execute("INSERT ...", (author, content)).lastrowid
+
+    msg_id = execute_write("board.post", author="Fizz", content="...")
+
+Single-writer process:
+    python -m team.toolbox.cli writer serve
+    python -m team.toolbox.cli writer stats
+"""
+
+import json
+import queue
+import random
+import signal
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from . import querylog
+from .storage import get_busy_timeout, get_connection, get_db_path, in_shared_transaction, set_busy_timeout
+from .constants import (
+    WRITE_CLIENT_MARGIN_S,
+    WRITE_MAX_RETRIES,
+    WRITE_RETRY_BASE_DELAY,
+    WRITE_RETRY_MAX_DELAY,
+    WRITER_SOCKET_FILENAME,
+)
+
+
+class WriteError(Exception):
+    """
+    Coordinated write failed.
+
+    error_type names the exception the operation raised (e.g.
+    "IntegrityError"), the same whether it ran in-process or in the writer.
+    """
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        super().__init__(message)
+        self.error_type = error_type or type(self).__name__
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+@dataclass
+class WriteConfig:
+    """Retry policy for in-process writes."""
+    max_retries: int = WRITE_MAX_RETRIES
+    base_delay: float = WRITE_RETRY_BASE_DELAY
+    max_delay: float = WRITE_RETRY_MAX_DELAY
+
+
+config = WriteConfig()
+
+
+def retry_budget() -> float:
+    """
+    Worst-case seconds run_transaction() waits for the write lock.
+
+    Every attempt may block for the full busy_timeout, and each retry adds
+    at most its capped backoff sleep.
+    """
+    waits = (config.max_retries + 1) * get_busy_timeout() / 1000
+    backoff = sum(min(config.max_delay, config.base_delay * (2 ** attempt))
+                  for attempt in range(config.max_retries))
+    return waits + backoff
+
+
+def client_timeout() -> float:
+    """
+    Seconds a client waits for the writer process to answer.
+
+    A write may sit in the queue for up to retry_budget() (older ones are
+    answered without being applied) and then retry for up to retry_budget(),
+    so a client never gives up on a write the writer still commits.
+    """
+    return 2 * retry_budget() + WRITE_CLIENT_MARGIN_S
+
+
+def configure_writes(
+    busy_timeout_ms: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
+) -> None:
+    """
+    Adjust write coordination settings for this process.
+
+    Args:
+        busy_timeout_ms: SQLite busy_timeout for new connections
+        max_retries: Backoff retries after busy_timeout is exhausted
+        base_delay: First backoff sleep in seconds (doubles per retry)
+        max_delay: Cap for a single backoff sleep in seconds
+    """
+    if busy_timeout_ms is not None:
+        set_busy_timeout(busy_timeout_ms)
+    if max_retries is not None:
+        config.max_retries = max(0, max_retries)
+    if base_delay is not None:
+        config.base_delay = max(0.0, base_delay)
+    if max_delay is not None:
+        config.max_delay = max(0.0, max_delay)
+
+
+def get_writer_socket_path() -> Path:
+    """Get the path to the single-writer process socket."""
+    return get_db_path().parent / WRITER_SOCKET_FILENAME
+
+
+# =============================================================================
+# OPERATION REGISTRY
+# =============================================================================
+
+WRITE_OPS: Dict[str, Callable[..., Any]] = {}
+
+
+def write_op(name: str) -> Callable:
+    """
+    Register a function as a named write operation.
+
+    The function receives an open connection inside a transaction as its
+    first argument, followed by JSON-serializable keyword arguments. It must
+    not commit or roll back.
+    """
+    def decorator(func: Callable) -> Callable:
+        WRITE_OPS[name] = func
+        return func
+    return decorator
+
+
+def get_write_op(name: str) -> Callable[..., Any]:
+    """Look up a registered write operation."""
+    if name not in WRITE_OPS:
+        # Ops register at import time in the modules that own them
+        from . import board, session  # noqa: F401
+
+    if name not in WRITE_OPS:
+        raise WriteError(f"Unknown write operation '{name}'")
+    return WRITE_OPS[name]
+
+
+# =============================================================================
+# CONTENTION METRICS
+# =============================================================================
+
+@dataclass
+class WriteStats:
+    """Write contention counters for this process."""
+    writes: int = 0              # Operations committed
+    failures: int = 0            # Operations that raised
+    busy_errors: int = 0         # 'database is locked' errors seen
+    retries: int = 0             # Backoff retries performed
+    transactions: int = 0        # Transactions committed
+    max_batch_size: int = 0      # Largest group commit
+    lock_wait_ms: float = 0.0    # Time spent acquiring the write lock
+    max_lock_wait_ms: float = 0.0
+    commit_ms: float = 0.0       # Time spent inside write transactions
+
+
+_stats = WriteStats()
+_stats_lock = threading.Lock()
+
+
+def get_write_stats() -> Dict[str, Any]:
+    """Get write contention metrics for this process."""
+    with _stats_lock:
+        stats = asdict(_stats)
+
+    stats["avg_lock_wait_ms"] = (
+        round(stats["lock_wait_ms"] / stats["transactions"], 3) if stats["transactions"] else 0.0
+    )
+    stats["avg_batch_size"] = (
+        round(stats["writes"] / stats["transactions"], 2) if stats["transactions"] else 0.0
+    )
+    return stats
+
+
+def reset_write_stats() -> None:
+    """Reset write contention metrics."""
+    global _stats
+    with _stats_lock:
+        _stats = WriteStats()
+
+
+def _record(**deltas: float) -> None:
+    with _stats_lock:
+        for key, value in deltas.items():
+            if key.startswith("max_"):
+                setattr(_stats, key, max(getattr(_stats, key), value))
+            else:
+                setattr(_stats, key, getattr(_stats, key) + value)
+
+
+# =============================================================================
+# IN-PROCESS WRITES
+# =============================================================================
+
+def is_busy_error(error: Exception) -> bool:
+    """True if the error means another connection holds the write lock."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter so agents don't retry in lockstep."""
+    delay = min(config.max_delay, config.base_delay * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def run_transaction(conn: sqlite3.Connection, body: Callable[[sqlite3.Connection], Any]) -> Any:
+    """
+    Run body(conn) in a BEGIN IMMEDIATE transaction, retrying when locked.
+
+    BEGIN IMMEDIATE takes the write lock up front, so the busy_timeout applies.
+    A deferred BEGIN that later upgrades to a write can fail immediately.
+
+    Args:
+        conn: Open connection (not in a transaction)
+        body: Function performing the writes; must not commit
+
+    Returns:
+        Whatever body returns.
+    """
+    attempt = 0
+    while True:
+        lock_started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            lock_wait_ms = (time.perf_counter() - lock_started) * 1000
+
+            tx_started = time.perf_counter()
+            result = body(conn)
+            conn.commit()
+
+            _record(
+                transactions=1,
+                lock_wait_ms=lock_wait_ms,
+                max_lock_wait_ms=lock_wait_ms,
+                commit_ms=(time.perf_counter() - tx_started) * 1000,
+            )
+            return result
+
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if not is_busy_error(e):
+                raise
+
+            _record(busy_errors=1)
+            if attempt >= config.max_retries:
+                raise
+
+            delay = _backoff_delay(attempt)
+            _record(retries=1, lock_wait_ms=delay * 1000)
+            time.sleep(delay)
+            attempt += 1
+
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+
+def run_write(op_name: str, **kwargs: Any) -> Any:
+    """
+    Run a write operation in this process.
+
+    Args:
+        op_name: Registered operation name
+        **kwargs: Operation arguments
+
+    Returns:
+        The operation's return value.
+    """
+    op = get_write_op(op_name)
+
+    conn = get_connection()
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        result = run_transaction(conn, lambda c: op(c, **kwargs))
+        _record(writes=1, max_batch_size=1)
+        return result
+    except Exception:
+        _record(failures=1)
+        raise
+    finally:
+        conn.close()
+
+
+def execute_write(op_name: str, **kwargs: Any) -> Any:
+    """
+    Run a write operation, via the single-writer process if one is running.
+
+    Falls back to an in-process write when no writer is listening. Inside
+    a storage.shared_connection() transaction it always writes in-process -
+    the writer would block on the shared transaction's lock. Once a request has been
+    sent it is never retried locally, so a write can't be applied twice.
+
+    Args:
+        op_name: Registered operation name
+        **kwargs: JSON-serializable operation arguments
+
+    Returns:
+        The operation's return value.
+
+    Raises:
+        WriteError: If the operation fails, wherever it ran (error_type
+            names the original exception; in-process it is also __cause__)
+    """
+    sock = None if in_shared_transaction() else _connect_writer()
+    if sock is None:
+        try:
+            return run_write(op_name, **kwargs)
+        except WriteError:
+            raise
+        except Exception as e:
+            raise WriteError(str(e), type(e).__name__) from e
+
+    with sock:
+        response = _request(sock, {"op": op_name, "args": kwargs})
+
+    if not response.get("ok"):
+        raise WriteError(response.get("error", "Unknown writer error"), response.get("error_type"))
+    return response.get("result")
+
+
+# =============================================================================
+# SINGLE-WRITER PROCESS
+# =============================================================================
+
+def _connect_writer(socket_path: Optional[Path] = None) -> Optional[socket.socket]:
+    """Connect to the writer process, or return None if none is listening."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    socket_path = socket_path or get_writer_socket_path()
+    if not socket_path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(client_timeout())
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        # Stale socket file from a writer that exited
+        sock.close()
+        return None
+    return sock
+
+
+def _request(sock: socket.socket, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one JSON line and read one JSON line back."""
+    try:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    except OSError as e:
+        raise WriteError(f"Writer process connection failed: {e}")
+
+    if not line:
+        raise WriteError("Writer process closed the connection")
+    return json.loads(line)
+
+
+def query_writer_stats(socket_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get contention metrics from the running writer process.
+
+    Returns:
+        Stats dict, or None if no writer is running.
+    """
+    sock = _connect_writer(socket_path)
+    if sock is None:
+        return None
+    with sock:
+        response = _request(sock, {"op": "__stats__"})
+    return response.get("result")
+
+
+class _PendingWrite:
+    """A queued write waiting for its group commit."""
+
+    def __init__(self, op_name: str, args: Dict[str, Any]):
+        self.op_name = op_name
+        self.args = args
+        self.queued_at = time.monotonic()
+        self.response: Dict[str, Any] = {}
+        self.done = threading.Event()
+
+
+class WriterServer:
+    """
+    Single-writer process accepting writes over a local Unix socket.
+
+    Client threads enqueue requests; one committer thread drains the queue
+    and applies up to max_batch operations per transaction. Each operation
+    runs inside a SAVEPOINT, so one failing write doesn't abort its batch.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        max_batch: int = 64,
+        linger_ms: float = 2.0,
+    ):
+        """
+        Args:
+            socket_path: Socket to listen on (default team/writer.sock)
+            max_batch: Maximum operations per group commit
+            linger_ms: How long to wait for more writes before committing
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise WriteError("Unix sockets are not supported on this platform")
+
+        self.socket_path = Path(socket_path or get_writer_socket_path())
+        self.max_batch = max(1, max_batch)
+        self.linger = max(0.0, linger_ms) / 1000
+        self._queue: "queue.Queue[_PendingWrite]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._committer: Optional[threading.Thread] = None
+
+    def serve_forever(self) -> None:
+        """Listen until shutdown() is called or the process is interrupted."""
+        if _connect_writer(self.socket_path) is not None:
+            raise WriteError(f"A writer is already listening on {self.socket_path}")
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        server_ref = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = server_ref._handle_line(line)
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        self._server.daemon_threads = True
+        self._committer = threading.Thread(target=self._commit_loop, name="writer-commit", daemon=True)
+        self._committer.start()
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopping.set()
+            self._server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def shutdown(self) -> None:
+        """Stop accepting writes. Queued writes are still committed."""
+        self._stopping.set()
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _handle_line(self, line: bytes) -> Dict[str, Any]:
+        """Decode one request and block until its write is committed."""
+        try:
+            request = json.loads(line)
+            op_name = request["op"]
+            args = request.get("args") or {}
+        except (ValueError, KeyError, TypeError) as e:
+            return {"ok": False, "error": f"Malformed request: {e}"}
+
+        if op_name == "__stats__":
+            stats = get_write_stats()
+            stats["queue_depth"] = self._queue.qsize()
+            return {"ok": True, "result": stats}
+
+        pending = _PendingWrite(op_name, args)
+        self._queue.put(pending)
+        while not pending.done.wait(0.5):
+            # Never block forever on a committer that has died
+            committer = self._committer
+            if committer is None or not committer.is_alive():
+                return {"ok": False, "error": "Writer commit thread stopped; write not applied",
+                        "error_type": "WriteError"}
+        return pending.response
+
+    def _commit_loop(self) -> None:
+        """Drain the queue into group commits on one long-lived connection."""
+        conn = get_connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                if querylog.flush_due():
+                    # Never exits, so the atexit flush alone would buffer forever
+                    querylog.flush("writer")
+                try:
+                    first = self._queue.get(timeout=0.25)
+                except queue.Empty:
+                    continue
+
+                batch = [first]
+                deadline = time.perf_counter() + self.linger
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    try:
+                        if remaining > 0:
+                            batch.append(self._queue.get(timeout=remaining))
+                        else:
+                            batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                self._commit_batch(conn, batch)
+        finally:
+            conn.close()
+            querylog.flush("writer")
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[_PendingWrite]) -> None:
+        """Apply a batch of writes in one transaction and answer every client."""
+        # Writes queued longer than retry_budget() could commit after their
+        # client gave up (see client_timeout) - answer them unapplied
+        max_wait = retry_budget()
+        now = time.monotonic()
+        expired = [pending for pending in batch if now - pending.queued_at > max_wait]
+        for pending in expired:
+            pending.response = {
+                "ok": False,
+                "error": f"Write not applied: queued for over {max_wait:.0f}s",
+                "error_type": "WriteError",
+            }
+            pending.done.set()
+        if expired:
+            _record(failures=len(expired))
+            batch = [pending for pending in batch if pending not in expired]
+            if not batch:
+                return
+
+        def body(c: sqlite3.Connection) -> List[Dict[str, Any]]:
+            responses = []
+            for pending in batch:
+                c.execute("SAVEPOINT write_op")
+                try:
+                    result = get_write_op(pending.op_name)(c, **pending.args)
+                    c.execute("RELEASE write_op")
+                    responses.append({"ok": True, "result": result})
+                except Exception as e:
+                    c.execute("ROLLBACK TO write_op")
+                    c.execute("RELEASE write_op")
+                    responses.append({"ok": False, "error": str(e), "error_type": type(e).__name__})
+            return responses
+
+        try:
+            responses = run_transaction(conn, body)
+        except Exception as e:
+            responses = [
+                {"ok": False, "error": f"Group commit failed: {e}", "error_type": type(e).__name__}
+            ] * len(batch)
+
+        succeeded = sum(1 for r in responses if r["ok"])
+        _record(writes=succeeded, failures=len(batch) - succeeded, max_batch_size=len(batch))
+
+        for pending, response in zip(batch, responses):
+            pending.response = response
+            pending.done.set()
+
+
+def serve_writer(
+    socket_path: Optional[str] = None,
+    max_batch: int = 64,
+    linger_ms: float = 2.0,
+) -> int:
+    """CLI entry point for the single-writer process."""
+    server = WriterServer(
+        Path(socket_path) if socket_path else None,
+        max_batch=max_batch,
+        linger_ms=linger_ms,
+    )
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Treat SIGTERM like Ctrl+C so the socket file is removed on exit
+    signal.signal(signal.SIGTERM, _stop)
+
+    print(f"Writer listening on {server.socket_path} (max batch {server.max_batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print("Writer stopped")
+    return 0